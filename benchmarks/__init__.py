@@ -0,0 +1 @@
+"""Бенчмарки для оценки памяти и скорости на больших продавцах."""
@@ -0,0 +1,169 @@
+# benchmarks/bench_json.py
+"""Скорость разбора JSON-ответов Ozon разными бэкендами.
+
+Запуск из корня репозитория::
+
+    python -m benchmarks.bench_json [1000 5000]
+
+Для каждого размера строит синтетическую страницу ``/v2/posting/fbo/list``
+(с ``analytics_data`` и ``financial_data``) и страницу отзывов, затем
+печатает время разбора из байтов для stdlib / orjson / msgspec (какие
+установлены).
+Строка ``httpx`` — прежний путь ``Response.json()``: байты → str → json.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List
+
+from botapp import json_codec
+
+DEFAULT_SIZES = (1_000, 5_000)
+REPEAT = 5
+WORDS = "отличный товар быстро доставили качество упаковка размер цвет брак советую".split()
+
+
+def _synthetic_postings(count: int, seed: int = 42) -> Dict[str, Any]:
+    rnd = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    result = []
+    for i in range(count):
+        created = (now - timedelta(seconds=rnd.randrange(86400))).isoformat()
+        products = []
+        financial = []
+        for _ in range(rnd.randint(1, 3)):
+            pid = rnd.randrange(300)
+            price = rnd.randint(200, 5000)
+            products.append(
+                {
+                    "sku": 100_000 + pid,
+                    "name": f"Товар номер {pid}",
+                    "quantity": rnd.randint(1, 3),
+                    "offer_id": f"ART-{pid:05d}",
+                    "price": f"{price}.0000",
+                    "digital_codes": [],
+                    "currency_code": "RUB",
+                }
+            )
+            financial.append(
+                {
+                    "commission_amount": price * 0.15,
+                    "commission_percent": 15,
+                    "payout": price * 0.85,
+                    "product_id": 900_000 + pid,
+                    "old_price": price * 1.2,
+                    "price": float(price),
+                    "total_discount_value": price * 0.2,
+                    "total_discount_percent": 16.67,
+                    "actions": ["Системная виртуальная скидка селлера"],
+                    "client_price": str(price),
+                    "currency_code": "RUB",
+                }
+            )
+        result.append(
+            {
+                "order_id": 10_000_000 + i,
+                "order_number": f"{i:08d}-0001",
+                "posting_number": f"{i:08d}-0001-1",
+                "status": rnd.choice(["delivered", "delivering", "cancelled", "awaiting_packaging"]),
+                "cancel_reason_id": 0,
+                "created_at": created,
+                "in_process_at": created,
+                "products": products,
+                "analytics_data": {
+                    "region": "Москва",
+                    "city": "Москва",
+                    "delivery_type": "PVZ",
+                    "is_premium": False,
+                    "payment_type_group_name": "Карты оплаты",
+                    "warehouse_id": 22_000_000_000,
+                    "warehouse_name": "ХОРУГВИНО_РФЦ",
+                    "is_legal": False,
+                },
+                "financial_data": {
+                    "products": financial,
+                    "posting_services": {
+                        "marketplace_service_item_fulfillment": 0,
+                        "marketplace_service_item_pickup": 0,
+                        "marketplace_service_item_dropoff_pvz": 0,
+                        "marketplace_service_item_direct_flow_trans": 0,
+                        "marketplace_service_item_deliv_to_customer": 0,
+                    },
+                },
+                "additional_data": [],
+            }
+        )
+    return {"result": result}
+
+
+def _synthetic_reviews(count: int, seed: int = 42) -> Dict[str, Any]:
+    rnd = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    reviews = []
+    for i in range(count):
+        reviews.append(
+            {
+                "id": f"{i:08x}-0000-4000-8000-{rnd.getrandbits(48):012x}",
+                "sku": 100_000 + rnd.randrange(300),
+                "rating": rnd.randint(1, 5),
+                "text": " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(3, 40))),
+                "status": "PROCESSED",
+                "order_status": "DELIVERED",
+                "published_at": (now - timedelta(seconds=rnd.randrange(30 * 86400))).isoformat(),
+                "comments_amount": rnd.randint(0, 2),
+                "photos_amount": 0,
+                "videos_amount": 0,
+                "is_rating_participant": True,
+            }
+        )
+    return {"reviews": reviews, "has_next": True, "last_id": reviews[-1]["id"] if reviews else ""}
+
+
+def _decoders() -> Dict[str, Callable[[bytes], Any]]:
+    decoders: Dict[str, Callable[[bytes], Any]] = {
+        "httpx": lambda body: json.loads(body.decode("utf-8")),
+        "stdlib": json.loads,
+    }
+    if json_codec.orjson is not None:
+        decoders["orjson"] = json_codec.orjson.loads
+    if json_codec.msgspec is not None:
+        decoders["msgspec"] = json_codec.msgspec.json.Decoder().decode
+    return decoders
+
+
+def _best_of(fn: Callable[[bytes], Any], body: bytes) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        fn(body)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(sizes: List[int]) -> None:
+    print(f"active backend: {json_codec.BACKEND}")
+    print(f"{'payload':<14} | {'items':>6} | {'KiB':>7} | {'decoder':<24} | {'ms':>8} | {'x httpx':>7}")
+    print("-" * 80)
+    for size in sizes:
+        for label, payload in (
+            ("fbo/list", _synthetic_postings(size)),
+            ("review/list", _synthetic_reviews(size)),
+        ):
+            body = json.dumps(payload, ensure_ascii=False).encode()
+            baseline = None
+            for name, fn in _decoders().items():
+                elapsed = _best_of(fn, body)
+                baseline = baseline or elapsed
+                print(
+                    f"{label:<14} | {size:>6} | {len(body) / 1024:>7.0f} | {name:<24} | "
+                    f"{elapsed * 1000:>8.2f} | {baseline / elapsed:>7.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or list(DEFAULT_SIZES))
@@ -0,0 +1,126 @@
+# benchmarks/bench_posting_table.py
+"""Разрезы по заказам FBO: словарный цикл против колоночной таблицы NumPy.
+
+Запуск из корня репозитория (нужен ``numpy``)::
+
+    python -m benchmarks.bench_posting_table [10000 100000 300000]
+
+Для каждого размера печатает время ``orders._summarize_postings`` и
+такого же цикла по словарям для разрезов по SKU / складу / часу / статусу,
+затем — время сборки :class:`PostingTable` и тех же запросов через
+векторный group-by.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List
+
+from botapp.orders import _extract_amounts, _summarize_postings
+from botapp.ozon_client import MSK_TZ, _parse_iso, s_num
+from botapp.posting_table import HAS_NUMPY, PostingTable
+
+DEFAULT_SIZES = (10_000, 100_000)
+PRODUCTS = 2_000
+WAREHOUSES = ["ХОРУГВИНО_РФЦ", "ТВЕРЬ_РФЦ", "КАЗАНЬ_РФЦ", "НОВОСИБИРСК_РФЦ", "ЕКАТЕРИНБУРГ_РФЦ"]
+REGIONS = ["Москва", "Санкт-Петербург", "Татарстан", "Новосибирская", "Свердловская", "Краснодарский"]
+STATUSES = ["delivered"] * 6 + ["delivering", "cancelled", "returned", "awaiting_packaging"]
+
+
+def _synthetic_postings(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    rnd = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    postings = []
+    for i in range(count):
+        created = (now - timedelta(seconds=rnd.randrange(30 * 86400))).isoformat()
+        products, financial = [], []
+        for _ in range(rnd.choice((1, 1, 1, 2, 3))):
+            pid = rnd.randrange(PRODUCTS)
+            price = rnd.randint(200, 5000)
+            products.append(
+                {
+                    "sku": 100_000 + pid,
+                    "name": f"Товар номер {pid}",
+                    "quantity": rnd.randint(1, 3),
+                    "offer_id": f"ART-{pid:05d}",
+                    "price": f"{price}.0000",
+                }
+            )
+            financial.append({"payout": price * 0.85, "product_id": 900_000 + pid, "price": float(price)})
+        postings.append(
+            {
+                "posting_number": f"{i:08d}-0001-1",
+                "status": rnd.choice(STATUSES),
+                "created_at": created,
+                "products": products,
+                "analytics_data": {
+                    "region": rnd.choice(REGIONS),
+                    "warehouse_name": rnd.choice(WAREHOUSES),
+                },
+                "financial_data": {"products": financial},
+            }
+        )
+    return postings
+
+
+def _dict_group_bys(postings: List[Dict[str, Any]]) -> Dict[str, Dict[Any, float]]:
+    """Те же разрезы прежним способом: проход по вложенным словарям с s_num."""
+
+    by_sku: Dict[Any, float] = defaultdict(float)
+    by_warehouse: Dict[Any, float] = defaultdict(float)
+    by_hour: Dict[Any, float] = defaultdict(float)
+    by_status: Dict[Any, float] = defaultdict(float)
+    for p in postings:
+        base_amount, _ = _extract_amounts(p)
+        analytics = p.get("analytics_data") or {}
+        created = _parse_iso(p.get("created_at"))
+        by_warehouse[analytics.get("warehouse_name")] += 1
+        by_hour[created.astimezone(MSK_TZ).hour if created else None] += 1
+        by_status[(p.get("status") or "").lower()] += base_amount
+        for prod in p.get("products") or []:
+            by_sku[prod.get("offer_id")] += s_num(prod.get("quantity"))
+    return {"sku": by_sku, "warehouse": by_warehouse, "hour": by_hour, "status": by_status}
+
+
+def _timed(fn: Callable[[], Any]) -> tuple[float, Any]:
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+
+def main(sizes: List[int]) -> None:
+    if not HAS_NUMPY:
+        raise SystemExit("numpy не установлен: pip install numpy")
+    print(f"{'postings':>8} | {'step':<34} | {'ms':>9}")
+    print("-" * 58)
+    for size in sizes:
+        postings = _synthetic_postings(size)
+        elapsed, _ = _timed(lambda: _summarize_postings(postings))
+        print(f"{size:>8} | {'dict: _summarize_postings':<34} | {elapsed * 1000:>9.1f}")
+        elapsed, _ = _timed(lambda: _dict_group_bys(postings))
+        print(f"{size:>8} | {'dict: sku/warehouse/hour/status':<34} | {elapsed * 1000:>9.1f}")
+
+        elapsed, table = _timed(lambda: PostingTable.from_postings(postings))
+        print(f"{size:>8} | {'table: build (once)':<34} | {elapsed * 1000:>9.1f}")
+        queries = {
+            "totals": table.totals,
+            "by_sku top-10": lambda: table.by_sku(limit=10),
+            "by_warehouse": table.by_warehouse,
+            "by_hour": table.by_hour,
+            "status_breakdown": table.status_breakdown,
+            "warehouse x region x status": lambda: table.group_by("warehouse", "region", "status"),
+            "sku x warehouse (no cancels)": lambda: table.group_by(
+                "sku", "warehouse", exclude_cancelled=True
+            ),
+        }
+        for name, query in queries.items():
+            elapsed, _ = _timed(query)
+            print(f"{size:>8} | {'table: ' + name:<34} | {elapsed * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or list(DEFAULT_SIZES))
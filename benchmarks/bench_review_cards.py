@@ -0,0 +1,131 @@
+# benchmarks/bench_review_cards.py
+"""Память и время сборки снимка отзывов на синтетических данных.
+
+Запуск из корня репозитория::
+
+    python -m benchmarks.bench_review_cards [2000 20000 200000]
+
+Для каждого размера печатает байт на отзыв и время нормализации + индексации
+для текущей компактной ``ReviewCard`` и для прежнего ``@dataclass`` с
+``__dict__`` и datetime (для сравнения).
+"""
+
+from __future__ import annotations
+
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+from botapp.reviews import ReviewSnapshot, _normalize_review
+
+DEFAULT_SIZES = (2_000, 20_000, 200_000)
+PRODUCTS = 300
+WORDS = "отличный товар быстро доставили качество упаковка размер цвет брак советую".split()
+
+
+@dataclass
+class LegacyReviewCard:
+    """Прежнее представление карточки — только для сравнения."""
+
+    id: str | None
+    rating: int
+    text: str
+    product_name: str | None
+    offer_id: str | None
+    product_id: str | None
+    created_at: datetime | None
+    raw_created_at: Any | None = None
+    answered: bool = False
+    answer_text: str | None = None
+
+
+def _synthetic_reviews(count: int, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    rnd = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    for i in range(count):
+        pid = rnd.randrange(PRODUCTS)
+        created = now - timedelta(seconds=rnd.randrange(30 * 86400))
+        yield {
+            "id": f"{i:08x}-0000-4000-8000-{rnd.getrandbits(48):012x}",
+            "rating": rnd.randint(1, 5),
+            "text": " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(3, 40))),
+            "sku": 100_000 + pid,
+            "product": {"offer_id": f"ART-{pid:05d}", "name": f"Товар номер {pid}"},
+            "created_at": created.isoformat().replace("+00:00", "Z"),
+            "answer": {"text": "Спасибо за отзыв!"} if rnd.random() < 0.3 else None,
+        }
+
+
+def _legacy_build(payloads: Iterable[Dict[str, Any]]) -> List[LegacyReviewCard]:
+    cards = []
+    for raw in payloads:
+        card = _normalize_review(raw)
+        # строки берём заново, чтобы не унаследовать интернирование
+        cards.append(
+            LegacyReviewCard(
+                id=card.id,
+                rating=card.rating,
+                text=card.text,
+                product_name="".join(card.product_name or ""),
+                offer_id="".join(card.offer_id or ""),
+                product_id="".join(card.product_id or ""),
+                created_at=card.created_at,
+                raw_created_at=raw.get("created_at"),
+                answered=card.answered,
+                answer_text=card.answer_text,
+            )
+        )
+    cards.sort(key=lambda c: c.created_at, reverse=True)
+    return cards
+
+
+def _compact_build(payloads: Iterable[Dict[str, Any]]) -> ReviewSnapshot:
+    snapshot = ReviewSnapshot(account_id="bench")
+    snapshot.add_cards([_normalize_review(raw) for raw in payloads])
+    return snapshot
+
+
+def _measure(build: Callable[[Iterable[Dict[str, Any]]], Any], size: int) -> tuple[float, float]:
+    """Вернуть (байт на отзыв, секунд на сборку без учёта генерации данных).
+
+    Payload'ы генерируются на лету и сразу отбрасываются, поэтому в памяти
+    остаётся только собранная структура — как в боте после загрузки.
+    """
+
+    started = time.perf_counter()
+    for _ in _synthetic_reviews(size):
+        pass
+    generation = time.perf_counter() - started
+
+    gc.collect()
+    started = time.perf_counter()
+    result = build(_synthetic_reviews(size))
+    elapsed = time.perf_counter() - started - generation
+    del result
+
+    gc.collect()
+    tracemalloc.start()
+    result = build(_synthetic_reviews(size))
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current / size, max(elapsed, 0.0)
+
+
+def main(sizes: List[int]) -> None:
+    print(f"{'reviews':>8} | {'variant':<8} | {'bytes/review':>12} | {'build, s':>8}")
+    print("-" * 46)
+    for size in sizes:
+        for name, build in (("legacy", _legacy_build), ("compact", _compact_build)):
+            per_review, elapsed = _measure(build, size)
+            print(f"{size:>8} | {name:<8} | {per_review:>12.0f} | {elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or list(DEFAULT_SIZES))
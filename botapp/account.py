@@ -6,7 +6,7 @@ import logging
 from datetime import datetime
 import os
 
-from .ozon_client import OzonClient, get_client
+from .ozon_client import OzonClient, get_client, stale_note, track_stale
 
 
 logger = logging.getLogger(__name__)
@@ -25,7 +25,8 @@ def _fmt_date(value: str | None) -> str | None:
 async def get_account_info_text(client: OzonClient | None = None) -> str:
     client = client or get_client()
     try:
-        info = await client.get_seller_info()
+        with track_stale() as stale:
+            info = await client.get_seller_info()
     except Exception:
         logger.exception("Failed to fetch account info")
         return "⚠️ Не удалось получить данные аккаунта. Попробуйте позже."
@@ -134,4 +135,4 @@ async def get_account_info_text(client: OzonClient | None = None) -> str:
         except Exception:
             pass
 
-    return "\n".join(lines)
+    return "\n".join(lines) + stale_note(stale.at)
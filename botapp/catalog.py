@@ -0,0 +1,337 @@
+# botapp/catalog.py
+"""Локальный индекс каталога продавца.
+
+Каталог целиком выкачивается через /v3/product/list (пагинация по last_id)
+и /v3/product/info/list (чанками, с ограниченной параллельностью). Индекс
+отвечает на «product_id / SKU / offer_id → товар» без сетевых вызовов и
+переживает рестарты (SQLite рядом с кэшем товаров). Названия заодно
+попадают в общий кэш товаров, так что отзывы и FBO их видят сразу.
+
+Раз в сутки (ночью по МСК) — полная синхронизация, в остальное время —
+дельта: дочитываются только карточки, которых ещё нет в индексе.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sqlite3
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .json_codec import dumps as json_dumps, loads as json_loads
+from .ozon_client import MSK_TZ, OzonClient, get_client
+from .product_cache import (
+    KIND_OFFER_ID,
+    KIND_SKU,
+    PRODUCT_CACHE_PATH,
+    connect_db,
+    get_product_cache,
+)
+
+logger = logging.getLogger(__name__)
+
+CATALOG_PATH = os.getenv("CATALOG_PATH") or PRODUCT_CACHE_PATH
+# Интервал дельта-синхронизации (CATALOG_SYNC_SECONDS в .env)
+CATALOG_DELTA_INTERVAL = timedelta(seconds=int(os.getenv("CATALOG_SYNC_SECONDS") or 3600))
+# Час (МСК), после которого раз в сутки делается полная синхронизация
+CATALOG_NIGHTLY_HOUR = int(os.getenv("CATALOG_NIGHTLY_HOUR") or 3)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalog (
+    product_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS catalog_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+@dataclass(slots=True)
+class CatalogProduct:
+    product_id: str
+    offer_id: str | None = None
+    name: str | None = None
+    skus: Tuple[str, ...] = ()
+    archived: bool = False
+    category_id: str | None = None
+    price: str | None = None
+    updated_at: str | None = None
+
+
+def _str_or_none(value: Any) -> str | None:
+    return str(value) if value not in (None, "") else None
+
+
+def _product_from_info(item: Dict[str, Any], listed: Dict[str, Any] | None = None) -> CatalogProduct | None:
+    """Собрать CatalogProduct из ответа /v3/product/info/list (+ строки списка)."""
+
+    listed = listed or {}
+    pid = _str_or_none(item.get("id") or item.get("product_id") or listed.get("product_id"))
+    if pid is None:
+        return None
+    skus = [item.get("sku")]
+    skus.extend(src.get("sku") for src in item.get("sources") or [] if isinstance(src, dict))
+    return CatalogProduct(
+        product_id=pid,
+        offer_id=_str_or_none(item.get("offer_id") or listed.get("offer_id")),
+        name=_str_or_none(item.get("name")) or None,
+        skus=tuple(dict.fromkeys(str(s) for s in skus if s not in (None, "", 0))),
+        archived=bool(item.get("is_archived") or listed.get("archived")),
+        category_id=_str_or_none(item.get("description_category_id") or item.get("category_id")),
+        price=_str_or_none(item.get("price")),
+        updated_at=_str_or_none(item.get("updated_at")),
+    )
+
+
+class ProductCatalog:
+    """Индекс товаров по product_id, SKU и offer_id."""
+
+    def __init__(self, path: str | None = CATALOG_PATH) -> None:
+        self.path = path
+        self.by_product_id: Dict[str, CatalogProduct] = {}
+        self.by_sku: Dict[str, CatalogProduct] = {}
+        self.by_offer_id: Dict[str, CatalogProduct] = {}
+        self.synced_at: datetime | None = None
+        self.full_synced_at: datetime | None = None
+        self._db = connect_db(path, _SCHEMA) if path else None
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self.by_product_id)
+
+    def _index(self, product: CatalogProduct) -> None:
+        old = self.by_product_id.get(product.product_id)
+        if old is not None:
+            for sku in old.skus:
+                self.by_sku.pop(sku, None)
+            if old.offer_id:
+                self.by_offer_id.pop(old.offer_id, None)
+        self.by_product_id[product.product_id] = product
+        for sku in product.skus:
+            self.by_sku[sku] = product
+        if product.offer_id:
+            self.by_offer_id[product.offer_id] = product
+
+    def get(self, key: str | int | None) -> CatalogProduct | None:
+        """Найти товар по product_id, SKU или offer_id (в этом порядке)."""
+
+        if key in (None, ""):
+            return None
+        k = str(key).strip()
+        return self.by_product_id.get(k) or self.by_sku.get(k) or self.by_offer_id.get(k)
+
+    def name_for(self, key: str | int | None) -> str | None:
+        product = self.get(key)
+        return product.name if product else None
+
+    def search(self, query: str, limit: int = 10) -> List[CatalogProduct]:
+        """Поиск по точному ключу или подстроке названия / offer_id."""
+
+        exact = self.get(query)
+        if exact is not None:
+            return [exact]
+        needle = (query or "").strip().lower()
+        if not needle:
+            return []
+        found: List[CatalogProduct] = []
+        for product in self.by_product_id.values():
+            if needle in (product.name or "").lower() or needle in (product.offer_id or "").lower():
+                found.append(product)
+                if len(found) >= limit:
+                    break
+        return found
+
+    def load(self) -> int:
+        """Поднять индекс с диска (при старте процесса)."""
+
+        if self._db is None:
+            return 0
+        try:
+            rows = self._db.execute("SELECT data FROM catalog").fetchall()
+            meta = dict(self._db.execute("SELECT key, value FROM catalog_meta").fetchall())
+        except sqlite3.Error as exc:
+            logger.warning("Catalog load failed: %s", exc)
+            return 0
+        for (raw,) in rows:
+            try:
+                data = json_loads(raw)
+                data["skus"] = tuple(data.get("skus") or ())
+                self._index(CatalogProduct(**data))
+            except (TypeError, ValueError):
+                continue
+        for attr in ("synced_at", "full_synced_at"):
+            if meta.get(attr):
+                setattr(self, attr, datetime.fromisoformat(meta[attr]))
+        logger.info("Catalog loaded: %s products from %s", len(self), self.path)
+        return len(self)
+
+    def upsert(self, products: Iterable[CatalogProduct]) -> int:
+        """Добавить/обновить товары в индексе, на диске и в кэше названий."""
+
+        items = list(products)
+        if not items:
+            return 0
+        for product in items:
+            self._index(product)
+
+        cache = get_product_cache()
+        named = [p for p in items if p.name]
+        cache.set_many({p.product_id: p.name for p in named})
+        cache.set_many({sku: p.name for p in named for sku in p.skus}, KIND_SKU)
+        cache.set_many({p.offer_id: p.name for p in named if p.offer_id}, KIND_OFFER_ID)
+
+        if self._db is not None:
+            rows = [(p.product_id, json_dumps(asdict(p))) for p in items]
+            try:
+                with self._db:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO catalog (product_id, data) VALUES (?, ?)", rows
+                    )
+            except sqlite3.Error as exc:
+                logger.warning("Catalog write failed (%s rows): %s", len(rows), exc)
+        return len(items)
+
+    def _save_meta(self) -> None:
+        if self._db is None:
+            return
+        rows = [
+            (attr, value.isoformat())
+            for attr, value in (("synced_at", self.synced_at), ("full_synced_at", self.full_synced_at))
+            if value is not None
+        ]
+        try:
+            with self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO catalog_meta (key, value) VALUES (?, ?)", rows
+                )
+        except sqlite3.Error as exc:
+            logger.warning("Catalog meta write failed: %s", exc)
+
+    async def sync(self, client: OzonClient | None = None, *, full: bool = False) -> Dict[str, int]:
+        """Синхронизировать индекс с Ozon.
+
+        *full* — перечитать карточки всех товаров; иначе дочитываются только
+        товары, которых в индексе нет или у которых нет названия (список
+        товаров дёшев: до 1000 строк за запрос).
+        """
+
+        client = client or get_client()
+        async with self._lock:
+            listed: Dict[str, Dict[str, Any]] = {}
+            async for page in client.iter_product_list():
+                for row in page:
+                    pid = _str_or_none(row.get("product_id"))
+                    if pid:
+                        listed[pid] = row
+
+            if full:
+                wanted = list(listed)
+            else:
+                wanted = [pid for pid in listed if self.name_for(pid) is None]
+            infos = await client.get_product_info_list(wanted) if wanted else []
+
+            products: Dict[str, CatalogProduct] = {}
+            for item in infos:
+                product = _product_from_info(item, listed.get(str(item.get("id"))))
+                if product is not None:
+                    products[product.product_id] = product
+            for pid in wanted:
+                if pid not in products:
+                    # Карточка не отдалась — сохраняем хотя бы offer_id из списка
+                    products[pid] = CatalogProduct(
+                        product_id=pid,
+                        offer_id=_str_or_none(listed[pid].get("offer_id")),
+                        archived=bool(listed[pid].get("archived")),
+                    )
+            updated = self.upsert(products.values())
+
+            now = datetime.now(timezone.utc)
+            self.synced_at = now
+            if full:
+                self.full_synced_at = now
+            self._save_meta()
+
+        stats = {"listed": len(listed), "fetched": len(infos), "updated": updated, "total": len(self)}
+        logger.info("Catalog %s sync done: %s", "full" if full else "delta", stats)
+        return stats
+
+    def full_sync_due(self, now: datetime | None = None) -> bool:
+        """Пора ли полная синхронизация: никогда не было или «ночная» ещё не прошла сегодня."""
+
+        if self.full_synced_at is None or not self.by_product_id:
+            return True
+        now_msk = (now or datetime.now(timezone.utc)).astimezone(MSK_TZ)
+        last_msk = self.full_synced_at.astimezone(MSK_TZ)
+        if now_msk - last_msk >= timedelta(days=1):
+            return True
+        return last_msk.date() < now_msk.date() and now_msk.hour >= CATALOG_NIGHTLY_HOUR
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+_catalog: ProductCatalog | None = None
+_sync_task: asyncio.Task | None = None
+
+
+def get_catalog() -> ProductCatalog:
+    """Общий индекс процесса; при первом обращении поднимается с диска."""
+
+    global _catalog
+    if _catalog is None:
+        _catalog = ProductCatalog()
+        _catalog.load()
+    return _catalog
+
+
+async def _catalog_sync_loop(client: OzonClient | None, interval: timedelta) -> None:
+    catalog = get_catalog()
+    while True:
+        try:
+            await catalog.sync(client or get_client(), full=catalog.full_sync_due())
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("Catalog sync failed: %s", exc)
+        await asyncio.sleep(interval.total_seconds())
+
+
+def start_catalog_sync(
+    client: OzonClient | None = None, interval: timedelta = CATALOG_DELTA_INTERVAL
+) -> asyncio.Task:
+    """Запустить фоновую синхронизацию каталога (ночная полная + дельты)."""
+
+    global _sync_task
+    if _sync_task and not _sync_task.done():
+        return _sync_task
+    logger.info("Catalog sync started: interval=%ss", int(interval.total_seconds()))
+    _sync_task = asyncio.create_task(_catalog_sync_loop(client, interval))
+    return _sync_task
+
+
+async def stop_catalog_sync() -> None:
+    global _sync_task
+    task = _sync_task
+    _sync_task = None
+    if task and not task.done():
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+
+
+__all__ = [
+    "CatalogProduct",
+    "ProductCatalog",
+    "get_catalog",
+    "start_catalog_sync",
+    "stop_catalog_sync",
+]
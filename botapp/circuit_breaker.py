@@ -0,0 +1,111 @@
+# botapp/circuit_breaker.py
+"""Circuit breaker для семейств методов Ozon.
+
+closed → (failure_threshold неудач подряд) → open: вызовы сразу падают с
+``CircuitOpenError``, не занимая соединения и не дожидаясь таймаута.
+Через *reset_timeout* — half-open: пропускаем по одной пробе; после
+*success_threshold* успешных проб снова closed, любая неудача — снова open.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from datetime import timedelta
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Семейство методов временно отключено: Ozon не отвечает."""
+
+    def __init__(self, name: str, retry_in: float) -> None:
+        super().__init__(f"Ozon {name} недоступен, повтор через {retry_in:.0f} с")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int = 5,
+        reset_timeout: timedelta = timedelta(seconds=30),
+        success_threshold: int = 2,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_timeout = reset_timeout.total_seconds()
+        self.success_threshold = max(success_threshold, 1)
+        self.state = CLOSED
+        self._failures = 0
+        self._successes = 0
+        self._opened_at = 0.0
+        self._probe_inflight = False
+        self.opened = 0
+        self.rejected = 0
+
+    def before_call(self) -> None:
+        """Пропустить вызов или сразу бросить ``CircuitOpenError``."""
+
+        if self.state == OPEN:
+            retry_in = self._opened_at + self.reset_timeout - time.monotonic()
+            if retry_in > 0:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, retry_in)
+            self.state = HALF_OPEN
+            self._successes = 0
+            logger.info("Circuit %s half-open: probing Ozon", self.name)
+        if self.state == HALF_OPEN:
+            if self._probe_inflight:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, self.reset_timeout)
+            self._probe_inflight = True
+
+    def record_success(self) -> None:
+        self._probe_inflight = False
+        if self.state == HALF_OPEN:
+            self._successes += 1
+            if self._successes >= self.success_threshold:
+                self.state = CLOSED
+                self._failures = 0
+                logger.info("Circuit %s closed: Ozon recovered", self.name)
+            return
+        self._failures = 0
+
+    def record_failure(self) -> None:
+        self._probe_inflight = False
+        self._failures += 1
+        if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.opened += 1
+                logger.warning(
+                    "Circuit %s open after %s failures; failing fast for %.0fs",
+                    self.name,
+                    self._failures,
+                    self.reset_timeout,
+                )
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Вызов отменён, не дождавшись ответа: освободить слот пробы."""
+
+        self._probe_inflight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self._failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+__all__ = ["CircuitBreaker", "CircuitOpenError", "CLOSED", "OPEN", "HALF_OPEN"]
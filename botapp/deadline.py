@@ -0,0 +1,112 @@
+# botapp/deadline.py
+"""Дедлайны запросов: бюджет времени от хендлера Telegram до вызова Ozon.
+
+Хендлер открывает :func:`deadline_scope`; всё, что вызывается внутри
+(``fetch_recent_reviews`` → ``get_reviews`` → ``OzonClient.post``), видит
+тот же :class:`Deadline` через :func:`current_deadline` или получает его
+явным аргументом ``deadline=``. Сам HTTP-вызов идёт с таймаутом метода и
+бюджетом не ограничивается: ``OzonClient.post`` запускает его через
+:func:`spawn_detached` (одинаковые запросы склеиваются в одну задачу), а
+каждый вызывающий ждёт результат через ``within(shield(task), deadline)``.
+Истёк бюджет — ждать перестаёт только он; запрос дорабатывает для остальных
+и отменяется, лишь когда ожидающих не осталось.
+Необязательная работа (например, подтягивание названий товаров) при
+нехватке бюджета откладывается.
+
+Фоновые задачи, которые не должны обрываться вместе с запросом
+пользователя, запускаются через :func:`spawn_detached`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Coroutine, Iterator, TypeVar
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(TimeoutError):
+    """Бюджет времени запроса исчерпан."""
+
+
+class Deadline:
+    __slots__ = ("expires_at",)
+
+    def __init__(self, expires_at: float) -> None:
+        self.expires_at = expires_at  # time.monotonic()
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        return cls(time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self) -> None:
+        if self.expired:
+            raise DeadlineExceeded("Бюджет времени запроса исчерпан")
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.2f}s)"
+
+
+_current: contextvars.ContextVar[Deadline | None] = contextvars.ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Deadline | None:
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(seconds: float) -> Iterator[Deadline]:
+    """Ограничить вложенный код *seconds* секундами (внешний дедлайн не продлевается)."""
+
+    deadline = Deadline.after(seconds)
+    outer = _current.get()
+    if outer is not None and outer.expires_at < deadline.expires_at:
+        deadline = outer
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+async def within(aw: Awaitable[T], deadline: Deadline | None) -> T:
+    """Дождаться *aw*, но не дольше дедлайна (``None`` — без ограничения)."""
+
+    if deadline is None:
+        return await aw
+    if deadline.expired:
+        if asyncio.iscoroutine(aw):
+            aw.close()  # не ждём — закрываем, чтобы не было «never awaited»
+        raise DeadlineExceeded("Бюджет времени запроса исчерпан")
+    try:
+        return await asyncio.wait_for(aw, deadline.remaining())
+    except asyncio.TimeoutError as exc:
+        raise DeadlineExceeded("Бюджет времени запроса исчерпан") from exc
+
+
+def spawn_detached(coro: Coroutine[Any, Any, T]) -> "asyncio.Task[T]":
+    """Запустить задачу вне дедлайна текущего запроса."""
+
+    ctx = contextvars.copy_context()
+    ctx.run(_current.set, None)
+    return ctx.run(asyncio.ensure_future, coro)
+
+
+__all__ = [
+    "Deadline",
+    "DeadlineExceeded",
+    "current_deadline",
+    "deadline_scope",
+    "spawn_detached",
+    "within",
+]
@@ -1,6 +1,7 @@
 # botapp/finance.py
 from __future__ import annotations
 
+import logging
 from typing import Dict, Any
 
 from .ozon_client import (
@@ -11,8 +12,12 @@ from .ozon_client import (
     msk_current_month_range,
     msk_today_range,
     s_num,
+    stale_note,
+    track_stale,
 )
 
+logger = logging.getLogger(__name__)
+
 
 def _sales_from_totals(t: Dict[str, Any]) -> float:
     # как в JS: продажи = начислено за продажи – возвраты/отмены
@@ -50,7 +55,12 @@ def _accrued_from_totals(t: Dict[str, Any]) -> float:
 async def get_finance_today_text(client: OzonClient | None = None) -> str:
     client = client or get_client()
     since, to, pretty = msk_today_range()
-    totals = await client.get_finance_totals(since, to)
+    try:
+        with track_stale() as stale:
+            totals = await client.get_finance_totals(since, to)
+    except Exception:
+        logger.exception("Failed to fetch finance totals")
+        return "⚠️ Не удалось получить финансы из Ozon. Попробуйте позже."
 
     accrued = _accrued_from_totals(totals)
     sales = _sales_from_totals(totals)
@@ -64,13 +74,19 @@ async def get_finance_today_text(client: OzonClient | None = None) -> str:
         f"🛒 Продажи:   {fmt_rub0(sales)}\n"
         f"💸 Расходы:   {fmt_rub0(expenses)}\n"
         f"📈 Прибыль до себестоимости: {fmt_rub0(profit)}"
+        f"{stale_note(stale.at)}"
     )
 
 
 async def get_finance_month_summary_text(client: OzonClient | None = None) -> str:
     client = client or get_client()
     since, to, pretty = msk_current_month_range()
-    totals = await client.get_finance_totals(since, to)
+    try:
+        with track_stale() as stale:
+            totals = await client.get_finance_totals(since, to)
+    except Exception:
+        logger.exception("Failed to fetch finance totals")
+        return "⚠️ Не удалось получить финансы из Ozon. Попробуйте позже."
 
     accrued = _accrued_from_totals(totals)
     sales = _sales_from_totals(totals)
@@ -84,4 +100,5 @@ async def get_finance_month_summary_text(client: OzonClient | None = None) -> st
         f"🛒 Продажи:   {fmt_rub0(sales)}\n"
         f"💸 Расходы:   {fmt_rub0(expenses)}\n"
         f"📈 Прибыль до себестоимости: {fmt_rub0(profit)}"
+        f"{stale_note(stale.at)}"
     )
@@ -0,0 +1,117 @@
+# botapp/json_codec.py
+"""Быстрый JSON для ответов Ozon и Telegram с подключаемым бэкендом.
+
+Бэкенд выбирается один раз при импорте: ``orjson``, затем ``msgspec``,
+затем стандартный ``json``. Принудительно — переменной ``JSON_BACKEND``
+(``orjson`` / ``msgspec`` / ``stdlib``). :func:`loads` принимает байты
+ответа как есть, без промежуточного декодирования в ``str``.
+"""
+
+from __future__ import annotations
+
+import json as _stdlib_json
+import logging
+import os
+from typing import Any, Callable, List
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - необязательная зависимость
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - необязательная зависимость
+    msgspec = None  # type: ignore[assignment]
+
+
+def _available_backends() -> List[str]:
+    names = []
+    if orjson is not None:
+        names.append("orjson")
+    if msgspec is not None:
+        names.append("msgspec")
+    names.append("stdlib")
+    return names
+
+
+def _pick_backend() -> str:
+    wanted = (os.getenv("JSON_BACKEND") or "auto").lower()
+    available = _available_backends()
+    if wanted == "auto":
+        return available[0]
+    if wanted not in available:
+        logger.warning("JSON_BACKEND=%s is not installed, using %s", wanted, available[0])
+        return available[0]
+    return wanted
+
+
+def _codec(backend: str) -> tuple[Callable[[bytes | str], Any], Callable[..., bytes]]:
+    """Пара (loads, dumps в байты) для *backend*."""
+
+    if backend == "orjson":
+
+        def _dumps(obj: Any, *, sort_keys: bool = False) -> bytes:
+            option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+            return orjson.dumps(obj, default=str, option=option)
+
+        return orjson.loads, _dumps
+
+    if backend == "msgspec":
+        decoder = msgspec.json.Decoder()
+
+        def _loads(data: bytes | str) -> Any:
+            try:
+                return decoder.decode(data)
+            except msgspec.DecodeError as exc:
+                # вызывающий код ловит ValueError, как у json и orjson
+                raise ValueError(str(exc)) from exc
+
+        encoder = msgspec.json.Encoder(enc_hook=str)
+        sorted_encoder = msgspec.json.Encoder(enc_hook=str, order="sorted")
+
+        def _dumps(obj: Any, *, sort_keys: bool = False) -> bytes:
+            return (sorted_encoder if sort_keys else encoder).encode(obj)
+
+        return _loads, _dumps
+
+    def _dumps(obj: Any, *, sort_keys: bool = False) -> bytes:
+        return _stdlib_json.dumps(
+            obj, ensure_ascii=False, sort_keys=sort_keys, separators=(",", ":"), default=str
+        ).encode()
+
+    return _stdlib_json.loads, _dumps
+
+
+BACKEND = _pick_backend()
+_loads, _dumps_bytes = _codec(BACKEND)
+
+
+def loads(data: bytes | bytearray | memoryview | str) -> Any:
+    """Разобрать JSON из байтов ответа (или строки)."""
+
+    if isinstance(data, memoryview):
+        data = bytes(data)
+    return _loads(data)
+
+
+def dumps_bytes(obj: Any, *, sort_keys: bool = False) -> bytes:
+    """Компактный JSON в UTF-8; неизвестные типы сериализуются через ``str``."""
+
+    return _dumps_bytes(obj, sort_keys=sort_keys)
+
+
+def dumps(obj: Any, *, sort_keys: bool = False) -> str:
+    """То же, что :func:`dumps_bytes`, но строкой (нужно aiogram и ключам кэша)."""
+
+    return _dumps_bytes(obj, sort_keys=sort_keys).decode()
+
+
+__all__ = [
+    "BACKEND",
+    "dumps",
+    "dumps_bytes",
+    "loads",
+]
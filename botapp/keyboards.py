@@ -26,8 +26,12 @@ class MenuCallbackData(CallbackData, prefix="menu"):
     extra: Optional[str] = None
 
 
-class ReviewsCallbackData(CallbackData, prefix="reviews"):
-    """Callback для раздела отзывов."""
+class ReviewsCallbackData(CallbackData, prefix="rv"):
+    """Callback для раздела отзывов.
+
+    Префикс короткий: вместе с подписанным токеном отзыва (``review_id``)
+    callback должен уложиться в 64 байта Telegram.
+    """
 
     action: str
     category: Optional[str] = None
@@ -141,19 +145,29 @@ def reviews_navigation_keyboard(
 ) -> InlineKeyboardMarkup:
     """Клавиатура карточки отзыва (оставлена для обратной совместимости)."""
 
-    return review_card_keyboard(category=category, page=0, review_id=review_id)
+    return review_card_keyboard(category=category, page=0, review_id=review_id, index=index)
 
 
-def review_card_keyboard(*, category: str, page: int, review_id: str | None) -> InlineKeyboardMarkup:
-    """Кнопки под карточкой отзыва."""
+def review_card_keyboard(
+    *, category: str, page: int, review_id: str | None, index: int | None = None
+) -> InlineKeyboardMarkup:
+    """Кнопки под карточкой отзыва.
 
+    Без токена (*review_id* не влез в callback) отзыв передаётся индексом.
+    """
+
+    index = None if review_id else index
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [
                 InlineKeyboardButton(
                     text="✉️ Ответ через ИИ",
                     callback_data=ReviewsCallbackData(
-                        action="card_ai", category=category, page=page, review_id=review_id
+                        action="card_ai",
+                        category=category,
+                        index=index,
+                        page=page,
+                        review_id=review_id,
                     ).pack(),
                 )
             ],
@@ -161,7 +175,11 @@ def review_card_keyboard(*, category: str, page: int, review_id: str | None) ->
                 InlineKeyboardButton(
                     text="🔁 Пересобрать по моему промту",
                     callback_data=ReviewsCallbackData(
-                        action="card_reprompt", category=category, page=page, review_id=review_id
+                        action="card_reprompt",
+                        category=category,
+                        index=index,
+                        page=page,
+                        review_id=review_id,
                     ).pack(),
                 ),
             ],
@@ -169,7 +187,11 @@ def review_card_keyboard(*, category: str, page: int, review_id: str | None) ->
                 InlineKeyboardButton(
                     text="✏️ Ввести ответ вручную",
                     callback_data=ReviewsCallbackData(
-                        action="card_manual", category=category, page=page, review_id=review_id
+                        action="card_manual",
+                        category=category,
+                        index=index,
+                        page=page,
+                        review_id=review_id,
                     ).pack(),
                 ),
             ],
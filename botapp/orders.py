@@ -2,23 +2,52 @@
 
 from __future__ import annotations
 
-from collections import Counter
-from datetime import datetime
-from typing import Any, Dict, List, Tuple
-
+import asyncio
+import heapq
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, AsyncIterator, Dict, Iterable, List, Tuple
+
+from .catalog import ProductCatalog, get_catalog
+from .deadline import Deadline, DeadlineExceeded, current_deadline, spawn_detached, within
 from .ozon_client import (
+    MSK_SHIFT,
+    MSK_TZ,
     OzonClient,
+    _parse_iso,
     fmt_int,
     fmt_rub0,
     get_client,
+    msk_current_month_range,
+    msk_day_range,
     msk_today_range,
-    msk_yesterday_range,
     s_num,
+    stale_note,
+    track_stale,
+)
+from .posting_store import (
+    ROLLUP_TOTALS,
+    DayRollup,
+    SkuRollup,
+    get_posting_store,
+    iter_days,
+    msk_today,
 )
 
+logger = logging.getLogger(__name__)
 
 CANCELLED_STATUSES = {"cancelled"}
 RETURN_STATUSES = {"returned", "returned_to_seller", "client_refund"}
+# Сколько SKU держит потоковая сводка для топа (см. StreamingSummary)
+TOP_SKU_CAPACITY = 5000
+# Догрузка закрытых дней идёт в фоне: сколько дней качать одновременно и
+# сколько бюджета хендлера оставить на ответ тем, что уже сохранено
+BACKFILL_DAY_CONCURRENCY = 2
+BACKFILL_RESERVE = 1.0
+
+_backfills: Dict[str, asyncio.Task] = {}
 
 
 def _extract_amounts(posting: Dict[str, Any]) -> Tuple[float, float]:
@@ -47,75 +76,259 @@ def _extract_amounts(posting: Dict[str, Any]) -> Tuple[float, float]:
     return base_amount, payout
 
 
-def _summarize_postings(postings: List[Dict[str, Any]]) -> Dict[str, Any]:
-    total = len(postings)
-    cancelled_orders = 0
-    returns = 0
-    orders_without_cancel = 0
-    amount_ordered = 0.0
-    amount_without_cancel = 0.0
-    amount_cancelled = 0.0
+def _add_posting(rollup: DayRollup, p: Dict[str, Any], catalog: ProductCatalog) -> None:
+    """Учесть один заказ в агрегате (счётчики, суммы, SKU)."""
 
-    product_counter: Counter[str] = Counter()
-    product_names: Dict[str, str] = {}
+    status = (p.get("status") or "").lower()
+    base_amount, payout = _extract_amounts(p)
+    rollup.total += 1
+    rollup.amount_ordered += base_amount
 
-    for p in postings:
-        status = (p.get("status") or "").lower()
-        base_amount, payout = _extract_amounts(p)
-        amount_ordered += base_amount
-
-        products = p.get("products") or []
-        for prod in products:
-            qty = int(s_num(prod.get("quantity"))) or 0
-            if qty <= 0:
-                continue
-            offer = (
-                prod.get("offer_id")
-                or prod.get("sku")
-                or prod.get("product_id")
-                or prod.get("name")
-                or "?"
-            )
-            name = (
-                prod.get("name")
-                or prod.get("product_name")
-                or product_names.get(str(offer))
-                or ""
-            )
-            product_counter[str(offer)] += qty
-            if name:
-                product_names.setdefault(str(offer), str(name))
+    products = p.get("products") or []
+    for prod in products:
+        qty = int(s_num(prod.get("quantity"))) or 0
+        if qty <= 0:
+            continue
+        offer = (
+            prod.get("offer_id")
+            or prod.get("sku")
+            or prod.get("product_id")
+            or prod.get("name")
+            or "?"
+        )
+        name = (
+            prod.get("name")
+            or prod.get("product_name")
+            or catalog.name_for(prod.get("sku"))
+            or catalog.name_for(offer)
+            or ""
+        )
+        amount = s_num(prod.get("price") or prod.get("offer_price") or 0) * qty
+        rollup.add_sku(str(offer), qty, amount, str(name))
 
-        if status in CANCELLED_STATUSES:
-            cancelled_orders += 1
-            amount_cancelled += base_amount
-        else:
-            orders_without_cancel += 1
-            amount_without_cancel += payout or base_amount
+    if status in CANCELLED_STATUSES:
+        rollup.cancelled += 1
+        rollup.amount_cancelled += base_amount
+    else:
+        rollup.orders_without_cancel += 1
+        rollup.amount_without_cancel += payout or base_amount
 
-        if status in RETURN_STATUSES:
-            returns += 1
+    if status in RETURN_STATUSES:
+        rollup.returns += 1
 
-    avg_check = amount_without_cancel / orders_without_cancel if orders_without_cancel else 0
 
-    top3 = []
-    for idx, (offer, qty) in enumerate(product_counter.most_common(3), start=1):
-        name = product_names.get(offer, offer)
-        top3.append(f"{idx}) {name} — {fmt_int(qty)} шт")
+def _rollup_postings(postings: Iterable[Dict[str, Any]]) -> DayRollup:
+    """Свернуть заказы в аддитивный агрегат (счётчики, суммы, разбивка по SKU)."""
+
+    rollup = DayRollup()
+    catalog = get_catalog()
+    for p in postings:
+        _add_posting(rollup, p, catalog)
+    return rollup
+
+
+@dataclass
+class StreamingSummary(DayRollup):
+    """Агрегат для потока страниц: память не растёт с длиной периода.
+
+    Счётчики и суммы точные. SKU хранятся не больше *capacity* штук
+    (алгоритм Space-Saving на min-куче): новый SKU при заполнении вытесняет
+    самый редкий и наследует его счётчик. Для топа из нескольких позиций
+    при *capacity* в сотни ошибки на практике нет, а если различных SKU не
+    больше *capacity*, топ точный.
+    """
+
+    capacity: int = TOP_SKU_CAPACITY
+    _heap: List[Tuple[int, str]] = field(default_factory=list, repr=False)
+
+    def add_page(self, postings: Iterable[Dict[str, Any]]) -> None:
+        catalog = get_catalog()
+        for p in postings:
+            if isinstance(p, dict):
+                _add_posting(self, p, catalog)
+
+    def add_sku(self, sku: str, qty: int, amount: float, name: str = "") -> None:
+        item = self.skus.get(sku)
+        if item is None and len(self.skus) >= self.capacity:
+            evicted = self._pop_min()
+            item = self.skus[sku] = SkuRollup(qty=evicted.qty, amount=evicted.amount)
+        elif item is None:
+            item = self.skus[sku] = SkuRollup()
+        item.qty += qty
+        item.amount += amount
+        if name and not item.name:
+            item.name = name
+        heapq.heappush(self._heap, (item.qty, sku))
+        if len(self._heap) > 4 * self.capacity:
+            # Выбрасываем устаревшие записи кучи, чтобы она не росла
+            self._heap = [(i.qty, k) for k, i in self.skus.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self) -> SkuRollup:
+        while True:
+            qty, sku = heapq.heappop(self._heap)
+            item = self.skus.get(sku)
+            if item is not None and item.qty == qty:
+                return self.skus.pop(sku)
+
+    def to_rollup(self) -> DayRollup:
+        """Обычный :class:`DayRollup` с теми же итогами, без служебной кучи."""
+
+        rollup = DayRollup(skus=self.skus)
+        for name in ROLLUP_TOTALS:
+            setattr(rollup, name, getattr(self, name))
+        return rollup
+
+
+async def rollup_posting_stream(
+    pages: AsyncIterator[List[Dict[str, Any]]], *, day: date | None = None
+) -> DayRollup:
+    """Свернуть поток страниц в агрегат; с *day* — только заказы этого дня МСК.
+
+    Каждая страница учитывается и сразу отбрасывается.
+    """
+
+    summary = StreamingSummary()
+    async for page in pages:
+        if day is not None:
+            page = [p for p in page if isinstance(p, dict) and _posting_day(p) == day]
+        summary.add_page(page)
+    return summary.to_rollup()
+
+
+def _top_skus(rollup: DayRollup, count: int) -> List[str]:
+    # при равенстве — по ключу, чтобы топ не зависел от порядка загрузки дней
+    top = heapq.nsmallest(count, rollup.skus.items(), key=lambda kv: (-kv[1].qty, kv[0]))
+    return [
+        f"{idx}) {item.name or offer} — {fmt_int(item.qty)} шт"
+        for idx, (offer, item) in enumerate(top, start=1)
+    ]
 
+
+def _summarize_rollup(rollup: DayRollup, top: int = 3) -> Dict[str, Any]:
+    orders = rollup.orders_without_cancel
     return {
-        "total": total,
-        "cancelled": cancelled_orders,
-        "returns": returns,
-        "orders_without_cancel": orders_without_cancel,
-        "amount_ordered": amount_ordered,
-        "amount_without_cancel": amount_without_cancel,
-        "amount_cancelled": amount_cancelled,
-        "avg_check": avg_check,
-        "top3": top3,
+        "total": rollup.total,
+        "cancelled": rollup.cancelled,
+        "returns": rollup.returns,
+        "orders_without_cancel": orders,
+        "amount_ordered": rollup.amount_ordered,
+        "amount_without_cancel": rollup.amount_without_cancel,
+        "amount_cancelled": rollup.amount_cancelled,
+        "avg_check": rollup.amount_without_cancel / orders if orders else 0,
+        "top3": _top_skus(rollup, top),
     }
 
 
+def _summarize_postings(postings: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return _summarize_rollup(_rollup_postings(postings))
+
+
+def _posting_day(posting: Dict[str, Any]) -> date | None:
+    """День МСК, к которому относится заказ (по ``created_at``)."""
+
+    created = _parse_iso(posting.get("created_at") or posting.get("in_process_at"))
+    return created.astimezone(MSK_TZ).date() if created else None
+
+
+async def _backfill_days(client: OzonClient, days: List[date]) -> None:
+    """Догрузить закрытые дни (от новых к старым), сохраняя каждый сразу по готовности.
+
+    Работает вне дедлайна хендлера: месяц страниц при лимите Ozon на
+    ``/v2/posting/fbo/list`` в бюджет одного нажатия не укладывается, а
+    сохранённые дни не придётся качать снова. Ошибка останавливает только
+    своего воркера — недогруженные дни подхватит следующее нажатие.
+    """
+
+    store = get_posting_store()
+    queue = deque(sorted(days, reverse=True))
+
+    async def _worker() -> None:
+        while queue:
+            day = queue.popleft()
+            since, to, _ = msk_day_range(day)
+            try:
+                rollup = await rollup_posting_stream(client.iter_fbo_pages(since, to), day=day)
+            except Exception as exc:
+                logger.warning("FBO backfill of %s stopped: %s", day, exc)
+                return
+            store.put_day(client.client_id, day, rollup)
+
+    await asyncio.gather(*(_worker() for _ in range(min(BACKFILL_DAY_CONCURRENCY, len(queue)))))
+
+
+def _start_backfill(client: OzonClient, days: List[date]) -> asyncio.Task:
+    """Фоновая догрузка дней; одна на аккаунт — повторные нажатия ждут её же."""
+
+    account = str(client.client_id)
+    task = _backfills.get(account)
+    if task is None or task.done():
+        task = spawn_detached(_backfill_days(client, days))
+        _backfills[account] = task
+
+        def _forget(t: asyncio.Task) -> None:
+            if _backfills.get(account) is t:
+                del _backfills[account]
+
+        task.add_done_callback(_forget)
+    return task
+
+
+async def _period_rollups(client: OzonClient, first: date, last: date) -> Dict[date, DayRollup]:
+    """Агрегаты по дням [first, last]: закрытые дни — из posting_store, сегодня — живьём.
+
+    Недостающие закрытые дни догружаются в фоне (:func:`_start_backfill`);
+    их ждём, пока позволяет дедлайн хендлера, а потом отдаём то, что уже
+    сохранено. Дней, которые ещё не догрузились, в ответе нет.
+    """
+
+    store = get_posting_store()
+    account = client.client_id
+    today = msk_today()
+    closed_last = min(last, today - timedelta(days=1))
+    rollups = store.get_days(account, first, closed_last) if first <= closed_last else {}
+    missing = [day for day in iter_days(first, closed_last) if day not in rollups]
+
+    async def _wait_missing() -> None:
+        if not missing:
+            return
+        backfill = _start_backfill(client, missing)
+        deadline = current_deadline()
+        wait_deadline = Deadline(deadline.expires_at - BACKFILL_RESERVE) if deadline else None
+        try:
+            await within(asyncio.shield(backfill), wait_deadline)
+        except DeadlineExceeded:
+            logger.info("FBO backfill of %s day(s) continues in background", len(missing))
+
+    async def _load_today() -> DayRollup | None:
+        if not first <= today <= last:
+            return None
+        since, to, _ = msk_today_range()
+        # В кэше ответов лежит уже агрегат, а не список заказов дня
+        return await client.cached(
+            "/v2/posting/fbo/list",
+            ("rollup", since, to),
+            lambda: rollup_posting_stream(client.iter_fbo_pages(since, to)),
+        )
+
+    _, today_rollup = await asyncio.gather(_wait_missing(), _load_today())
+    if missing:
+        rollups.update(store.get_days(account, missing[0], missing[-1]))
+    if today_rollup is not None:
+        rollups[today] = today_rollup
+    return rollups
+
+
+def _pending_note(first: date, last: date, rollups: Dict[date, DayRollup]) -> str:
+    """Пометка о закрытых днях периода, которые ещё догружаются в фоне."""
+
+    closed_last = min(last, msk_today() - timedelta(days=1))
+    pending = sum(1 for day in iter_days(first, closed_last) if day not in rollups)
+    if not pending:
+        return ""
+    return f"\n\n⏳ Ещё догружаются дней: {fmt_int(pending)} — итоги неполные, повторите позже."
+
+
 def _fmt_delta(value: float) -> str:
     if value == 0:
         return "0"
@@ -124,26 +337,29 @@ def _fmt_delta(value: float) -> str:
 
 
 async def get_orders_today_text(client: OzonClient | None = None) -> str:
-    """Формирует расширенную сводку FBO за сегодня с дельтой к вчера."""
+    """Формирует расширенную сводку FBO за сегодня с дельтой к вчера.
+
+    Вчерашний день берётся из posting_store; живым запросом к Ozon идёт
+    только сегодняшний (вчерашний догружается в фоне, если его нет).
+    """
 
     client = client or get_client()
 
     try:
-        since, to, pretty_today = msk_today_range()
-        yesterday_since, yesterday_to, _ = msk_yesterday_range()
-        today_postings = await client.get_fbo_postings(since, to)
-        yesterday_postings = await client.get_fbo_postings(yesterday_since, yesterday_to)
+        _, _, pretty_today = msk_today_range()
+        today_date = msk_today()
+        yesterday_date = today_date - timedelta(days=1)
+        with track_stale() as stale:
+            rollups = await _period_rollups(client, yesterday_date, today_date)
     except Exception as e:
         return "⚠️ Не удалось получить сводку по FBO. Ошибка: %s" % e
 
-    safe_today = [p for p in today_postings if isinstance(p, dict)]
-    safe_yesterday = [p for p in yesterday_postings if isinstance(p, dict)]
+    today = _summarize_rollup(rollups.get(today_date) or DayRollup())
+    yesterday = _summarize_rollup(rollups.get(yesterday_date) or DayRollup())
+    pending = _pending_note(yesterday_date, today_date, rollups)
 
-    today = _summarize_postings(safe_today)
-    yesterday = _summarize_postings(safe_yesterday)
-
-    if not safe_today:
-        return f"📦 FBO • Сводка\n{pretty_today}\n\nЗаказов за сегодня нет."
+    if not today["total"]:
+        return f"📦 FBO • Сводка\n{pretty_today}\n\nЗаказов за сегодня нет.{stale_note(stale.at)}"
 
     delta_orders = today["total"] - yesterday.get("total", 0)
     delta_revenue = today["amount_without_cancel"] - yesterday.get(
@@ -165,16 +381,19 @@ async def get_orders_today_text(client: OzonClient | None = None) -> str:
     if today.get("orders_without_cancel"):
         lines.append(f"🧾 Средний чек (без отмен): {fmt_rub0(today['avg_check'])}")
 
-    lines.extend(
-        [
-            "",
-            "Δ к вчера",
-            f"• Заказы: {_fmt_delta(delta_orders)}",
-            f"• Выручка (без отмен): {_fmt_delta(delta_revenue)} ₽",
-        ]
-    )
+    if pending:
+        lines.extend(["", "Δ к вчера: данные за вчера ещё догружаются"])
+    else:
+        lines.extend(
+            [
+                "",
+                "Δ к вчера",
+                f"• Заказы: {_fmt_delta(delta_orders)}",
+                f"• Выручка (без отмен): {_fmt_delta(delta_revenue)} ₽",
+            ]
+        )
 
-    if today.get("orders_without_cancel"):
+    if today.get("orders_without_cancel") and not pending:
         if yesterday.get("orders_without_cancel"):
             lines.append(
                 f"🧾 Средний чек (без отмен): {_fmt_delta(delta_avg)} ₽"
@@ -189,4 +408,74 @@ async def get_orders_today_text(client: OzonClient | None = None) -> str:
         lines.append("Топ-3 товаров:")
         lines.extend(today["top3"])
 
-    return "\n".join(lines)
+    return "\n".join(lines) + stale_note(stale.at)
+
+
+async def get_orders_period_text(
+    first: date,
+    last: date,
+    pretty: str,
+    *,
+    title: str = "📦 FBO • Период",
+    client: OzonClient | None = None,
+    top: int = 5,
+) -> str:
+    """Сводка FBO за дни [first, last] из дневных агрегатов (неделя, месяц, квартал)."""
+
+    client = client or get_client()
+
+    try:
+        with track_stale() as stale:
+            rollups = await _period_rollups(client, first, last)
+    except Exception as e:
+        return "⚠️ Не удалось получить сводку по FBO. Ошибка: %s" % e
+
+    period = DayRollup()
+    for day in sorted(rollups):
+        period.merge(rollups[day])
+    summary = _summarize_rollup(period, top)
+    pending = _pending_note(first, last, rollups)
+
+    if not summary["total"]:
+        if pending:
+            return f"{title}\n{pretty}{pending}{stale_note(stale.at)}"
+        return f"{title}\n{pretty}\n\nЗаказов за период нет.{stale_note(stale.at)}"
+
+    lines = [
+        title,
+        pretty,
+        "",
+        f"📊 Заказано: {fmt_int(summary['total'])} / {fmt_rub0(summary['amount_ordered'])}",
+        f"✅ Без отмен: {fmt_int(summary['orders_without_cancel'])} / {fmt_rub0(summary['amount_without_cancel'])}",
+        f"❌ Отмен: {fmt_int(summary['cancelled'])} / {fmt_rub0(summary['amount_cancelled'])}",
+        f"🔁 Возвраты: {fmt_int(summary['returns'])} шт",
+    ]
+    if summary["orders_without_cancel"]:
+        lines.append(f"🧾 Средний чек (без отмен): {fmt_rub0(summary['avg_check'])}")
+
+    days_with_orders = [day for day in sorted(rollups) if rollups[day].total]
+    if days_with_orders:
+        lines.append("")
+        lines.append("По дням:")
+        for day in days_with_orders:
+            r = rollups[day]
+            lines.append(
+                f"• {day.strftime('%d.%m')} — {fmt_int(r.total)} / {fmt_rub0(r.amount_without_cancel)}"
+            )
+
+    if summary["top3"]:
+        lines.append("")
+        lines.append(f"Топ-{top} товаров:")
+        lines.extend(summary["top3"])
+
+    return "\n".join(lines) + pending + stale_note(stale.at)
+
+
+async def get_orders_month_text(client: OzonClient | None = None) -> str:
+    """Сводка FBO с 1-го числа текущего месяца по сегодня (МСК)."""
+
+    since, _, pretty = msk_current_month_range()
+    first = (_parse_iso(since) + MSK_SHIFT).date()
+    return await get_orders_period_text(
+        first, msk_today(), pretty, title="📦 FBO • Месяц", client=client
+    )
@@ -1,15 +1,26 @@
 # botapp/ozon_client.py
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
+import time
+from collections import deque
 from dataclasses import dataclass
 from datetime import datetime, timedelta, date, timezone
-from typing import Any, Dict, List, Tuple
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Hashable, List, Tuple
 
 import httpx
 from dotenv import load_dotenv
 
+from .product_cache import KIND_OFFER_ID, KIND_SKU, get_product_cache
+from .json_codec import dumps as json_dumps, loads as json_loads
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .deadline import Deadline, current_deadline, spawn_detached, within
+from .rate_limit import RateLimiter, backoff_delay, parse_retry_after
+from .response_cache import ResponseCache, track_stale
+from .transport import get_transport, share_with_seller_api
+
 try:  # ozonapi-async 0.19.x содержит seller_info, 0.1.0 — нет
     from ozonapi import SellerAPI
 except Exception:  # pragma: no cover - совместимость, если пакет не установлен
@@ -23,8 +34,72 @@ BASE_URL = "https://api-seller.ozon.ru"
 MSK_SHIFT = timedelta(hours=3)
 MSK_TZ = timezone(MSK_SHIFT)
 
-_product_name_cache: dict[str, str | None] = {}
-_product_not_found_warned: set[str] = set()
+# Лимиты (запросов в секунду, размер всплеска) на каждый метод Ozon.
+# Вызовы сверх лимита ждут своей очереди, а не падают с 429.
+OZON_RATE_LIMITS: dict[str, tuple[float, int]] = {
+    "/v1/review/list": (2.0, 4),
+    "/v2/posting/fbo/list": (2.0, 4),
+    "/v3/finance/transaction/totals": (2.0, 4),
+    "/v1/product/info": (10.0, 20),
+    "/v2/product/info": (10.0, 20),
+    "/v3/product/info/list": (5.0, 10),
+    "/v3/product/list": (5.0, 10),
+}
+OZON_DEFAULT_RATE_LIMIT: tuple[float, int] = (5.0, 10)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 4
+# Кэш ответов: (сколько ответ свежий, сколько ещё можно отдавать устаревшим,
+# обновляя в фоне). Данные продавца меняются редко, итоги дня — постоянно.
+OZON_RESPONSE_TTLS: dict[str, tuple[timedelta, timedelta]] = {
+    "/v1/seller/info": (timedelta(hours=6), timedelta(days=3)),
+    "/v3/finance/transaction/totals": (timedelta(seconds=60), timedelta(minutes=10)),
+    "/v2/posting/fbo/list": (timedelta(seconds=60), timedelta(minutes=10)),
+}
+# Circuit breaker на семейство методов: после N неудач подряд (таймауты,
+# 5xx/429 после всех ретраев) вызовы падают сразу, пробуем снова через паузу.
+OZON_ENDPOINT_FAMILIES: dict[str, str] = {
+    "/v1/review/": "reviews",
+    "/v2/posting/fbo/": "fbo",
+    "/v3/finance/": "finance",
+    "/v1/seller/": "seller",
+    "/v1/product/": "products",
+    "/v2/product/": "products",
+    "/v3/product/": "products",
+}
+# Таймаут одного HTTP-вызова по семейству методов (секунды). Дешёвые и
+# необязательные запросы не должны ждать столько же, сколько страница FBO.
+OZON_TIMEOUTS: dict[str, float] = {
+    "products": 5.0,
+    "seller": 10.0,
+    "finance": 15.0,
+    "reviews": 15.0,
+    "fbo": 30.0,
+}
+OZON_DEFAULT_TIMEOUT = 20.0
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = timedelta(seconds=30)
+# Поштучные пути за названием товара и задержка хеджирования (секунды):
+# если лучший путь молчит дольше, параллельно запускаются остальные.
+PRODUCT_INFO_PATHS = ("seller_api", "/v1/product/info", "/v2/product/info")
+PRODUCT_HEDGE_DELAY = 0.8
+PRODUCT_HEDGE_DELAY_MIN = 0.15
+PRODUCT_INFO_CHUNK = 200  # Ozon принимает до 1000 id, но мелкие чанки быстрее параллелятся
+PRODUCT_INFO_CONCURRENCY = 4
+# FBO за период: окно режется на шарды по FBO_SHARD_SPAN, шарды грузятся
+# параллельно; шард, упёршийся в лимит страницы, делится пополам. Окно
+# уже FBO_SHARD_MIN дочитывается по offset без ограничения числа страниц.
+FBO_PAGE_LIMIT = 1000
+FBO_SHARD_SPAN = timedelta(days=1)
+FBO_SHARD_MIN = timedelta(minutes=1)
+FBO_SHARD_CONCURRENCY = 4
+# Отзывы: окно режется на шарды по датам, каждый листается своим last_id,
+# шарды качаются параллельно и отдаются по порядку от новых к старым.
+REVIEW_SHARD_SPAN = timedelta(days=4)
+REVIEW_SHARD_CONCURRENCY = 4
+_SHARD_DONE = object()
+
+# Шард FBO: (начало, конец, offset); offset задан — окно читается постранично
+FboShard = Tuple[datetime, datetime, int | None]
 
 
 def _iso_z(dt: datetime) -> str:
@@ -40,6 +115,25 @@ def _ensure_utc(dt: datetime) -> datetime:
     return dt.replace(tzinfo=timezone.utc)
 
 
+def _parse_iso(value: Any) -> datetime | None:
+    """Разобрать ISO-время из ответа Ozon в aware UTC (``None`` — если не вышло)."""
+
+    if not value:
+        return None
+    try:
+        return _ensure_utc(datetime.fromisoformat(str(value).replace("Z", "+00:00")))
+    except ValueError:
+        return None
+
+
+def _split_period(since: datetime, to: datetime, parts: int) -> List[Tuple[datetime, datetime]]:
+    """Разбить [since, to] на *parts* равных окон (соседние делят границу)."""
+
+    step = (to - since) / max(parts, 1)
+    edges = [since + step * i for i in range(parts)] + [to]
+    return list(zip(edges, edges[1:]))
+
+
 def msk_today_range() -> Tuple[str, str, str]:
     """
     Диапазон на сегодня в МСК, но границы в UTC.
@@ -106,6 +200,15 @@ def msk_week_range() -> Tuple[str, str, str]:
     return _iso_z(start_utc), _iso_z(end_utc), pretty
 
 
+def msk_day_range(day: date) -> Tuple[str, str, str]:
+    """Границы календарного дня *day* по МСК (в UTC) и подпись."""
+
+    start_utc = datetime(day.year, day.month, day.day) - MSK_SHIFT
+    end_utc = datetime(day.year, day.month, day.day, 23, 59, 59) - MSK_SHIFT
+    pretty = f"{day.strftime('%d.%m.%Y')} 00:00 — {day.strftime('%d.%m.%Y')} 23:59 (МСК)"
+    return _iso_z(start_utc), _iso_z(end_utc), pretty
+
+
 def msk_yesterday_range() -> Tuple[str, str, str]:
     """Диапазон за вчера (МСК)."""
 
@@ -138,6 +241,14 @@ def s_num(x: Any) -> float:
         return 0.0
 
 
+def stale_note(at: datetime | None) -> str:
+    """Подпись к ответу, собранному из сохранённых данных (пусто, если данные свежие)."""
+
+    if at is None:
+        return ""
+    return f"\n\n⚠️ Ozon сейчас недоступен — данные на {at.astimezone(MSK_TZ).strftime('%H:%M')} (МСК)"
+
+
 def _env_credentials() -> tuple[str, str]:
     client_id = (os.getenv("OZON_CLIENT_ID") or "").strip()
     api_key = (os.getenv("OZON_API_KEY") or "").strip()
@@ -146,6 +257,30 @@ def _env_credentials() -> tuple[str, str]:
     return client_id, api_key
 
 
+def _extract_product_name(res: dict[str, Any] | None) -> str | None:
+    if not isinstance(res, dict):
+        return None
+    return str(
+        next(
+            (
+                v
+                for v in (
+                    res.get("name"),
+                    res.get("title"),
+                    res.get("product_name"),
+                    res.get("offer_id"),
+                )
+                if v not in (None, "")
+            ),
+            "",
+        )
+    ).strip() or None
+
+
+def _chunked(items: List[str], size: int) -> List[List[str]]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
 class OzonAPIError(RuntimeError):
     """Ошибка вызова Ozon API."""
 
@@ -154,6 +289,31 @@ class OzonProductNotFound(OzonAPIError):
     """Товар не найден (404)."""
 
 
+@dataclass
+class ProductPathStats:
+    """Как путь за названием товара работает для этого аккаунта."""
+
+    wins: int = 0
+    empty: int = 0
+    errors_in_row: int = 0
+    latency: float = 0.0  # EWMA времени ответа с названием, секунды
+
+    def record_win(self, seconds: float) -> None:
+        self.wins += 1
+        self.errors_in_row = 0
+        self.latency = seconds if self.wins == 1 else 0.8 * self.latency + 0.2 * seconds
+
+    def record_empty(self) -> None:
+        self.empty += 1
+        self.errors_in_row = 0
+
+    def record_error(self) -> None:
+        self.errors_in_row += 1
+
+    def rank(self) -> Tuple[int, int, float]:
+        return (self.errors_in_row, -self.wins, self.latency)
+
+
 @dataclass
 class OzonClient:
     client_id: str
@@ -162,19 +322,88 @@ class OzonClient:
     def __post_init__(self) -> None:
         # Используем явные абсолютные URL вместо base_url, чтобы исключить
         # ошибки склейки (в логах на проде виден вызов на корень `/`).
-        self._http_client = httpx.AsyncClient(
-            timeout=30.0,
-            headers={
-                "Client-Id": self.client_id,
-                "Api-Key": self.api_key,
-                "Content-Type": "application/json",
-                "Accept": "application/json",
-            },
-        )
+        # Пул соединений общий для процесса (см. transport.py), поэтому
+        # ключи передаются заголовками каждого запроса, а не клиента.
+        self._transport = get_transport(BASE_URL)
+        self._http_client = self._transport.client
+        self._auth_headers = {"Client-Id": self.client_id, "Api-Key": self.api_key}
         self._seller_api: SellerAPI | None = None
+        self._rate_limiter = RateLimiter(OZON_RATE_LIMITS, OZON_DEFAULT_RATE_LIMIT)
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self._coalesced: Dict[str, int] = {}
+        self._responses = ResponseCache(OZON_RESPONSE_TTLS)
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._product_path_stats: Dict[str, ProductPathStats] = {}
+
+    def rate_limit_stats(self) -> Dict[str, Dict[str, float]]:
+        """Счётчики ожидания и ретраев по каждому методу Ozon."""
+
+        return self._rate_limiter.snapshot()
+
+    @staticmethod
+    def _family(path: str) -> str:
+        return next(
+            (name for prefix, name in OZON_ENDPOINT_FAMILIES.items() if path.startswith(prefix)),
+            path,
+        )
+
+    def _breaker(self, path: str) -> CircuitBreaker:
+        family = self._family(path)
+        breaker = self._breakers.get(family)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                family,
+                failure_threshold=BREAKER_FAILURE_THRESHOLD,
+                reset_timeout=BREAKER_RESET_TIMEOUT,
+            )
+            self._breakers[family] = breaker
+        return breaker
+
+    def breaker_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: breaker.snapshot() for name, breaker in self._breakers.items()}
+
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Попадания/промахи кэша ответов по методам."""
+
+        return self._responses.snapshot()
+
+    def invalidate_cache(self, endpoint: str | None = None) -> int:
+        """Сбросить кэш ответов (целиком или одного метода, например "/v1/seller/info")."""
+
+        dropped = self._responses.invalidate(endpoint)
+        logger.info("Response cache invalidated: endpoint=%s dropped=%s", endpoint or "*", dropped)
+        return dropped
+
+    async def cached(self, endpoint: str, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Значение, посчитанное *loader* из ответов *endpoint*, через кэш ответов.
+
+        Для производных от ответа значений (например, агрегата заказов за
+        день): сроки и запасной ответ — по политике *endpoint*.
+        """
+
+        return await self._responses.get_or_load(endpoint, key, loader)
+
+    def coalesce_stats(self) -> Dict[str, Any]:
+        """Сколько вызовов к Ozon сэкономило склеивание одинаковых запросов."""
+
+        return {
+            "saved": sum(self._coalesced.values()),
+            "by_path": dict(self._coalesced),
+            "inflight": len(self._inflight),
+        }
+
+    async def prewarm(self) -> int:
+        """Заранее открыть соединения общего пула (вызывается при старте бота)."""
+
+        return await self._transport.prewarm()
 
     async def aclose(self) -> None:
-        await self._http_client.aclose()
+        self._responses.cancel()
+        for task in list(self._inflight.values()):
+            task.cancel()
+        if self._http_client is not self._transport.client:
+            await self._http_client.aclose()  # общий пул закрывает close_transports()
         if self._seller_api and hasattr(self._seller_api, "close"):
             try:
                 await self._seller_api.close()  # type: ignore[arg-type]
@@ -185,15 +414,77 @@ class OzonClient:
         if SellerAPI is None:
             return None
         if self._seller_api is None:
+            share_with_seller_api(self._transport)
             self._seller_api = SellerAPI(client_id=self.client_id, api_key=self.api_key)
         return self._seller_api
 
-    async def post(self, path: str, json: Dict[str, Any]) -> Dict[str, Any]:
+    async def post(
+        self, path: str, json: Dict[str, Any], *, deadline: Deadline | None = None
+    ) -> Dict[str, Any]:
+        """POST в Ozon с single-flight: одинаковые (path, тело) в полёте — один вызов.
+
+        Пока запрос с тем же методом и тем же каноническим JSON-телом ещё не
+        завершился, новые вызовы не идут в Ozon, а ждут его результат (или
+        ошибку). Ответ общий для всех ожидающих — его нельзя мутировать.
+
+        *deadline* (по умолчанию — дедлайн текущего хендлера) ограничивает
+        только ожидание этого вызова: по его истечении — ``DeadlineExceeded``.
+        Общий запрос к Ozon живёт по таймаутам метода, а не по бюджету того,
+        кто его начал, — иначе присоединившиеся унаследовали бы чужой дедлайн.
+        """
+
+        deadline = deadline or current_deadline()
+        if deadline is not None:
+            deadline.check()
+        suffix = path if path.startswith("/") else f"/{path}"
+        key = (suffix, json_dumps(json, sort_keys=True))
+        task = self._inflight.get(key)
+        if task is None:
+            task = spawn_detached(self._post_upstream(suffix, json))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._forget_inflight(key, t))
+        else:
+            self._coalesced[suffix] = self._coalesced.get(suffix, 0) + 1
+        # shield: отмена одного ожидающего не должна отменять запрос остальным;
+        # когда уходит последний ожидающий, сам запрос к Ozon тоже отменяем
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await within(asyncio.shield(task), deadline)
+        finally:
+            left = self._waiters.get(task, 1) - 1
+            if left > 0:
+                self._waiters[task] = left
+            else:
+                self._waiters.pop(task, None)
+                if not task.done():
+                    task.cancel()
+
+    def _forget_inflight(self, key: Tuple[str, str], task: asyncio.Task) -> None:
+        self._waiters.pop(task, None)
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # ошибку уже получили ожидающие; не даём asyncio ругаться
+
+    async def _post_upstream(self, suffix: str, json: Dict[str, Any]) -> Dict[str, Any]:
         # Формируем абсолютный URL вручную, чтобы в логах всегда была явная точка входа
         # (на Render фиксировали 404 на https://api-seller.ozon.ru/ без пути).
-        suffix = path if path.startswith("/") else f"/{path}"
         url = f"{BASE_URL}{suffix}"
-        r = await self._http_client.post(url, json=json)
+
+        breaker = self._breaker(suffix)
+        breaker.before_call()
+        try:
+            r = await self._send_with_retries(suffix, url, json)
+        except httpx.TransportError:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        if r.status_code in RETRY_STATUSES:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
 
         # Сначала проверяем статус, чтобы не пытаться парсить HTML/текст 404 как JSON
         try:
@@ -203,18 +494,45 @@ class OzonClient:
             raise
 
         try:
-            return r.json()
+            return json_loads(r.content)
         except Exception:
             text = await r.aread()
             logger.error("Ozon %s -> JSON decode failed: %r", url, text[:500])
             raise
 
+    async def _send_with_retries(self, suffix: str, url: str, json: Dict[str, Any]) -> httpx.Response:
+        timeout = OZON_TIMEOUTS.get(self._family(suffix), OZON_DEFAULT_TIMEOUT)
+        attempt = 0
+        while True:
+            await self._rate_limiter.acquire(suffix)
+            r = await self._http_client.post(url, json=json, headers=self._auth_headers, timeout=timeout)
+            if r.status_code not in RETRY_STATUSES or attempt >= MAX_RETRIES:
+                return r
+
+            retry_after = parse_retry_after(r.headers.get("Retry-After"))
+            delay = retry_after if retry_after is not None else backoff_delay(attempt)
+            self._rate_limiter.stats(suffix).retries += 1
+            logger.warning(
+                "Ozon %s -> HTTP %s, retry %s/%s in %.2fs",
+                url,
+                r.status_code,
+                attempt + 1,
+                MAX_RETRIES,
+                delay,
+            )
+            if r.status_code == 429:
+                # Останавливаем весь bucket метода: остальные вызовы тоже подождут
+                self._rate_limiter.throttle(suffix, delay)
+            else:
+                await asyncio.sleep(delay)
+            attempt += 1
+
     async def get(self, path: str, params: Dict[str, Any] | None = None) -> Dict[str, Any]:
         suffix = path if path.startswith("/") else f"/{path}"
         url = f"{BASE_URL}{suffix}"
-        r = await self._http_client.get(url, params=params)
+        r = await self._http_client.get(url, params=params, headers=self._auth_headers)
         try:
-            data = r.json()
+            data = json_loads(r.content)
         except Exception:
             text = await r.aread()
             logger.error("Ozon GET %s -> HTTP %s: %r", url, r.status_code, text[:500])
@@ -229,6 +547,15 @@ class OzonClient:
 
     async def get_finance_totals(
         self, date_from_iso: str, date_to_iso: str
+    ) -> Dict[str, Any]:
+        return await self._responses.get_or_load(
+            "/v3/finance/transaction/totals",
+            (date_from_iso, date_to_iso),
+            lambda: self._fetch_finance_totals(date_from_iso, date_to_iso),
+        )
+
+    async def _fetch_finance_totals(
+        self, date_from_iso: str, date_to_iso: str
     ) -> Dict[str, Any]:
         body = {
             "date": {"from": date_from_iso, "to": date_to_iso},
@@ -240,48 +567,144 @@ class OzonClient:
 
     # ---------- FBO заказы ----------
 
-    async def get_fbo_postings(
+    async def iter_fbo_pages(
         self, date_from_iso: str, date_to_iso: str
-    ) -> List[Dict[str, Any]]:
-        """Полная выборка FBO-заказов за период через прямой REST с пагинацией."""
-        postings: List[Dict[str, Any]] = []
-        limit = 1000
-        offset = 0
-
-        for _ in range(60):
-            body = {
-                "dir": "DESC",
-                "limit": limit,
-                "offset": offset,
-                "filter": {"since": date_from_iso, "to": date_to_iso},
-                "with": {"analytics_data": True, "financial_data": True, "legal_info": False},
-            }
-            page = await self.post("/v2/posting/fbo/list", body)
-            if not isinstance(page, dict):
-                logger.error("Unexpected FBO response: %r", page)
-                break
-
-            result = page.get("result")
-            if isinstance(result, list):
-                # Некоторые ответы приходят списком — явно приводим к словарю
-                items = result
-            elif isinstance(result, dict):
-                items = result.get("postings") or result.get("items") or []
-            else:
-                items = []
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Потоково отдавать страницы FBO-заказов за период, параллельно по шардам времени.
+
+        Окно режется на шарды по ``FBO_SHARD_SPAN``; одновременно грузится не
+        больше ``FBO_SHARD_CONCURRENCY`` страниц, и следующая запрашивается,
+        только когда готовая забрана, — поэтому память ограничена несколькими
+        страницами, а не периодом. Шард, упёршийся в лимит страницы, делится
+        (см. :meth:`_fetch_fbo_shard`). Порядок страниц не гарантирован.
+
+        Соседние шарды делят граничную секунду (а остаток после полной
+        страницы — секунду её самого старого заказа), поэтому дубли возможны
+        только у заказов, созданных в такие секунды: помним номера лишь их.
+        """
 
-            if not items:
-                break
-            postings.extend(i for i in items if isinstance(i, dict))
-            if len(items) < limit:
-                break
-            offset += limit
+        since = _parse_iso(date_from_iso)
+        to = _parse_iso(date_to_iso)
+        if since is None or to is None or to <= since:
+            offset = 0
+            while True:
+                items = await self._fbo_page(date_from_iso, date_to_iso, offset)
+                if items:
+                    yield items
+                if len(items) < FBO_PAGE_LIMIT:
+                    return
+                offset += FBO_PAGE_LIMIT
+
+        parts = max(1, -(-(to - since) // FBO_SHARD_SPAN))
+        queue: Deque[FboShard] = deque((a, b, None) for a, b in _split_period(since, to, parts))
+        edges = {_parse_iso(_iso_z(edge)) for a, b, _ in queue for edge in (a, b)}
+        edge_seen: set[str] = set()
+        running: set[asyncio.Task] = set()
+        shards = len(queue)
+        try:
+            while queue or running:
+                while queue and len(running) < FBO_SHARD_CONCURRENCY:
+                    running.add(asyncio.ensure_future(self._fetch_fbo_shard(*queue.popleft())))
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                # Исключения забираем у всех завершённых шардов, а не у первого
+                # упавшего, иначе asyncio ругается "exception was never retrieved"
+                errors = [task.exception() for task in done if task.exception() is not None]
+                if errors:
+                    for task in running:
+                        task.cancel()
+                    await asyncio.gather(*running, return_exceptions=True)
+                    raise errors[0]
+                for task in done:
+                    items, subshards = task.result()
+                    queue.extend(subshards)
+                    shards += len(subshards)
+                    for a, b, offset in subshards:
+                        if offset is None:
+                            # b - 1 с: секунда oldest, если b — округлённый вверх верх остатка
+                            edges.update(
+                                _parse_iso(_iso_z(edge)) for edge in (a, b, b - timedelta(seconds=1))
+                            )
+                    page = []
+                    for item in items:
+                        created = _parse_iso(item.get("created_at"))
+                        number = item.get("posting_number")
+                        if number and created is not None and created.replace(microsecond=0) in edges:
+                            if number in edge_seen:
+                                continue
+                            edge_seen.add(number)
+                        page.append(item)
+                    if page:
+                        yield page
+        finally:
+            for task in running:
+                task.cancel()
+        logger.debug("FBO %s..%s: %s shard(s)", date_from_iso, date_to_iso, shards)
+
+    async def _fetch_fbo_shard(
+        self, since: datetime, to: datetime, offset: int | None = None
+    ) -> Tuple[List[Dict[str, Any]], List[FboShard]]:
+        """Одна страница шарда и шарды, которые ещё надо догрузить.
+
+        Ответ идёт от новых к старым, поэтому полная страница покрывает хвост
+        окна: догружать нужно только [since, самый старый заказ страницы],
+        и это окно делится пополам. Окно уже ``FBO_SHARD_MIN`` (или такое,
+        которое не удалось сузить) читается по offset, страница за страницей.
+        """
 
-        return postings
+        since_iso, to_iso = _iso_z(since), _iso_z(to)
+        if offset is None and to - since <= FBO_SHARD_MIN:
+            offset = 0
+        items = await self._fbo_page(since_iso, to_iso, offset or 0)
+        if len(items) < FBO_PAGE_LIMIT:
+            return items, []
+        if offset is not None:
+            return items, [(since, to, offset + FBO_PAGE_LIMIT)]
+
+        oldest = min(
+            (dt for dt in (_parse_iso(i.get("created_at")) for i in items) if dt is not None),
+            default=None,
+        )
+        # Границы уходят в Ozon с точностью до секунды (_iso_z), а created_at —
+        # с миллисекундами: верх остатка округляем вверх, иначе заказы той же
+        # секунды, что oldest, но чуть раньше него, не попадут ни в один шард.
+        # Перекрытие в секунду oldest снимает дедуп в iter_fbo_pages.
+        upper = oldest.replace(microsecond=0) + timedelta(seconds=1) if oldest else None
+        if upper is None or not since < upper < to:
+            # Сузить окно не вышло: половинки перечитают его целиком, страницу не отдаём
+            return [], [(a, b, None) for a, b in _split_period(since, to, 2)]
+        return items, [(a, b, None) for a, b in _split_period(since, upper, 2)]
+
+    async def _fbo_page(self, date_from_iso: str, date_to_iso: str, offset: int) -> List[Dict[str, Any]]:
+        body = {
+            "dir": "DESC",
+            "limit": FBO_PAGE_LIMIT,
+            "offset": offset,
+            "filter": {"since": date_from_iso, "to": date_to_iso},
+            "with": {"analytics_data": True, "financial_data": True, "legal_info": False},
+        }
+        page = await self.post("/v2/posting/fbo/list", body)
+        if not isinstance(page, dict):
+            logger.error("Unexpected FBO response: %r", page)
+            return []
+
+        result = page.get("result")
+        if isinstance(result, list):
+            # Некоторые ответы приходят списком — явно приводим к словарю
+            items = result
+        elif isinstance(result, dict):
+            items = result.get("postings") or result.get("items") or []
+        else:
+            items = []
+        return [i for i in items if isinstance(i, dict)]
 
     # ---------- Аккаунт ----------
 
     async def get_seller_info(self) -> Dict[str, Any]:
+        """Информация о продавце (через кэш ответов: меняется редко)."""
+
+        return await self._responses.get_or_load("/v1/seller/info", None, self._fetch_seller_info)
+
+    async def _fetch_seller_info(self) -> Dict[str, Any]:
         """Получить информацию о продавце через SellerAPI /v1/seller/info."""
 
         api = self._get_seller_api()
@@ -320,22 +743,32 @@ class OzonClient:
 
     # ---------- Отзывы ----------
 
-    async def get_reviews(
+    async def iter_review_pages(
         self,
         date_from: datetime,
         date_to: datetime,
         *,
         limit_per_page: int = 80,
         max_count: int | None = 200,
-    ) -> List[Dict[str, Any]]:
+        deadline: Deadline | None = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
         """
-        Загрузить отзывы через /v1/review/list с корректной пагинацией по last_id.
-
-        ВАЖНО:
-        - Ozon ожидает поля `date_from` и `date_to` в корне тела запроса, а не
-          `filter.date.{from,to}`.
-        - Пагинация делается по `last_id` + `has_next`. Offset используем не будем,
-          чтобы не застревать на старых отзывах.
+        Потоково отдавать страницы /v1/review/list, от новых отзывов к старым.
+
+        Первая страница запрашивается на всё окно: если отзывов мало, на этом
+        всё. Дальше шарды по датам имеют смысл, только когда темп упирается в
+        задержку ответа Ozon, а не в token bucket метода: при лимите 2 запроса
+        в секунду и ответе быстрее 0.5 с последовательное листание уже выбирает
+        весь лимит, а шарды лишь добавляют запросов. Поэтому число параллельных
+        шардов — ``rate × время первого ответа`` (не больше
+        ``REVIEW_SHARD_CONCURRENCY``); если выходит один, листаем дальше тем же
+        курсором. Иначе остаток окна (до самого старого отзыва страницы) режется
+        на шарды — не шире ``REVIEW_SHARD_SPAN`` и не больше, чем ожидается
+        страниц по плотности первой. Шард держит наготове не больше одной
+        страницы и листает, пока он вместе с более новыми шардами не набрал
+        ``max_count``: старые шарды не отнимают остаток у новых, поэтому
+        приходят именно последние N отзывов. Страницы отдаются в порядке
+        шардов, дубли на стыках отбрасываются по id отзыва.
         """
 
         safe_limit = max(20, min(limit_per_page, 100))
@@ -344,73 +777,209 @@ class OzonClient:
         date_from_utc = _ensure_utc(date_from)
         date_to_utc = _ensure_utc(date_to)
 
-        reviews: List[Dict[str, Any]] = []
-        last_id: str | None = None
+        fetched = 0
         pages = 0
-
-        while len(reviews) < max_reviews:
-            body: Dict[str, Any] = {
-                "date_from": _iso_z(date_from_utc),
-                "date_to": _iso_z(date_to_utc),
-                "limit": safe_limit,
-            }
-
-            # Ozon поддерживает пагинацию через last_id + has_next.
-            # Если last_id уже получен, продолжаем с него.
-            if last_id:
-                body["last_id"] = last_id
-
-            data = await self.post("/v1/review/list", body)
-            if not isinstance(data, dict):
-                logger.error("Unexpected reviews response: %r", data)
-                break
-
-            res = data.get("result") or data
-            if isinstance(res, dict):
-                arr = res.get("reviews") or res.get("feedbacks") or res.get("items") or []
-                has_next = bool(res.get("has_next") or res.get("hasNext"))
-                next_last_id = res.get("last_id") or res.get("lastId")
-            elif isinstance(res, list):
-                arr = res
-                has_next = False
-                next_last_id = None
-            else:
-                logger.error("Unexpected reviews result payload: %r", res)
-                break
-
-            if not isinstance(arr, list):
-                logger.error("Unexpected reviews array type: %r", arr)
-                break
-
-            page_items = [x for x in arr if isinstance(x, dict)]
-            if not page_items:
-                # Пустая страница — выходим
-                break
-
-            reviews.extend(page_items)
+        seen: set[str] = set()
+
+        def _fresh(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            page_items = []
+            for review in items:
+                review_id = review.get("id")
+                if review_id is not None:
+                    if str(review_id) in seen:
+                        continue
+                    seen.add(str(review_id))
+                page_items.append(review)
+            return page_items[: max_reviews - fetched]
+
+        started = time.monotonic()
+        first, has_next, next_last_id = await self._review_page(
+            date_from_utc, date_to_utc, safe_limit, None, deadline
+        )
+        latency = time.monotonic() - started
+        page_items = _fresh(first)
+        if page_items:
+            fetched += len(page_items)
             pages += 1
+            yield page_items
+
+        shards: List[Tuple[datetime, datetime, str | None]] = []
+        concurrency = 1
+        if page_items and has_next and next_last_id and fetched < max_reviews:
+            rate = self._rate_limiter.bucket("/v1/review/list").rate
+            concurrency = max(1, min(REVIEW_SHARD_CONCURRENCY, int(rate * latency)))
+            dates = (_parse_iso(r.get("published_at") or r.get("created_at")) for r in first)
+            oldest = min((dt for dt in dates if dt is not None), default=None)
+            # Фильтр дат Ozon — с точностью до секунды (_iso_z): верх остатка
+            # округляем вверх, чтобы не потерять отзывы секунды oldest
+            upper = oldest.replace(microsecond=0) + timedelta(seconds=1) if oldest else None
+            parts = 1
+            if concurrency > 1 and upper is not None and date_from_utc < upper < date_to_utc:
+                remaining = upper - date_from_utc
+                per_page = max(date_to_utc - upper, timedelta(seconds=1))
+                parts = max(1, min(-(-remaining // REVIEW_SHARD_SPAN), -(-remaining // per_page)))
+            if parts == 1:
+                # Дробить нечего (или незачем) — листаем дальше тем же курсором
+                shards = [(date_from_utc, date_to_utc, str(next_last_id))]
+            else:
+                windows = _split_period(date_from_utc, upper, parts)[::-1]  # новые первыми
+                shards = [(since, to, None) for since, to in windows]
 
-            if len(reviews) >= max_reviews:
-                break
+        semaphore = asyncio.Semaphore(concurrency)
+        requested = [0] * len(shards)  # сколько отзывов запросил каждый шард
+        # Шард, остановленный бюджетом, а не концом окна: (since, to, last_id)
+        tails: List[Tuple[datetime, datetime, str | None] | None] = [None] * len(shards)
 
-            if has_next and next_last_id:
-                # Нормальная пагинация по last_id
-                last_id = str(next_last_id)
-                continue
+        async def _shard_worker(
+            index: int, since: datetime, to: datetime, last_id: str | None, queue: asyncio.Queue
+        ) -> None:
+            """Пролистать один шард, складывая страницы в *queue* (в конце — маркер)."""
 
-            # has_next == False или нет last_id — дальше страниц нет
-            break
+            try:
+                async with semaphore:
+                    while True:
+                        # Более старые шарды в счёт не идут: их отзывы нужны,
+                        # только если новых не хватит до max_count
+                        if len(first) + sum(requested[: index + 1]) >= max_reviews:
+                            tails[index] = (since, to, last_id)
+                            break
+                        items, more, next_id = await self._review_page(
+                            since, to, safe_limit, last_id, deadline
+                        )
+                        if not items:
+                            break
+                        requested[index] += len(items)
+                        await queue.put(items)
+                        if not (more and next_id):
+                            break
+                        last_id = str(next_id)
+            except Exception as exc:
+                await queue.put(exc)
+            await queue.put(_SHARD_DONE)
+
+        queues: List[asyncio.Queue] = [asyncio.Queue(maxsize=1) for _ in shards]
+        workers = [
+            asyncio.ensure_future(_shard_worker(index, since, to, last_id, queue))
+            for index, ((since, to, last_id), queue) in enumerate(zip(shards, queues))
+        ]
+        try:
+            for index, queue in enumerate(queues):
+                while fetched < max_reviews:
+                    item = await queue.get()
+                    if item is _SHARD_DONE:
+                        break
+                    if isinstance(item, BaseException):
+                        raise item
+                    page_items = _fresh(item)
+                    if not page_items:
+                        continue
+                    fetched += len(page_items)
+                    pages += 1
+                    yield page_items
+                tail = tails[index]
+                while tail is not None and fetched < max_reviews:
+                    # Бюджет шарда съели дубли на стыках — дочитываем его здесь,
+                    # иначе перед более старыми шардами осталась бы дыра
+                    since, to, last_id = tail
+                    items, more, next_id = await self._review_page(
+                        since, to, safe_limit, last_id, deadline
+                    )
+                    tail = (since, to, str(next_id)) if items and more and next_id else None
+                    page_items = _fresh(items)
+                    if page_items:
+                        fetched += len(page_items)
+                        pages += 1
+                        yield page_items
+                if fetched >= max_reviews:
+                    break
+        finally:
+            for worker in workers:
+                worker.cancel()
 
         logger.info(
-            "Reviews fetched: %s items for %s..%s limit=%s pages=%s max=%s",
-            len(reviews),
+            "Reviews fetched: %s items for %s..%s limit=%s pages=%s shards=%s concurrency=%s max=%s",
+            fetched,
             _iso_z(date_from_utc),
             _iso_z(date_to_utc),
             safe_limit,
             pages,
+            len(shards),
+            concurrency,
             max_count,
         )
-        return reviews[:max_reviews]
+
+    async def _review_page(
+        self,
+        since: datetime,
+        to: datetime,
+        limit: int,
+        last_id: str | None,
+        deadline: Deadline | None,
+    ) -> Tuple[List[Dict[str, Any]], bool, Any]:
+        """
+        Одна страница отзывов: (отзывы, has_next, last_id).
+
+        ВАЖНО:
+        - Ozon ожидает поля `date_from` и `date_to` в корне тела запроса, а не
+          `filter.date.{from,to}`.
+        - Пагинация делается по `last_id` + `has_next`. Offset используем не будем,
+          чтобы не застревать на старых отзывах.
+        """
+
+        body: Dict[str, Any] = {
+            "date_from": _iso_z(since),
+            "date_to": _iso_z(to),
+            "limit": limit,
+            "sort_dir": "DESC",
+        }
+        # Если last_id уже получен, продолжаем с него
+        if last_id:
+            body["last_id"] = last_id
+
+        data = await self.post("/v1/review/list", body, deadline=deadline)
+        if not isinstance(data, dict):
+            logger.error("Unexpected reviews response: %r", data)
+            return [], False, None
+
+        res = data.get("result") or data
+        if isinstance(res, dict):
+            arr = res.get("reviews") or res.get("feedbacks") or res.get("items") or []
+            has_next = bool(res.get("has_next") or res.get("hasNext"))
+            next_last_id = res.get("last_id") or res.get("lastId")
+        elif isinstance(res, list):
+            arr = res
+            has_next = False
+            next_last_id = None
+        else:
+            logger.error("Unexpected reviews result payload: %r", res)
+            return [], False, None
+
+        if not isinstance(arr, list):
+            logger.error("Unexpected reviews array type: %r", arr)
+            return [], False, None
+        return [x for x in arr if isinstance(x, dict)], has_next, next_last_id
+
+    async def get_reviews(
+        self,
+        date_from: datetime,
+        date_to: datetime,
+        *,
+        limit_per_page: int = 80,
+        max_count: int | None = 200,
+        deadline: Deadline | None = None,
+    ) -> List[Dict[str, Any]]:
+        """Загрузить отзывы одним списком (обёртка над iter_review_pages)."""
+
+        reviews: List[Dict[str, Any]] = []
+        async for page in self.iter_review_pages(
+            date_from,
+            date_to,
+            limit_per_page=limit_per_page,
+            max_count=max_count,
+            deadline=deadline,
+        ):
+            reviews.extend(page)
+        return reviews
 
     async def get_product_name(self, product_id: str) -> str | None:
         """Получить название товара по product_id с кэшем и мягкими фолбэками."""
@@ -418,8 +987,10 @@ class OzonClient:
         if not product_id:
             return None
 
-        if product_id in _product_name_cache:
-            return _product_name_cache[product_id]
+        cache = get_product_cache()
+        cached, cached_name = cache.lookup(product_id)
+        if cached:
+            return cached_name
 
         normalized_id = str(product_id).strip()
         payload_id: int | str = normalized_id
@@ -429,75 +1000,251 @@ class OzonClient:
             except Exception:
                 payload_id = normalized_id
 
-        payload: dict[str, int | str] = {"product_id": payload_id}
+        name = await self._hedged_product_name(product_id, payload_id)
+        if name:
+            cache.set(product_id, name)
+            return name
 
-        def _extract_name(res: dict[str, Any] | None) -> str | None:
-            if not isinstance(res, dict):
-                return None
-            return str(
-                next(
-                    (
-                        v
-                        for v in (
-                            res.get("name"),
-                            res.get("title"),
-                            res.get("product_name"),
-                            res.get("offer_id"),
-                        )
-                        if v not in (None, "")
-                    ),
-                    "",
-                )
-            ).strip() or None
+        # Промах кэшируется на PRODUCT_CACHE_MISS_TTL, так что предупреждение
+        # повторится не чаще одного раза за этот срок.
+        logger.warning("Product %s not found in Ozon catalog (cached miss)", product_id)
+        cache.set(product_id, None)
+        return None
 
+    def _product_info_paths(self) -> List[str]:
+        """Пути получения названия: сначала тот, что лучше работает для аккаунта."""
+
+        paths = list(PRODUCT_INFO_PATHS)
         api = self._get_seller_api()
-        if api and hasattr(api, "product_info"):
-            try:
-                res = await api.product_info(product_id=payload["product_id"])  # type: ignore[arg-type]
-                if hasattr(res, "model_dump"):
-                    res = res.model_dump()
-                name = _extract_name(res if isinstance(res, dict) else None)
-                if name:
-                    _product_name_cache[product_id] = name
-                    return name
-            except Exception as exc:
-                logger.warning("SellerAPI product_info failed for %s: %s", product_id, exc)
+        if not (api and hasattr(api, "product_info")):
+            paths.remove("seller_api")
+        return sorted(paths, key=lambda p: self._product_path_stats.setdefault(p, ProductPathStats()).rank())
+
+    async def _product_name_via(self, path: str, product_id: str, payload_id: int | str) -> str | None:
+        """Название через один путь; ``None`` — путь ответил, но названия нет."""
+
+        if path == "seller_api":
+            api = self._get_seller_api()
+            res = await asyncio.wait_for(
+                api.product_info(product_id=payload_id),  # type: ignore[union-attr, arg-type]
+                OZON_TIMEOUTS["products"],
+            )
+            if hasattr(res, "model_dump"):
+                res = res.model_dump()
+            return _extract_product_name(res if isinstance(res, dict) else None)
 
-        paths = ("/v1/product/info", "/v2/product/info")
-        for path in paths:
-            try:
-                data = await self.post(path, payload)
-            except httpx.HTTPStatusError as exc:
-                if exc.response.status_code == 404:
-                    logger.info("Product %s returned 404 at %s, trying next", product_id, path)
+        try:
+            data = await self.post(path, {"product_id": payload_id})
+        except httpx.HTTPStatusError as exc:
+            if exc.response.status_code == 404:
+                logger.info("Product %s returned 404 at %s", product_id, path)
+                return None
+            raise
+        if not isinstance(data, dict):
+            logger.warning("Unexpected product info response for %s at %s: %r", product_id, path, data)
+            return None
+        res = data.get("result") if isinstance(data.get("result"), dict) else data
+        return _extract_product_name(res if isinstance(res, dict) else None)
+
+    async def _hedged_product_name(self, product_id: str, payload_id: int | str) -> str | None:
+        """Хеджированный запрос названия.
+
+        Первым идёт путь, который чаще всего срабатывал для этого аккаунта.
+        Если он не ответил за задержку хеджирования (или сразу упал),
+        запускаются остальные пути параллельно; первый, кто вернул название,
+        побеждает, проигравшие отменяются.
+        """
+
+        queue = self._product_info_paths()
+        running: Dict[asyncio.Task, Tuple[str, float]] = {}
+
+        def _launch(path: str) -> None:
+            task = asyncio.ensure_future(self._product_name_via(path, product_id, payload_id))
+            running[task] = (path, time.monotonic())
+
+        if queue:
+            _launch(queue.pop(0))
+        hedge_delay = self._product_hedge_delay()
+        winner: str | None = None
+        try:
+            while running:
+                done, _ = await asyncio.wait(
+                    running,
+                    timeout=hedge_delay if queue else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    logger.debug("Product %s: hedging after %.2fs -> %s", product_id, hedge_delay, queue)
+                for task in done:
+                    path, started = running.pop(task)
+                    stats = self._product_path_stats.setdefault(path, ProductPathStats())
+                    exc = task.exception()
+                    if exc is not None:
+                        stats.record_error()
+                        logger.warning("Product info failed for %s on %s: %s", product_id, path, exc)
+                        continue
+                    name = task.result()
+                    if name:
+                        # Остальные завершённые в этой пачке тоже разбираем
+                        stats.record_win(time.monotonic() - started)
+                        winner = winner or name
+                    else:
+                        stats.record_empty()
+                if winner is not None:
+                    break
+                # Хедж сработал по таймеру либо текущие пути ничего не дали —
+                # запускаем все оставшиеся альтернативы разом
+                while queue:
+                    _launch(queue.pop(0))
+            return winner
+        finally:
+            for task in running:
+                task.cancel()
+
+    def _product_hedge_delay(self) -> float:
+        latencies = [s.latency for s in self._product_path_stats.values() if s.wins]
+        if not latencies:
+            return PRODUCT_HEDGE_DELAY
+        return min(max(2 * min(latencies), PRODUCT_HEDGE_DELAY_MIN), PRODUCT_HEDGE_DELAY)
+
+    async def _product_info_list(self, field: str, ids: List[str]) -> List[Dict[str, Any]]:
+        """Один запрос /v3/product/info/list по списку product_id или sku."""
+
+        values: List[int | str] = [int(i) if i.isdigit() else i for i in ids]
+        data = await self.post("/v3/product/info/list", {field: values})
+        if not isinstance(data, dict):
+            logger.warning("Unexpected product info list response: %r", data)
+            return []
+        res = data.get("result") if isinstance(data.get("result"), dict) else data
+        items = res.get("items") if isinstance(res, dict) else None
+        return [i for i in items or [] if isinstance(i, dict)]
+
+    async def iter_product_list(
+        self, *, visibility: str = "ALL", limit: int = 1000
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Постранично отдать каталог продавца из /v3/product/list (по last_id)."""
+
+        last_id = ""
+        while True:
+            body: Dict[str, Any] = {
+                "filter": {"visibility": visibility},
+                "last_id": last_id,
+                "limit": max(1, min(limit, 1000)),
+            }
+            data = await self.post("/v3/product/list", body)
+            res = data.get("result") if isinstance(data, dict) else None
+            if not isinstance(res, dict):
+                logger.error("Unexpected product list response: %r", data)
+                return
+            items = [i for i in res.get("items") or [] if isinstance(i, dict)]
+            if not items:
+                return
+            yield items
+            next_last_id = str(res.get("last_id") or "")
+            if not next_last_id or next_last_id == last_id:
+                return
+            last_id = next_last_id
+
+    async def get_product_info_list(self, product_ids: List[str]) -> List[Dict[str, Any]]:
+        """Полные карточки товаров по product_id чанками, не больше
+        PRODUCT_INFO_CONCURRENCY запросов одновременно."""
+
+        ids = sorted({str(pid).strip() for pid in product_ids if pid and str(pid).strip()})
+        semaphore = asyncio.Semaphore(PRODUCT_INFO_CONCURRENCY)
+
+        async def _fetch(chunk: List[str]) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await self._product_info_list("product_id", chunk)
+
+        pages = await asyncio.gather(*(_fetch(chunk) for chunk in _chunked(ids, PRODUCT_INFO_CHUNK)))
+        return [item for page in pages for item in page]
+
+    async def get_product_names(self, product_ids: List[str]) -> Dict[str, str | None]:
+        """Пакетно получить названия товаров через /v3/product/info/list.
+
+        Идентификатор из отзыва может оказаться как product_id, так и SKU,
+        поэтому чанки отправляются в обоих вариантах параллельно. Результат
+        (включая промахи как ``None``) сохраняется в персистентном кэше
+        товаров; попутно туда же пишутся SKU и offer_id найденных карточек.
+        """
+
+        cache = get_product_cache()
+        ids = sorted({str(pid).strip() for pid in product_ids if pid and str(pid).strip()})
+        result = cache.get_many(ids)
+        for pid, name in cache.get_many((pid for pid in ids if pid not in result), KIND_SKU).items():
+            if name is not None:
+                result[pid] = name
+        missing = [pid for pid in ids if pid not in result]
+        if not missing:
+            return result
+
+        semaphore = asyncio.Semaphore(PRODUCT_INFO_CONCURRENCY)
+        failed: set[str] = set()
+
+        async def _fetch(field: str, chunk: List[str]) -> List[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return await self._product_info_list(field, chunk)
+                except Exception as exc:
+                    logger.warning(
+                        "Bulk product info by %s failed for %s ids: %s", field, len(chunk), exc
+                    )
+                    failed.update(chunk)
+                    return []
+
+        chunks = _chunked(missing, PRODUCT_INFO_CHUNK)
+        tasks = [_fetch(field, chunk) for field in ("product_id", "sku") for chunk in chunks]
+        pages = await asyncio.gather(*tasks)
+
+        wanted = set(missing)
+        found: Dict[str, str] = {}
+        by_sku: Dict[str, str] = {}
+        by_offer: Dict[str, str] = {}
+        for items in pages:
+            for item in items:
+                name = _extract_product_name(item)
+                if not name:
                     continue
-                logger.warning(
-                    "Product info HTTP %s for %s at %s",
-                    exc.response.status_code,
-                    product_id,
-                    path,
+                skus = [item.get("sku")]
+                skus.extend(
+                    src.get("sku") for src in item.get("sources") or [] if isinstance(src, dict)
                 )
-                continue
-            except Exception as exc:
-                logger.warning("Product info failed for %s on %s: %s", product_id, path, exc)
-                continue
-
-            if not isinstance(data, dict):
-                logger.warning("Unexpected product info response for %s at %s: %r", product_id, path, data)
-                continue
-
-            res = data.get("result") if isinstance(data.get("result"), dict) else data
-            name = _extract_name(res if isinstance(res, dict) else None)
-            if name:
-                _product_name_cache[product_id] = name
-                return name
-            logger.info("Product name missing for %s at %s, trying next", product_id, path)
-
-        if product_id not in _product_not_found_warned:
-            logger.warning("Product %s not found in Ozon catalog (cached miss)", product_id)
-            _product_not_found_warned.add(product_id)
-        _product_name_cache[product_id] = None
-        return None
+                for sku in skus:
+                    if sku not in (None, ""):
+                        by_sku[str(sku)] = name
+                if item.get("offer_id"):
+                    by_offer[str(item["offer_id"])] = name
+                for key in [item.get("id"), item.get("product_id"), *skus]:
+                    if key not in (None, "") and str(key) in wanted:
+                        found.setdefault(str(key), name)
+
+        async def _single(pid: str) -> Tuple[str, str | None]:
+            async with semaphore:
+                return pid, await self.get_product_name(pid)
+
+        # Пакетный запрос не прошёл — старый поштучный путь, но параллельно
+        # и в тех же пределах PRODUCT_INFO_CONCURRENCY, а не по одному
+        retry = [pid for pid in missing if pid not in found and pid in failed]
+        fallback = dict(await asyncio.gather(*(_single(pid) for pid in retry)))
+
+        resolved: Dict[str, str | None] = {}
+        for pid in missing:
+            name = found.get(pid) or fallback.get(pid)
+            if name is None and pid not in fallback:
+                logger.warning("Product %s not found in Ozon catalog (cached miss)", pid)
+            resolved[pid] = name
+        cache.set_many(resolved)
+        cache.set_many(by_sku, KIND_SKU)
+        cache.set_many(by_offer, KIND_OFFER_ID)
+        result.update(resolved)
+
+        logger.info(
+            "Product names resolved in bulk: requested=%s found=%s chunks=%s",
+            len(missing),
+            len(found),
+            len(tasks),
+        )
+        return result
 
     # back-compat
     get_account_info = get_seller_info
@@ -0,0 +1,233 @@
+# botapp/posting_store.py
+"""Дневные агрегаты FBO по закрытым дням МСК (память + SQLite).
+
+День, закончившийся по Москве, считается неизменным: его агрегат
+(:class:`DayRollup` — счётчики и суммы плюс разбивка по SKU) считается
+один раз и хранится на диске, переживая рестарты. Отчёт за неделю, месяц
+или квартал складывает готовые агрегаты, а живым запросом к Ozon остаётся
+только текущий день. Агрегаты хранятся по аккаунту (``client_id``), чтобы
+несколько кабинетов не смешивались.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, Mapping, Tuple
+
+from .ozon_client import MSK_TZ
+from .product_cache import connect_db
+
+logger = logging.getLogger(__name__)
+
+POSTING_STORE_PATH = os.getenv("POSTING_STORE_PATH") or os.path.join("data", "postings.sqlite3")
+
+ROLLUP_TOTALS = (
+    "total",
+    "cancelled",
+    "returns",
+    "orders_without_cancel",
+    "amount_ordered",
+    "amount_without_cancel",
+    "amount_cancelled",
+)
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS fbo_rollup_days (
+    account TEXT NOT NULL,
+    day TEXT NOT NULL,
+    {", ".join(f"{name} REAL NOT NULL" for name in ROLLUP_TOTALS)},
+    stored_at REAL NOT NULL,
+    PRIMARY KEY (account, day)
+);
+CREATE TABLE IF NOT EXISTS fbo_rollup_skus (
+    account TEXT NOT NULL,
+    day TEXT NOT NULL,
+    sku TEXT NOT NULL,
+    qty INTEGER NOT NULL,
+    amount REAL NOT NULL,
+    name TEXT,
+    PRIMARY KEY (account, day, sku)
+);
+"""
+
+
+def msk_today() -> date:
+    return datetime.now(MSK_TZ).date()
+
+
+def iter_days(first: date, last: date) -> Iterator[date]:
+    day = first
+    while day <= last:
+        yield day
+        day += timedelta(days=1)
+
+
+@dataclass
+class SkuRollup:
+    qty: int = 0
+    amount: float = 0.0
+    name: str = ""
+
+
+@dataclass
+class DayRollup:
+    """Аддитивный агрегат заказов FBO: дни складываются через :meth:`merge`."""
+
+    total: int = 0
+    cancelled: int = 0
+    returns: int = 0
+    orders_without_cancel: int = 0
+    amount_ordered: float = 0.0
+    amount_without_cancel: float = 0.0
+    amount_cancelled: float = 0.0
+    skus: Dict[str, SkuRollup] = field(default_factory=dict)
+
+    def add_sku(self, sku: str, qty: int, amount: float, name: str = "") -> None:
+        item = self.skus.get(sku)
+        if item is None:
+            item = self.skus[sku] = SkuRollup()
+        item.qty += qty
+        item.amount += amount
+        if name and not item.name:
+            item.name = name
+
+    def merge(self, other: "DayRollup") -> "DayRollup":
+        for name in ROLLUP_TOTALS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        for sku, item in other.skus.items():
+            self.add_sku(sku, item.qty, item.amount, item.name)
+        return self
+
+
+class PostingStore:
+    """Хранилище «(аккаунт, день МСК) → DayRollup» только для закрытых дней."""
+
+    def __init__(self, path: str | None = POSTING_STORE_PATH) -> None:
+        self.path = path
+        self._days: Dict[Tuple[str, str], DayRollup] = {}
+        self._db: sqlite3.Connection | None = None
+        if path:
+            self._db = connect_db(path, _SCHEMA)
+
+    def get_day(self, account: str, day: date) -> DayRollup | None:
+        """Сохранённый агрегат за *day* или ``None``."""
+
+        return self.get_days(account, day, day).get(day)
+
+    def get_days(self, account: str, first: date, last: date) -> Dict[date, DayRollup]:
+        """Сохранённые агрегаты за дни [first, last]; отсутствующих дней в ответе нет."""
+
+        account = str(account)
+        result: Dict[date, DayRollup] = {}
+        missing = []
+        for day in iter_days(first, last):
+            rollup = self._days.get((account, day.isoformat()))
+            if rollup is not None:
+                result[day] = rollup
+            else:
+                missing.append(day)
+        if not missing or self._db is None:
+            return result
+
+        bounds = (account, missing[0].isoformat(), missing[-1].isoformat())
+        try:
+            day_rows = self._db.execute(
+                f"SELECT day, {', '.join(ROLLUP_TOTALS)} FROM fbo_rollup_days"
+                " WHERE account = ? AND day BETWEEN ? AND ?",
+                bounds,
+            ).fetchall()
+            sku_rows = self._db.execute(
+                "SELECT day, sku, qty, amount, name FROM fbo_rollup_skus"
+                " WHERE account = ? AND day BETWEEN ? AND ?",
+                bounds,
+            ).fetchall()
+        except sqlite3.Error as exc:
+            logger.warning("Posting store read failed: %s", exc)
+            return result
+
+        loaded: Dict[str, DayRollup] = {}
+        for day_iso, *totals in day_rows:
+            rollup = DayRollup()
+            for name, value in zip(ROLLUP_TOTALS, totals):
+                setattr(rollup, name, type(getattr(rollup, name))(value))
+            loaded[day_iso] = rollup
+        for day_iso, sku, qty, amount, name in sku_rows:
+            if day_iso in loaded:
+                loaded[day_iso].skus[sku] = SkuRollup(qty=qty, amount=amount, name=name or "")
+        for day_iso, rollup in loaded.items():
+            self._days[(account, day_iso)] = rollup
+            result[date.fromisoformat(day_iso)] = rollup
+        return result
+
+    def put_days(self, account: str, rollups: Mapping[date, DayRollup]) -> int:
+        """Сохранить агрегаты; текущий и будущие дни пропускаются. Возвращает число сохранённых."""
+
+        account = str(account)
+        today = msk_today()
+        closed = {day: rollup for day, rollup in rollups.items() if day < today}
+        for day, rollup in closed.items():
+            self._days[(account, day.isoformat())] = rollup
+        if self._db is not None and closed:
+            now = time.time()
+            day_rows = [
+                (account, day.isoformat(), *(getattr(r, name) for name in ROLLUP_TOTALS), now)
+                for day, r in closed.items()
+            ]
+            sku_rows = [
+                (account, day.isoformat(), sku, item.qty, item.amount, item.name)
+                for day, r in closed.items()
+                for sku, item in r.skus.items()
+            ]
+            placeholders = ", ".join("?" * (len(ROLLUP_TOTALS) + 3))
+            try:
+                with self._db:
+                    self._db.executemany(
+                        "DELETE FROM fbo_rollup_skus WHERE account = ? AND day = ?",
+                        [(account, day.isoformat()) for day in closed],
+                    )
+                    self._db.executemany(
+                        f"INSERT OR REPLACE INTO fbo_rollup_days VALUES ({placeholders})", day_rows
+                    )
+                    self._db.executemany(
+                        "INSERT INTO fbo_rollup_skus VALUES (?, ?, ?, ?, ?, ?)", sku_rows
+                    )
+            except sqlite3.Error as exc:
+                logger.warning("Posting store write failed: %s", exc)
+        return len(closed)
+
+    def put_day(self, account: str, day: date, rollup: DayRollup) -> bool:
+        return self.put_days(account, {day: rollup}) == 1
+
+    def __len__(self) -> int:
+        return len(self._days)
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+_store: PostingStore | None = None
+
+
+def get_posting_store() -> PostingStore:
+    global _store
+    if _store is None:
+        _store = PostingStore()
+    return _store
+
+
+__all__ = [
+    "POSTING_STORE_PATH",
+    "DayRollup",
+    "PostingStore",
+    "SkuRollup",
+    "get_posting_store",
+    "iter_days",
+    "msk_today",
+]
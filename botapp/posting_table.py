@@ -0,0 +1,313 @@
+# botapp/posting_table.py
+"""Колоночная таблица заказов FBO на NumPy и векторный group-by.
+
+Заказы один раз раскладываются по массивам: уровень заказа (статус, склад,
+регион, час и день создания по МСК, суммы) и уровень строки товара (SKU,
+количество, сумма, выплата; ссылка на заказ). Строковые измерения хранятся
+кодами словарей. Дальше любые разрезы — по SKU, складу, часу, статусу и их
+сочетаниям — считаются ``np.bincount`` по составному ключу (при большом
+пространстве ключей — через ``np.unique``) без обхода вложенных словарей,
+что на 100k+ заказов занимает миллисекунды.
+
+NumPy — необязательная зависимость: без него модуль импортируется, а
+:meth:`PostingTable.from_postings` бросает ``RuntimeError``. В отчёты бота
+таблица пока не подключена — её использует ``benchmarks/bench_posting_table``.
+"""
+
+from __future__ import annotations
+
+from array import array
+from datetime import date
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .ozon_client import MSK_TZ, _parse_iso, s_num
+from .orders import CANCELLED_STATUSES, RETURN_STATUSES
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - необязательная зависимость
+    np = None  # type: ignore[assignment]
+
+HAS_NUMPY = np is not None
+
+POSTING_DIMS = ("status", "warehouse", "region", "hour", "day")
+LINE_DIMS = ("sku",)
+METRICS = ("orders", "qty", "revenue", "payout")
+_NO_HOUR = 24
+# До такого числа возможных групп group-by считает по плотному массиву
+DENSE_GROUPS_MAX = 1 << 20
+
+
+class _Codes:
+    """Словарь «строка → код» для колонки-измерения."""
+
+    __slots__ = ("index", "labels")
+
+    def __init__(self) -> None:
+        self.index: Dict[Any, int] = {}
+        self.labels: List[Any] = []
+
+    def code(self, label: Any) -> int:
+        code = self.index.get(label)
+        if code is None:
+            code = self.index[label] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+
+class PostingTable:
+    """Заказы FBO в колонках; строится через :meth:`from_postings`."""
+
+    def __init__(self) -> None:
+        self.statuses = _Codes()
+        self.warehouses = _Codes()
+        self.regions = _Codes()
+        self.days = _Codes()
+        self.skus = _Codes()
+        self.sku_names: Dict[int, str] = {}
+        # уровень заказа
+        self.status: "np.ndarray"
+        self.warehouse: "np.ndarray"
+        self.region: "np.ndarray"
+        self.hour: "np.ndarray"
+        self.day: "np.ndarray"
+        self.qty: "np.ndarray"
+        self.amount: "np.ndarray"  # сумма по ценам товаров, как в _extract_amounts
+        self.payout: "np.ndarray"
+        # уровень строки товара
+        self.line_posting: "np.ndarray"
+        self.line_sku: "np.ndarray"
+        self.line_qty: "np.ndarray"
+        self.line_amount: "np.ndarray"
+        self.line_payout: "np.ndarray"
+
+    @classmethod
+    def from_postings(cls, postings: Iterable[Dict[str, Any]]) -> "PostingTable":
+        if np is None:
+            raise RuntimeError("numpy не установлен: pip install numpy")
+
+        table = cls()
+        status, warehouse, region, hour, day = (array("i") for _ in range(5))
+        qty, amount, payout = array("q"), array("d"), array("d")
+        line_posting, line_sku, line_qty = array("i"), array("i"), array("q")
+        line_amount, line_payout = array("d"), array("d")
+
+        for p in postings:
+            if not isinstance(p, dict):
+                continue
+            posting_idx = len(status)
+            analytics = p.get("analytics_data") or {}
+            created = _parse_iso(p.get("created_at") or p.get("in_process_at"))
+            created_msk = created.astimezone(MSK_TZ) if created else None
+
+            status.append(table.statuses.code((p.get("status") or "").lower()))
+            warehouse.append(
+                table.warehouses.code(analytics.get("warehouse_name") or analytics.get("warehouse_id") or "")
+            )
+            region.append(table.regions.code(analytics.get("region") or ""))
+            hour.append(created_msk.hour if created_msk else _NO_HOUR)
+            day.append(table.days.code(created_msk.date() if created_msk else None))
+
+            fin_products = (p.get("financial_data") or {}).get("products") or []
+            posting_qty = 0
+            posting_amount = 0.0
+            for i, prod in enumerate(p.get("products") or []):
+                raw_qty = int(s_num(prod.get("quantity")))
+                price = s_num(
+                    prod.get("price") or prod.get("offer_price") or prod.get("price_without_discount")
+                )
+                fin = fin_products[i] if i < len(fin_products) else {}
+                sku_key = str(
+                    prod.get("offer_id") or prod.get("sku") or prod.get("product_id") or prod.get("name") or "?"
+                )
+                sku_code = table.skus.code(sku_key)
+                if sku_code not in table.sku_names and (prod.get("name") or prod.get("product_name")):
+                    table.sku_names[sku_code] = str(prod.get("name") or prod.get("product_name"))
+
+                line_posting.append(posting_idx)
+                line_sku.append(sku_code)
+                line_qty.append(max(raw_qty, 0))
+                line_amount.append(price * max(raw_qty, 1))
+                line_payout.append(s_num(fin.get("payout") or fin.get("client_price") or fin.get("price")))
+                posting_qty += max(raw_qty, 0)
+                posting_amount += price * max(raw_qty, 1)
+
+            qty.append(posting_qty)
+            amount.append(posting_amount)
+            payout.append(
+                sum(s_num(f.get("payout") or f.get("client_price") or f.get("price")) for f in fin_products)
+            )
+
+        table.status = np.frombuffer(status, dtype=np.int32)
+        table.warehouse = np.frombuffer(warehouse, dtype=np.int32)
+        table.region = np.frombuffer(region, dtype=np.int32)
+        table.hour = np.frombuffer(hour, dtype=np.int32)
+        table.day = np.frombuffer(day, dtype=np.int32)
+        table.qty = np.frombuffer(qty, dtype=np.int64)
+        table.amount = np.frombuffer(amount, dtype=np.float64)
+        table.payout = np.frombuffer(payout, dtype=np.float64)
+        table.line_posting = np.frombuffer(line_posting, dtype=np.int32)
+        table.line_sku = np.frombuffer(line_sku, dtype=np.int32)
+        table.line_qty = np.frombuffer(line_qty, dtype=np.int64)
+        table.line_amount = np.frombuffer(line_amount, dtype=np.float64)
+        table.line_payout = np.frombuffer(line_payout, dtype=np.float64)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.status)
+
+    # ---------- Маски ----------
+
+    def _status_mask(self, statuses: Iterable[str]) -> "np.ndarray":
+        codes = [self.statuses.index[s] for s in statuses if s in self.statuses.index]
+        return np.isin(self.status, codes)
+
+    @property
+    def cancelled(self) -> "np.ndarray":
+        return self._status_mask(CANCELLED_STATUSES)
+
+    # ---------- Запросы ----------
+
+    def totals(self) -> Dict[str, Any]:
+        """Итоги в тех же полях, что ``orders._summarize_postings`` (без топа)."""
+
+        cancelled = self.cancelled
+        active = ~cancelled
+        net = np.where(self.payout != 0, self.payout, self.amount)
+        orders = int(active.sum())
+        amount_without_cancel = float(net[active].sum())
+        return {
+            "total": len(self),
+            "cancelled": int(cancelled.sum()),
+            "returns": int(self._status_mask(RETURN_STATUSES).sum()),
+            "orders_without_cancel": orders,
+            "amount_ordered": float(self.amount.sum()),
+            "amount_without_cancel": amount_without_cancel,
+            "amount_cancelled": float(self.amount[cancelled].sum()),
+            "avg_check": amount_without_cancel / orders if orders else 0,
+        }
+
+    def _dimension(self, name: str) -> Tuple["np.ndarray", int, List[Any]]:
+        """(коды, мощность, подписи) измерения на уровне заказа или строки."""
+
+        if name == "hour":
+            labels: List[Any] = list(range(_NO_HOUR)) + [None]
+            return self.hour, _NO_HOUR + 1, labels
+        if name == "sku":
+            return self.line_sku, max(len(self.skus.labels), 1), self.skus.labels
+        codes = {
+            "status": self.statuses,
+            "warehouse": self.warehouses,
+            "region": self.regions,
+            "day": self.days,
+        }.get(name)
+        if codes is None:
+            raise ValueError(f"Неизвестное измерение {name!r}: {POSTING_DIMS + LINE_DIMS}")
+        return getattr(self, name), max(len(codes.labels), 1), codes.labels
+
+    def group_by(
+        self,
+        *dims: str,
+        exclude_cancelled: bool = False,
+        sort_by: str = "orders",
+        limit: int | None = None,
+    ) -> List[Dict[str, Any]]:
+        """Метрики ``orders/qty/revenue/payout`` по сочетаниям измерений *dims*.
+
+        Если среди измерений есть SKU, считаем по строкам товаров (``orders`` —
+        число разных заказов в группе), иначе — по заказам.
+        """
+
+        if sort_by not in METRICS:
+            raise ValueError(f"sort_by должен быть одним из {METRICS}")
+        line_level = any(d in LINE_DIMS for d in dims)
+        posting_index = self.line_posting if line_level else None
+
+        key = np.zeros(len(self.line_sku) if line_level else len(self), dtype=np.int64)
+        decoders = []
+        for name in dims:
+            codes, cardinality, labels = self._dimension(name)
+            if line_level and name not in LINE_DIMS:
+                codes = codes[posting_index]
+            key = key * cardinality + codes
+            decoders.append((name, cardinality, labels))
+
+        if line_level:
+            qty, revenue, payout = self.line_qty, self.line_amount, self.line_payout
+            keep = ~self.cancelled[posting_index] if exclude_cancelled else None
+        else:
+            qty, revenue = self.qty, self.amount
+            payout = np.where(self.payout != 0, self.payout, self.amount)
+            keep = ~self.cancelled if exclude_cancelled else None
+        if keep is not None:
+            key, qty, revenue, payout = key[keep], qty[keep], revenue[keep], payout[keep]
+            if posting_index is not None:
+                posting_index = posting_index[keep]
+
+        space = 1
+        for _, cardinality, _ in decoders:
+            space *= cardinality
+        if space <= max(len(key) * 4, DENSE_GROUPS_MAX):
+            # Пространство ключей небольшое — считаем прямо по ключу, без сортировки
+            inverse, size = key, space
+        else:
+            unique_keys, inverse = np.unique(key, return_inverse=True)
+            size = len(unique_keys)
+        rows_per_group = np.bincount(inverse, minlength=size)
+        present = np.flatnonzero(rows_per_group)
+        groups = present if inverse is key else unique_keys[present]
+
+        if line_level:
+            # Заказ с двумя строками одного SKU — один заказ в группе
+            pairs = np.sort(posting_index.astype(np.int64) * size + inverse)
+            first = np.ones(len(pairs), dtype=bool)
+            first[1:] = pairs[1:] != pairs[:-1]
+            orders = np.bincount(pairs[first] % size, minlength=size)
+        else:
+            orders = rows_per_group
+        values = {
+            "orders": orders[present],
+            "qty": np.bincount(inverse, weights=qty, minlength=size)[present],
+            "revenue": np.bincount(inverse, weights=revenue, minlength=size)[present],
+            "payout": np.bincount(inverse, weights=payout, minlength=size)[present],
+        }
+
+        order = np.argsort(-values[sort_by], kind="stable")
+        if limit is not None:
+            order = order[:limit]
+
+        # Раскладываем составной ключ обратно на коды измерений — векторно
+        columns: Dict[str, List[Any]] = {}
+        rest = groups[order]
+        for name, cardinality, labels in reversed(decoders):
+            rest, codes = np.divmod(rest, cardinality)
+            columns[name] = [labels[c] if c < len(labels) else None for c in codes.tolist()]
+            if name == "sku":
+                columns["name"] = [self.sku_names.get(c, "") for c in codes.tolist()]
+        columns["orders"] = values["orders"][order].tolist()
+        columns["qty"] = values["qty"][order].astype(np.int64).tolist()
+        columns["revenue"] = values["revenue"][order].tolist()
+        columns["payout"] = values["payout"][order].tolist()
+
+        names = list(dims) + (["name"] if "sku" in dims else []) + list(METRICS)
+        return [dict(zip(names, row)) for row in zip(*(columns[n] for n in names))]
+
+    def by_sku(self, limit: int | None = None) -> List[Dict[str, Any]]:
+        return self.group_by("sku", sort_by="qty", limit=limit)
+
+    def by_warehouse(self) -> List[Dict[str, Any]]:
+        return self.group_by("warehouse")
+
+    def by_hour(self) -> List[Dict[str, Any]]:
+        rows = self.group_by("hour")
+        return sorted(rows, key=lambda r: _NO_HOUR if r["hour"] is None else r["hour"])
+
+    def by_day(self) -> List[Dict[str, Any]]:
+        rows = self.group_by("day")
+        return sorted(rows, key=lambda r: r["day"] or date.min)
+
+    def status_breakdown(self) -> List[Dict[str, Any]]:
+        return self.group_by("status")
+
+
+__all__ = ["HAS_NUMPY", "LINE_DIMS", "METRICS", "POSTING_DIMS", "PostingTable"]
@@ -0,0 +1,182 @@
+# botapp/product_cache.py
+"""Персистентный кэш названий товаров (память + SQLite).
+
+Ключи — product_id, SKU или offer_id (``kind``). Найденные названия живут
+``PRODUCT_CACHE_HIT_TTL``, промахи (товар не найден) — заметно меньше,
+``PRODUCT_CACHE_MISS_TTL``, чтобы новые карточки подтягивались сами.
+Кэш переживает рестарты: при старте всё непросроченное грузится в память.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import time
+from datetime import timedelta
+from typing import Dict, Iterable, Mapping, Tuple
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_CACHE_PATH = os.getenv("PRODUCT_CACHE_PATH") or os.path.join("data", "product_cache.sqlite3")
+PRODUCT_CACHE_HIT_TTL = timedelta(days=7)
+PRODUCT_CACHE_MISS_TTL = timedelta(hours=6)
+
+KIND_PRODUCT_ID = "product_id"
+KIND_SKU = "sku"
+KIND_OFFER_ID = "offer_id"
+
+_MISSING = object()
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS products ("
+    " kind TEXT NOT NULL,"
+    " key TEXT NOT NULL,"
+    " name TEXT,"
+    " fetched_at REAL NOT NULL,"
+    " PRIMARY KEY (kind, key))"
+)
+
+
+def connect_db(path: str, schema: str) -> sqlite3.Connection | None:
+    """Открыть SQLite-файл *path* и создать таблицу; ``None``, если диск недоступен."""
+
+    try:
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        db = sqlite3.connect(path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript(schema)
+        db.commit()
+        return db
+    except sqlite3.Error as exc:
+        logger.warning("SQLite %s unavailable, using memory only: %s", path, exc)
+        return None
+
+
+class ProductCache:
+    """Кэш «ключ товара → название» с раздельными TTL для хитов и промахов."""
+
+    def __init__(
+        self,
+        path: str | None = PRODUCT_CACHE_PATH,
+        *,
+        hit_ttl: timedelta = PRODUCT_CACHE_HIT_TTL,
+        miss_ttl: timedelta = PRODUCT_CACHE_MISS_TTL,
+    ) -> None:
+        self.path = path
+        self.hit_ttl = hit_ttl.total_seconds()
+        self.miss_ttl = miss_ttl.total_seconds()
+        self._memory: Dict[Tuple[str, str], Tuple[str | None, float]] = {}
+        self._db: sqlite3.Connection | None = None
+        if path:
+            self._db = connect_db(path, _SCHEMA)
+
+    def _fresh(self, name: str | None, fetched_at: float, now: float) -> bool:
+        ttl = self.hit_ttl if name is not None else self.miss_ttl
+        return now - fetched_at <= ttl
+
+    def warm(self) -> int:
+        """Загрузить в память все непросроченные записи с диска."""
+
+        if self._db is None:
+            return 0
+        now = time.time()
+        oldest = now - max(self.hit_ttl, self.miss_ttl)
+        try:
+            rows = self._db.execute(
+                "SELECT kind, key, name, fetched_at FROM products WHERE fetched_at >= ?",
+                (oldest,),
+            ).fetchall()
+        except sqlite3.Error as exc:
+            logger.warning("Product cache warm-up failed: %s", exc)
+            return 0
+        loaded = 0
+        for kind, key, name, fetched_at in rows:
+            if self._fresh(name, fetched_at, now):
+                self._memory[(kind, key)] = (name, fetched_at)
+                loaded += 1
+        logger.info("Product cache warmed: %s entries from %s", loaded, self.path)
+        return loaded
+
+    def _lookup(self, key: str, kind: str, now: float):
+        item = self._memory.get((kind, str(key)))
+        if item is None:
+            return _MISSING
+        if not self._fresh(item[0], item[1], now):
+            del self._memory[(kind, str(key))]
+            return _MISSING
+        return item[0]
+
+    def lookup(self, key: str, kind: str = KIND_PRODUCT_ID) -> Tuple[bool, str | None]:
+        """``(True, name)`` для свежей записи (``name is None`` — промах), иначе ``(False, None)``."""
+
+        value = self._lookup(key, kind, time.time())
+        if value is _MISSING:
+            return False, None
+        return True, value
+
+    def get_many(self, keys: Iterable[str], kind: str = KIND_PRODUCT_ID) -> Dict[str, str | None]:
+        """Свежие записи для *keys*; отсутствующие ключи в ответ не попадают."""
+
+        now = time.time()
+        result: Dict[str, str | None] = {}
+        for key in keys:
+            value = self._lookup(key, kind, now)
+            if value is not _MISSING:
+                result[str(key)] = value
+        return result
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def set(self, key: str, name: str | None, kind: str = KIND_PRODUCT_ID) -> None:
+        self.set_many({key: name}, kind)
+
+    def set_many(self, items: Mapping[str, str | None], kind: str = KIND_PRODUCT_ID) -> None:
+        """Записать пачку значений одной транзакцией (``None`` — промах)."""
+
+        if not items:
+            return
+        now = time.time()
+        rows = [(kind, str(key), name, now) for key, name in items.items() if key not in (None, "")]
+        for row_kind, key, name, fetched_at in rows:
+            self._memory[(row_kind, key)] = (name, fetched_at)
+        if self._db is None:
+            return
+        try:
+            with self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO products (kind, key, name, fetched_at) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+        except sqlite3.Error as exc:
+            logger.warning("Product cache write failed (%s rows): %s", len(rows), exc)
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+_cache: ProductCache | None = None
+
+
+def get_product_cache() -> ProductCache:
+    """Общий кэш процесса; при первом обращении прогревается с диска."""
+
+    global _cache
+    if _cache is None:
+        _cache = ProductCache()
+        _cache.warm()
+    return _cache
+
+
+__all__ = [
+    "ProductCache",
+    "connect_db",
+    "get_product_cache",
+    "KIND_PRODUCT_ID",
+    "KIND_SKU",
+    "KIND_OFFER_ID",
+]
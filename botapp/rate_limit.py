@@ -0,0 +1,155 @@
+# botapp/rate_limit.py
+"""Ограничение частоты запросов к Ozon: token bucket на каждый метод API."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Tuple
+
+
+@dataclass
+class RateLimitStats:
+    """Счётчики одного метода: сколько ждали токен и сколько раз ретраили."""
+
+    requests: int = 0
+    waited: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+    throttled: int = 0
+    retries: int = 0
+
+    def record_wait(self, seconds: float) -> None:
+        self.requests += 1
+        if seconds < 0.001:  # мгновенная выдача токена — не ожидание
+            return
+        self.waited += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+
+    def as_dict(self) -> Dict[str, float]:
+        data = asdict(self)
+        data["wait_avg"] = self.wait_total / self.waited if self.waited else 0.0
+        return data
+
+
+class TokenBucket:
+    """Классический token bucket: *rate* токенов в секунду, не больше *burst*.
+
+    Ожидающие встают в очередь на ``asyncio.Lock`` (FIFO), поэтому при
+    нехватке токенов вызовы не падают, а выполняются по порядку.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = max(rate, 0.001)
+        self.capacity = max(burst, 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    async def acquire(self) -> float:
+        """Дождаться токена и вернуть, сколько секунд пришлось ждать."""
+
+        started = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                delay = self._blocked_until - now
+                if delay <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        break
+                    delay = (1 - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+        return time.monotonic() - started
+
+    def pause(self, seconds: float) -> None:
+        """Не выдавать токены *seconds* секунд (ответ 429 / Retry-After)."""
+
+        now = time.monotonic()
+        self._refill(now)
+        self._tokens = 0.0
+        self._blocked_until = max(self._blocked_until, now + max(seconds, 0.0))
+
+
+class RateLimiter:
+    """Набор token bucket'ов, по одному на метод Ozon API."""
+
+    def __init__(
+        self,
+        limits: Dict[str, Tuple[float, int]],
+        default: Tuple[float, int],
+    ) -> None:
+        self._limits = dict(limits)
+        self._default = default
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._stats: Dict[str, RateLimitStats] = {}
+
+    def bucket(self, path: str) -> TokenBucket:
+        bucket = self._buckets.get(path)
+        if bucket is None:
+            rate, burst = self._limits.get(path, self._default)
+            bucket = TokenBucket(rate, burst)
+            self._buckets[path] = bucket
+        return bucket
+
+    def stats(self, path: str) -> RateLimitStats:
+        return self._stats.setdefault(path, RateLimitStats())
+
+    async def acquire(self, path: str) -> float:
+        waited = await self.bucket(path).acquire()
+        self.stats(path).record_wait(waited)
+        return waited
+
+    def throttle(self, path: str, seconds: float) -> None:
+        self.stats(path).throttled += 1
+        self.bucket(path).pause(seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {path: stats.as_dict() for path, stats in self._stats.items()}
+
+
+def backoff_delay(attempt: int, *, base: float = 0.5, cap: float = 20.0) -> float:
+    """Экспоненциальная задержка с полным джиттером (attempt с нуля)."""
+
+    return random.uniform(0, min(cap, base * (2**attempt)))
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Разобрать заголовок Retry-After: секунды либо HTTP-дата."""
+
+    if not value:
+        return None
+    txt = value.strip()
+    try:
+        return max(float(txt), 0.0)
+    except ValueError:
+        pass
+    try:
+        dt = parsedate_to_datetime(txt)
+    except Exception:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return max((dt - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+__all__ = [
+    "RateLimitStats",
+    "TokenBucket",
+    "RateLimiter",
+    "backoff_delay",
+    "parse_retry_after",
+]
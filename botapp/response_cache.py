@@ -0,0 +1,229 @@
+# botapp/response_cache.py
+"""TTL-кэш ответов Ozon со stale-while-revalidate.
+
+Для каждого метода задаются два срока: *ttl* — сколько ответ считается
+свежим, и *stale* — сколько после этого его ещё можно отдать сразу,
+параллельно обновляя в фоне. Дальше — обычная синхронная загрузка.
+Одновременные промахи по одному ключу склеиваются в одну загрузку.
+
+Если загрузка не удалась (Ozon лежит, circuit breaker открыт), отдаётся
+последний удачный ответ не старше *fallback_age*; вызывающий код узнаёт
+об этом через :func:`track_stale` и может подписать «данные на HH:MM».
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, Tuple
+
+from .deadline import current_deadline, spawn_detached, within
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    stored_at: float  # time.monotonic()
+    stored_wall: float  # time.time(), для подписи «данные на HH:MM»
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.stored_at
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    refresh_errors: int = 0
+    fallbacks: int = 0
+
+
+class StaleMark:
+    """Отметка «в этом запросе отдали сохранённые данные вместо свежих»."""
+
+    __slots__ = ("at",)
+
+    def __init__(self) -> None:
+        self.at: datetime | None = None
+
+    def mark(self, stored_wall: float) -> None:
+        at = datetime.fromtimestamp(stored_wall, tz=timezone.utc)
+        if self.at is None or at < self.at:
+            self.at = at
+
+
+_stale_mark: ContextVar[StaleMark | None] = ContextVar("stale_mark", default=None)
+
+
+@contextmanager
+def track_stale() -> Iterator[StaleMark]:
+    """Собрать внутри блока, были ли ответы отданы из кэша вместо Ozon."""
+
+    mark = StaleMark()
+    token = _stale_mark.set(mark)
+    try:
+        yield mark
+    finally:
+        _stale_mark.reset(token)
+
+
+class ResponseCache:
+    """Кэш «(метод, ключ) → ответ» с TTL на метод и фоновым обновлением."""
+
+    def __init__(
+        self,
+        policies: Dict[str, Tuple[timedelta, timedelta]],
+        *,
+        fallback_age: timedelta = timedelta(hours=24),
+    ) -> None:
+        self.fallback_age = fallback_age.total_seconds()
+        self._policies = {
+            endpoint: (ttl.total_seconds(), stale.total_seconds())
+            for endpoint, (ttl, stale) in policies.items()
+        }
+        self._entries: Dict[Tuple[str, Hashable], CacheEntry] = {}
+        self._loading: Dict[Tuple[str, Hashable], asyncio.Task] = {}
+        self._stats: Dict[str, CacheStats] = {}
+
+    def _stat(self, endpoint: str) -> CacheStats:
+        return self._stats.setdefault(endpoint, CacheStats())
+
+    def peek(self, endpoint: str, key: Hashable) -> CacheEntry | None:
+        """Последний сохранённый ответ без учёта сроков (или ``None``)."""
+
+        return self._entries.get((endpoint, key))
+
+    def _start_load(
+        self, endpoint: str, key: Hashable, loader: Callable[[], Awaitable[Any]]
+    ) -> asyncio.Task:
+        full_key = (endpoint, key)
+        task = self._loading.get(full_key)
+        if task is not None:
+            return task
+
+        async def _run() -> Any:
+            value = await loader()
+            self._entries[full_key] = CacheEntry(
+                value=value, stored_at=time.monotonic(), stored_wall=time.time()
+            )
+            return value
+
+        # Загрузка общая для всех ожидающих, поэтому не наследует дедлайн
+        # первого из них: каждый ждёт её в пределах собственного бюджета.
+        task = spawn_detached(_run())
+        self._loading[full_key] = task
+        task.add_done_callback(lambda t: self._finish_load(full_key, t))
+        return task
+
+    def _finish_load(self, full_key: Tuple[str, Hashable], task: asyncio.Task) -> None:
+        self._loading.pop(full_key, None)
+        if not task.cancelled():
+            task.exception()  # ошибку получают ожидающие; здесь только гасим warning
+        self._purge(full_key[0])
+
+    def _purge(self, endpoint: str) -> None:
+        """Выбросить записи метода, которые уже не годятся даже как запасные."""
+
+        ttl, stale = self._policies[endpoint]
+        keep = max(ttl + stale, self.fallback_age)
+        for full_key, entry in list(self._entries.items()):
+            if full_key[0] == endpoint and entry.age > keep:
+                del self._entries[full_key]
+
+    def _refresh_in_background(
+        self, endpoint: str, key: Hashable, loader: Callable[[], Awaitable[Any]]
+    ) -> None:
+        if (endpoint, key) in self._loading:
+            return
+        stats = self._stat(endpoint)
+        stats.refreshes += 1
+        task = self._start_load(endpoint, key, loader)
+
+        def _done(t: asyncio.Task) -> None:
+            if t.cancelled():
+                return
+            exc = t.exception()
+            if exc is not None:
+                stats.refresh_errors += 1
+                logger.warning("Background refresh of %s failed: %s", endpoint, exc)
+
+        task.add_done_callback(_done)
+
+    async def get_or_load(
+        self, endpoint: str, key: Hashable, loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Вернуть ответ из кэша или загрузить его через *loader*.
+
+        Методы без политики в кэше не участвуют — *loader* вызывается всегда.
+        """
+
+        policy = self._policies.get(endpoint)
+        if policy is None:
+            return await loader()
+        ttl, stale = policy
+        stats = self._stat(endpoint)
+
+        entry = self._entries.get((endpoint, key))
+        if entry is not None:
+            age = entry.age
+            if age <= ttl:
+                stats.hits += 1
+                return entry.value
+            if age <= ttl + stale:
+                stats.stale_hits += 1
+                self._refresh_in_background(endpoint, key, loader)
+                return entry.value
+
+        stats.misses += 1
+        try:
+            return await within(
+                asyncio.shield(self._start_load(endpoint, key, loader)), current_deadline()
+            )
+        except Exception as exc:
+            if entry is None or entry.age > self.fallback_age:
+                raise
+            stats.fallbacks += 1
+            mark = _stale_mark.get()
+            if mark is not None:
+                mark.mark(entry.stored_wall)
+            logger.warning(
+                "Ozon %s failed (%s), serving data from %.0fs ago", endpoint, exc, entry.age
+            )
+            return entry.value
+
+    def invalidate(self, endpoint: str | None = None, key: Hashable | None = None) -> int:
+        """Сбросить записи: все, одного метода или одного ключа. Возвращает число удалённых."""
+
+        victims = [
+            full_key
+            for full_key in self._entries
+            if (endpoint is None or full_key[0] == endpoint) and (key is None or full_key[1] == key)
+        ]
+        for full_key in victims:
+            del self._entries[full_key]
+        return len(victims)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        result: Dict[str, Dict[str, Any]] = {}
+        for endpoint, stats in self._stats.items():
+            data = dict(stats.__dict__)
+            data["entries"] = sum(1 for ep, _ in self._entries if ep == endpoint)
+            result[endpoint] = data
+        return result
+
+    def cancel(self) -> None:
+        for task in list(self._loading.values()):
+            task.cancel()
+
+
+__all__ = ["CacheEntry", "CacheStats", "ResponseCache", "StaleMark", "track_stale"]
@@ -1,13 +1,27 @@
 # botapp/reviews.py
 from __future__ import annotations
 
+import asyncio
+import base64
+import hashlib
+import hmac
 import logging
+import os
+import sys
+import uuid
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 from datetime import date, datetime, time, timedelta, timezone
-from typing import Any, Dict, List, Tuple
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterable, List, Tuple
 
 from .ai_client import AIClientError, generate_review_reply
+from .catalog import get_catalog
+from .deadline import Deadline, DeadlineExceeded, current_deadline, spawn_detached, within
 from .ozon_client import OzonClient, get_client
+from .product_cache import get_product_cache
+from .state import BoundedState
 
 logger = logging.getLogger(__name__)
 
@@ -19,28 +33,71 @@ MSK_TZ = timezone(MSK_SHIFT)
 TELEGRAM_SOFT_LIMIT = 4000
 REVIEWS_PAGE_SIZE = 10
 SESSION_TTL = timedelta(minutes=2)
+# Повторные «Обновить» от разных менеджеров в этом окне не запускают новый скан
+REFRESH_DEDUP_WINDOW = timedelta(seconds=15)
+# Полный пересбор окна делаем редко, в остальное время тянем только новые отзывы
+FULL_RESYNC_INTERVAL = timedelta(minutes=30)
+# Перекрытие инкрементального окна: заодно обновляем статус ответа у свежих отзывов
+INCREMENTAL_OVERLAP = timedelta(hours=6)
+# Как часто фоновый планировщик освежает снимок (REVIEWS_REFRESH_SECONDS в .env)
+REVIEWS_REFRESH_INTERVAL = timedelta(seconds=int(os.getenv("REVIEWS_REFRESH_SECONDS") or 90))
+# Сколько бюджета запроса (секунды) оставляем на остальной ответ: названия
+# товаров ждём только до этого рубежа, дальше дотягиваем их в фоне
+PRODUCT_NAMES_RESERVE = 1.0
+
+USER_STATE_MAX = 10_000  # сколько пользователей держим в памяти одновременно
+USER_STATE_TTL = timedelta(days=7)
+SESSION_IDLE_TTL = timedelta(days=1)
+
+_review_answered_cache: BoundedState[int, set[str]] = BoundedState(
+    "reviews.answered", max_size=USER_STATE_MAX, ttl=USER_STATE_TTL
+)
+_sessions: BoundedState[int, "ReviewSession"] = BoundedState(
+    "reviews.sessions", max_size=USER_STATE_MAX, ttl=SESSION_IDLE_TTL
+)
+_snapshots: dict[str, "ReviewSnapshot"] = {}
+_snapshot_tasks: dict[str, asyncio.Task] = {}
+_snapshot_locks: dict[str, asyncio.Lock] = {}
+_refresh_tasks: dict[str, asyncio.Task] = {}
+_refresher_task: asyncio.Task | None = None
+
+
+def _intern(value: str | None) -> str | None:
+    """Интернировать повторяющиеся строки (названия товаров, артикулы)."""
+
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+@dataclass(slots=True)
+class ReviewCard:
+    """Компактная карточка отзыва.
 
-_product_name_cache: dict[str, str | None] = {}
-_review_answered_cache: dict[int, set[str]] = {}
-_sessions: dict[int, "ReviewSession"] = {}
-# NEW: Короткие токены для review_id, чтобы callback_data помещалась в лимит Telegram
-_review_id_to_token: dict[int, dict[str, str]] = {}
-_token_to_review_id: dict[int, dict[str, str]] = {}
-
+    Без ``__dict__`` (slots), дата хранится как int epoch (UTC), а названия
+    товаров и артикулы интернируются — тысячи отзывов на один товар делят
+    одну строку.
+    """
 
-@dataclass
-class ReviewCard:
     id: str | None
     rating: int
     text: str
     product_name: str | None
     offer_id: str | None
     product_id: str | None
-    created_at: datetime | None
-    raw_created_at: Any | None = None
+    created_ts: int | None
     answered: bool = False
     answer_text: str | None = None
 
+    def __post_init__(self) -> None:
+        self.product_name = _intern(self.product_name)
+        self.offer_id = _intern(self.offer_id)
+        self.product_id = _intern(self.product_id)
+
+    @property
+    def created_at(self) -> datetime | None:
+        if self.created_ts is None:
+            return None
+        return datetime.fromtimestamp(self.created_ts, tz=timezone.utc)
+
 
 @dataclass
 class ReviewView:
@@ -50,18 +107,270 @@ class ReviewView:
     period: str
 
 
+def _index_key(card: ReviewCard) -> tuple[float, str]:
+    """Ключ порядка «от новых к старым» для bisect-индексов снимка."""
+
+    ts = card.created_ts if card.created_ts is not None else float("-inf")
+    return -ts, card.id or ""
+
+
+def _position(seq: List[ReviewCard], card: ReviewCard) -> int | None:
+    """Позиция *card* в упорядоченном списке за O(log n) или ``None``."""
+
+    key = _index_key(card)
+    pos = bisect_left(seq, key, key=_index_key)
+    while pos < len(seq) and _index_key(seq[pos]) == key:
+        if seq[pos] is card:
+            return pos
+        pos += 1
+    return None
+
+
+class ReviewIndex:
+    """Индекс снимка отзывов.
+
+    ``by_id`` ищет карточку за O(1), а ``all``/``answered``/``unanswered`` —
+    упорядоченные от новых к старым списки, которые меняются точечно через
+    bisect при добавлении, обновлении ответа и вытеснении старых отзывов.
+    """
+
+    __slots__ = ("by_id", "all", "answered", "unanswered")
+
+    def __init__(self) -> None:
+        self.by_id: Dict[str, ReviewCard] = {}
+        self.all: List[ReviewCard] = []
+        self.answered: List[ReviewCard] = []
+        self.unanswered: List[ReviewCard] = []
+
+    def __len__(self) -> int:
+        return len(self.all)
+
+    def _bucket(self, card: ReviewCard) -> List[ReviewCard]:
+        return self.answered if _has_answer_payload(card) else self.unanswered
+
+    @staticmethod
+    def _discard(seq: List[ReviewCard], card: ReviewCard) -> None:
+        if seq and seq[-1] is card:
+            seq.pop()
+            return
+        pos = _position(seq, card)
+        if pos is not None:
+            del seq[pos]
+
+    def add(self, card: ReviewCard) -> bool:
+        if card.id and card.id in self.by_id:
+            return False
+        insort(self.all, card, key=_index_key)
+        insort(self._bucket(card), card, key=_index_key)
+        if card.id:
+            self.by_id[card.id] = card
+        return True
+
+    def extend(self, cards: Iterable[ReviewCard]) -> int:
+        """Добавить пачку карточек: дописать и один раз досортировать (timsort
+        почти линеен на уже упорядоченных страницах)."""
+
+        fresh: List[ReviewCard] = []
+        for card in cards:
+            if card.id:
+                if card.id in self.by_id:
+                    continue
+                self.by_id[card.id] = card
+            fresh.append(card)
+        if not fresh:
+            return 0
+        for seq, part in (
+            (self.all, fresh),
+            (self.answered, [c for c in fresh if _has_answer_payload(c)]),
+            (self.unanswered, [c for c in fresh if not _has_answer_payload(c)]),
+        ):
+            if part:
+                seq.extend(part)
+                seq.sort(key=_index_key)
+        return len(fresh)
+
+    def remove(self, card: ReviewCard) -> None:
+        self._discard(self.all, card)
+        self._discard(self._bucket(card), card)
+        if card.id and self.by_id.get(card.id) is card:
+            del self.by_id[card.id]
+
+    def update_answer(self, card: ReviewCard, *, answered: bool, answer_text: str | None) -> None:
+        """Обновить статус ответа и переложить карточку между списками."""
+
+        old_bucket = self._bucket(card)
+        card.answered = answered
+        card.answer_text = answer_text
+        new_bucket = self._bucket(card)
+        if new_bucket is not old_bucket:
+            # ключ порядка не зависит от ответа, поэтому bisect по старому списку валиден
+            self._discard(old_bucket, card)
+            insort(new_bucket, card, key=_index_key)
+
+    def trim(self, *, keep_from: date | None = None, max_size: int = MAX_REVIEWS_LOAD) -> int:
+        """Вытеснить самые старые карточки (они в хвосте списков)."""
+
+        removed = 0
+        while self.all:
+            oldest = self.all[-1]
+            too_old = keep_from is not None and _sort_key(oldest).date() < keep_from
+            if not too_old and len(self.all) <= max_size:
+                break
+            self.remove(oldest)
+            removed += 1
+        return removed
+
+
+class ReviewSequence(Sequence):
+    """Список категории поверх индекса снимка с учётом отметок пользователя.
+
+    *hidden* — карточки, которые пользователь отметил отвеченными (они
+    исключаются из «Без ответа»), *extra* — те же карточки, добавляемые в
+    «С ответом». Локальных отметок немного (m), поэтому доступ по номеру и
+    поиск позиции стоят O(m + log n) вместо прохода по всему списку.
+    """
+
+    def __init__(
+        self,
+        base: List[ReviewCard],
+        *,
+        hidden: Iterable[ReviewCard] = (),
+        extra: Iterable[ReviewCard] = (),
+    ) -> None:
+        self._base = base
+        self._hidden_ids = {c.id for c in hidden}
+        self._hidden = sorted(
+            pos for pos in (_position(base, c) for c in hidden) if pos is not None
+        )
+        self._extra = sorted(extra, key=_index_key)
+        # позиция вставки каждой extra-карточки в base (неубывающая)
+        self._extra_ins = [bisect_left(base, _index_key(c), key=_index_key) for c in self._extra]
+
+    def __len__(self) -> int:
+        return len(self._base) - len(self._hidden) + len(self._extra)
+
+    def _item(self, i: int) -> ReviewCard:
+        if self._hidden:
+            j = i
+            for pos in self._hidden:
+                if pos > j:
+                    break
+                j += 1
+            return self._base[j]
+        before = 0
+        for k, ins in enumerate(self._extra_ins):
+            merged = ins + k
+            if merged == i:
+                return self._extra[k]
+            if merged > i:
+                break
+            before += 1
+        return self._base[i - before]
+
+    def __getitem__(self, i):  # type: ignore[override]
+        if isinstance(i, slice):
+            return [self._item(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._item(i)
+
+    def index_of(self, card: ReviewCard) -> int | None:
+        """Позиция карточки в этом списке или ``None``, если её тут нет."""
+
+        for k, extra in enumerate(self._extra):
+            if extra is card:
+                return self._extra_ins[k] + k
+        if card.id in self._hidden_ids:
+            return None
+        pos = _position(self._base, card)
+        if pos is None:
+            return None
+        if self._hidden:
+            return pos - bisect_left(self._hidden, pos)
+        return pos + bisect_right(self._extra_ins, pos)
+
+
 @dataclass
-class ReviewSession:
-    all_reviews: List[ReviewCard] = field(default_factory=list)
-    unanswered_reviews: List[ReviewCard] = field(default_factory=list)
+class ReviewSnapshot:
+    """Общий снимок отзывов одного аккаунта Ozon.
+
+    Загружается один раз на аккаунт и разделяется всеми пользователями бота.
+    Карточки внутри снимка пользователи не меняют: их ответы и отметки живут
+    в персональных ``ReviewSession``.
+    """
+
+    account_id: str
+    index: ReviewIndex = field(default_factory=ReviewIndex)
     pretty_period: str = ""
-    indexes: Dict[str, int] = field(default_factory=lambda: {"all": 0, "unanswered": 0, "answered": 0})
-    page: Dict[str, int] = field(default_factory=lambda: {"all": 0, "unanswered": 0, "answered": 0})
     loaded_at: datetime = field(default_factory=datetime.utcnow)
     product_cache: Dict[str, str | None] = field(default_factory=dict)
+    loading: bool = False
+    version: int = 0
+    full_synced_at: datetime = field(default_factory=datetime.utcnow)
+    newest_created_at: datetime | None = None
+
+    @property
+    def cards(self) -> List[ReviewCard]:
+        return self.index.all
+
+    @property
+    def age(self) -> timedelta:
+        """Сколько прошло с последней синхронизации снимка."""
+
+        return datetime.utcnow() - self.loaded_at
+
+    def _track_newest(self, cards: List[ReviewCard]) -> None:
+        for card in cards:
+            created = _to_utc(card.created_at)
+            if created and (self.newest_created_at is None or created > self.newest_created_at):
+                self.newest_created_at = created
+
+    def add_cards(self, cards: List[ReviewCard]) -> None:
+        """Добавить очередную страницу отзывов, сохранив порядок от новых к старым."""
+
+        self.index.extend(cards)
+        self._track_newest(cards)
+        self.version += 1
+
+    def merge_cards(self, cards: List[ReviewCard], *, keep_from: date | None = None) -> tuple[int, int]:
+        """Слить свежие карточки со снимком по id отзыва.
+
+        Известные отзывы обновляются на месте (статус и текст ответа), новые
+        добавляются. Карточки старше *keep_from* (МСК) выпадают из окна.
+        Возвращает (добавлено, обновлено).
+        """
+
+        added = 0
+        updated = 0
+        for card in cards:
+            existing = self.index.by_id.get(card.id) if card.id else None
+            if existing is None:
+                added += int(self.index.add(card))
+                continue
+            if existing.answered != card.answered or existing.answer_text != card.answer_text:
+                self.index.update_answer(existing, answered=card.answered, answer_text=card.answer_text)
+                updated += 1
 
-    def rebuild_unanswered(self, user_id: int) -> None:
-        self.unanswered_reviews = [c for c in self.all_reviews if not is_answered(c, user_id)]
+        self.index.trim(keep_from=keep_from)
+        self._track_newest(cards)
+        self.version += 1
+        return added, updated
+
+
+@dataclass
+class ReviewSession:
+    """Пользовательское представление над общим снимком отзывов.
+
+    Хранит только курсоры и локальные ответы; списки категорий строятся
+    как ``ReviewSequence`` поверх индекса снимка.
+    """
+
+    account_id: str
+    indexes: Dict[str, int] = field(default_factory=lambda: {"all": 0, "unanswered": 0, "answered": 0})
+    page: Dict[str, int] = field(default_factory=lambda: {"all": 0, "unanswered": 0, "answered": 0})
+    answers: Dict[str, str] = field(default_factory=dict)
 
 
 def _parse_date(value: Any) -> datetime | None:
@@ -201,11 +510,6 @@ def _msk_range_last_days(days: int = DEFAULT_RECENT_DAYS) -> Tuple[datetime, dat
 def _answered_for_user(user_id: int) -> set[str]:
     """Вернуть (и при необходимости восстановить) кэш отвеченных отзывов для пользователя."""
 
-    global _review_answered_cache
-    if not isinstance(_review_answered_cache, dict):
-        logger.warning("Answered cache corrupted, resetting it")
-        _review_answered_cache = {}
-
     bucket = _review_answered_cache.get(user_id)
     if not isinstance(bucket, set):
         bucket = set(bucket or [])
@@ -224,49 +528,89 @@ def is_answered(review: ReviewCard, user_id: int | None = None) -> bool:
     return _has_answer_payload(review)
 
 
-def _reset_review_tokens(user_id: int) -> None:
-    """Очистить токены отзывов для пользователя (при обновлении списка)."""
+_TOKEN_UUID = 1
+_TOKEN_INT = 2
+_TOKEN_STR = 3
+_TOKEN_UUID_UPPER = 4
+_TOKEN_MAC_LEN = 6  # 48 бит: перебор через callback'и Telegram нереален
+# 64 байта callback_data минус самая длинная кнопка карточки
+# («rv:card_reprompt:unanswered::<токен>:<страница до 9999>»). UUID даёт 29
+# символов; токен длиннее (длинный строковый id) не выдаём — кнопки
+# тогда ссылаются на отзыв по индексу в списке.
+REVIEW_TOKEN_MAX_LEN = 30
+
+
+@lru_cache(maxsize=1)
+def _review_token_key() -> bytes:
+    """Ключ подписи токенов: стабилен между рестартами и воркерами."""
+
+    secret = (
+        os.getenv("REVIEW_TOKEN_SECRET")
+        or os.getenv("OZON_API_KEY")
+        or os.getenv("TG_BOT_TOKEN")
+        or ""
+    ).strip()
+    if not secret:
+        # Ключ из пустой строки посчитает кто угодно — берём случайный:
+        # токены не переживут рестарт, но и подделать их нельзя
+        logger.error(
+            "REVIEW_TOKEN_SECRET, OZON_API_KEY and TG_BOT_TOKEN are all unset: "
+            "review tokens use a random per-process key"
+        )
+        return os.urandom(32)
+    return hashlib.sha256(f"review-token:{secret}".encode()).digest()
+
 
-    _review_id_to_token[user_id] = {}
-    _token_to_review_id[user_id] = {}
+def _review_token_mac(user_id: int, body: bytes) -> bytes:
+    msg = str(user_id).encode() + b"|" + body
+    return hmac.new(_review_token_key(), msg, hashlib.sha256).digest()[:_TOKEN_MAC_LEN]
 
 
-def _base36(num: int) -> str:
-    alphabet = "0123456789abcdefghijklmnopqrstuvwxyz"
-    if num == 0:
-        return "0"
-    digits = []
-    while num:
-        num, rem = divmod(num, 36)
-        digits.append(alphabet[rem])
-    return "".join(reversed(digits))
+def _pack_review_id(review_id: str) -> bytes:
+    try:
+        parsed = uuid.UUID(review_id)
+    except ValueError:
+        parsed = None
+    if parsed is not None and str(parsed) == review_id:
+        return bytes([_TOKEN_UUID]) + parsed.bytes
+    if parsed is not None and str(parsed).upper() == review_id:
+        return bytes([_TOKEN_UUID_UPPER]) + parsed.bytes
+    if review_id.isdigit() and str(int(review_id)) == review_id:
+        num = int(review_id)
+        return bytes([_TOKEN_INT]) + num.to_bytes(max(1, (num.bit_length() + 7) // 8), "big")
+    return bytes([_TOKEN_STR]) + review_id.encode()
+
+
+def _unpack_review_id(body: bytes) -> str | None:
+    tag, payload = body[0], body[1:]
+    if tag == _TOKEN_UUID and len(payload) == 16:
+        return str(uuid.UUID(bytes=payload))
+    if tag == _TOKEN_UUID_UPPER and len(payload) == 16:
+        return str(uuid.UUID(bytes=payload)).upper()
+    if tag == _TOKEN_INT and payload:
+        return str(int.from_bytes(payload, "big"))
+    if tag == _TOKEN_STR and payload:
+        return payload.decode(errors="replace")
+    return None
 
 
-def _get_review_token(user_id: int, review_id: str | None) -> str | None:
-    """Выдать короткий токен для review_id, чтобы уместиться в 64 байта callback."""
+def encode_review_id(user_id: int, review_id: str | None) -> str | None:
+    """Вернуть компактный подписанный токен review_id для callback_data.
+
+    Токен не требует серверного состояния: UUID упаковывается в 16 байт,
+    к нему добавляется HMAC (6 байт, привязан к user_id), всё кодируется
+    base85 (без «:»). Для UUID это 29 символов — влезает в 64 байта
+    ``ReviewsCallbackData``; токен переживает рестарты и обновления списка.
+    Если токен длиннее ``REVIEW_TOKEN_MAX_LEN``, возвращается ``None`` —
+    кнопка тогда ссылается на отзыв по индексу.
+    """
 
     if not review_id:
         return None
-    bucket = _review_id_to_token.setdefault(user_id, {})
-    if review_id in bucket:
-        return bucket[review_id]
-
-    # Хэшируем и переводим в base36, ограничиваем длину, чтобы избежать переполнения
-    raw = abs(hash((user_id, review_id)))
-    token = _base36(raw)[:8]
-    if not token:
-        token = "r0"
-
-    # Разрешаем редкие коллизии, добавляя суффикс
-    used = _token_to_review_id.setdefault(user_id, {})
-    suffix = 0
-    while token in used and used[token] != review_id:
-        suffix += 1
-        token_candidate = f"{token[:6]}{_base36(suffix)[:2]}"
-        token = token_candidate[:8]
-
-    bucket[review_id] = token
-    used[token] = review_id
+    body = _pack_review_id(review_id)
+    token = base64.b85encode(body + _review_token_mac(user_id, body)).decode()
+    if len(token) > REVIEW_TOKEN_MAX_LEN:
+        return None
     return token
 
 
@@ -275,14 +619,15 @@ def resolve_review_id(user_id: int, review_ref: str | None) -> str | None:
 
     if not review_ref:
         return None
-    mapping = _token_to_review_id.get(user_id, {})
-    return mapping.get(review_ref, review_ref)
-
-
-def encode_review_id(user_id: int, review_id: str | None) -> str | None:
-    """Вернуть короткий токен для review_id."""
-
-    return _get_review_token(user_id, review_id)
+    try:
+        raw = base64.b85decode(review_ref.encode())
+    except ValueError:
+        raw = b""
+    body, mac = raw[:-_TOKEN_MAC_LEN], raw[-_TOKEN_MAC_LEN:]
+    if len(body) < 2 or not hmac.compare_digest(mac, _review_token_mac(user_id, body)):
+        logger.info("Rejected review token %r for user %s", review_ref, user_id)
+        return None
+    return _unpack_review_id(body)
 
 
 def mark_review_answered(review_id: str | None, user_id: int, answer_text: str | None = None) -> None:
@@ -293,13 +638,8 @@ def mark_review_answered(review_id: str | None, user_id: int, answer_text: str |
     if not session:
         return
 
-    for card in session.all_reviews:
-        if review_id and card.id == review_id:
-            card.answered = True
-            if answer_text is not None:
-                card.answer_text = answer_text
-
-    session.rebuild_unanswered(user_id)
+    if review_id and answer_text is not None:
+        session.answers[review_id] = answer_text
 
 
 def _filter_reviews_and_stats(
@@ -484,7 +824,6 @@ def _normalize_review(raw: Dict[str, Any]) -> ReviewCard:
         raw.get("published_at"),
         raw.get("submitted_at"),
     ]
-    raw_created_at = next((v for v in created_candidates if v not in (None, "")), None)
     created_at = next((dt for dt in (_parse_date(v) for v in created_candidates) if dt), None)
 
     return ReviewCard(
@@ -494,8 +833,7 @@ def _normalize_review(raw: Dict[str, Any]) -> ReviewCard:
         product_name=product_name,
         offer_id=offer_id,
         product_id=product_id,
-        created_at=created_at,
-        raw_created_at=raw_created_at,
+        created_ts=int(created_at.timestamp()) if created_at else None,
         answered=answered,
         answer_text=answer_text or None,
     )
@@ -608,131 +946,240 @@ def trim_for_telegram(text: str, max_len: int = TELEGRAM_SOFT_LIMIT) -> str:
     return text[: max_len - len(suffix)] + suffix
 
 
+def _apply_product_names(
+    cards: List[ReviewCard], cache: Dict[str, str | None], titles: Dict[str, str | None]
+) -> None:
+    for pid, title in titles.items():
+        if title is not None or pid not in cache:
+            cache[pid] = title
+    for card in cards:
+        if card.product_id and not card.product_name:
+            card.product_name = _intern(cache.get(card.product_id) or card.product_name)
+
+
 async def _resolve_product_names(
-    cards: List[ReviewCard], client: OzonClient, product_cache: Dict[str, str | None] | None = None
+    cards: List[ReviewCard],
+    client: OzonClient,
+    product_cache: Dict[str, str | None] | None = None,
+    *,
+    deadline: Deadline | None = None,
 ) -> None:
+    """Проставить названия товаров карточкам.
+
+    *product_cache* — локальная память снимка; дальше локальный индекс
+    каталога и общий персистентный кэш товаров, куда
+    ``client.get_product_names`` пишет результаты. В сеть идём только за
+    товарами, которых нет ни там, ни там.
+
+    Названия — необязательная часть ответа: если бюджет *deadline* на них
+    не хватает, запрос продолжается в фоне и проставит названия тем же
+    карточкам позже, а пользователь получает ответ сразу.
+    """
+
     cache = product_cache if product_cache is not None else {}
+    shared = get_product_cache()
+    catalog = get_catalog()
 
+    known: Dict[str, str] = {}
     missing_ids: set[str] = set()
     for card in cards:
         if not card.product_id:
             continue
-
         if card.product_name:
-            cache.setdefault(card.product_id, card.product_name)
-            _product_name_cache.setdefault(card.product_id, card.product_name)
+            known.setdefault(card.product_id, card.product_name)
             continue
-
-        cached_name = cache.get(card.product_id)
-        if cached_name is None and card.product_id in _product_name_cache:
-            cached_name = _product_name_cache[card.product_id]
-            cache[card.product_id] = cached_name
-
-        if cached_name is not None:
-            card.product_name = cached_name
+        if cache.get(card.product_id) is not None:
             continue
+        catalog_name = catalog.name_for(card.product_id)
+        if catalog_name:
+            cache[card.product_id] = catalog_name
+        else:
+            missing_ids.add(card.product_id)
+
+    if known:
+        cache.update(known)
+        fresh = shared.get_many(known)
+        shared.set_many({pid: name for pid, name in known.items() if fresh.get(pid) != name})
+
+    titles: Dict[str, str | None] = {}
+    if missing_ids:
+        lookup = spawn_detached(client.get_product_names(sorted(missing_ids)))
+        names_deadline = (
+            Deadline(deadline.expires_at - PRODUCT_NAMES_RESERVE) if deadline is not None else None
+        )
+        try:
+            titles = await within(asyncio.shield(lookup), names_deadline)
+        except DeadlineExceeded:
+            logger.info("Product names for %s ids deferred: request budget exhausted", len(missing_ids))
 
-        missing_ids.add(card.product_id)
+            def _apply_later(task: asyncio.Task) -> None:
+                if not task.cancelled() and task.exception() is None:
+                    _apply_product_names(cards, cache, task.result())
 
-    for pid in missing_ids:
-        try:
-            title = await client.get_product_name(pid)
+            lookup.add_done_callback(_apply_later)
+            titles = shared.get_many(missing_ids)
         except Exception as exc:
-            logger.warning("Failed to fetch product name for %s: %s", pid, exc)
-            title = None
-        cache[pid] = title
-        _product_name_cache[pid] = title
+            logger.warning("Failed to fetch product names for %s ids: %s", len(missing_ids), exc)
+            titles = shared.get_many(missing_ids)
 
-    for card in cards:
-        if card.product_id and not card.product_name:
-            card.product_name = cache.get(card.product_id) or _product_name_cache.get(card.product_id) or card.product_name
+    _apply_product_names(cards, cache, titles)
 
 
-async def fetch_recent_reviews(
+def _sort_key(card: ReviewCard) -> datetime:
+    return _to_msk(card.created_at) or datetime.min.replace(tzinfo=MSK_TZ)
+
+
+async def iter_reviews(
     client: OzonClient | None = None,
     *,
     days: int = DEFAULT_RECENT_DAYS,
     limit_per_page: int = 100,
     max_reviews: int = MAX_REVIEWS_LOAD,
     product_cache: Dict[str, str | None] | None = None,
-) -> Tuple[List[ReviewCard], str]:
-    """Загрузить отзывы за последние *days* дней одним списком."""
+    stats: Dict[str, Any] | None = None,
+    date_from: datetime | None = None,
+    deadline: Deadline | None = None,
+) -> AsyncIterator[List[ReviewCard]]:
+    """Потоково отдавать нормализованные отзывы за *days* дней постранично.
+
+    Каждая страница ``/v1/review/list`` сразу нормализуется, фильтруется по
+    периоду и дополняется названиями товаров; сырые payload'ы не копятся.
+    В *stats* (если передан) накапливаются счётчики для диагностики.
+    *date_from* сужает запрос к API (инкрементальная синхронизация).
+    *deadline* по умолчанию берётся из контекста задачи, читающей страницы.
+    """
 
     client = client or get_client()
     product_cache = product_cache if product_cache is not None else {}
-    since_msk, to_msk, pretty = _msk_range_last_days(days)
+    stats = stats if stats is not None else {}
+    since_msk, to_msk, _ = _msk_range_last_days(days)
     # Берём чуть шире окно для запроса, чтобы не потерять отзывы на границах
     fetch_since_msk = since_msk - timedelta(days=2)
-    fetch_from_utc = _to_utc(fetch_since_msk)
-    fetch_to_utc = _to_utc(to_msk)
-    raw = await client.get_reviews(
-        fetch_from_utc or fetch_since_msk,
-        fetch_to_utc or to_msk,
+    if date_from is not None:
+        fetch_since_msk = max(fetch_since_msk, _ensure_msk(date_from) or fetch_since_msk)
+    fetch_from_utc = _to_utc(fetch_since_msk) or fetch_since_msk
+    fetch_to_utc = _to_utc(to_msk) or to_msk
+    stats.update(
+        fetch_from_utc=fetch_from_utc,
+        fetch_to_utc=fetch_to_utc,
+        filter_from=since_msk.date(),
+        filter_to=to_msk.date(),
+    )
+
+    async for raw_page in client.iter_review_pages(
+        fetch_from_utc,
+        fetch_to_utc,
         limit_per_page=limit_per_page,
         max_count=max_reviews,
-    )
-    if raw:
-        # DEBUG: один пример для сверки схемы ReviewAPI, чтобы не спамить логи
-        logger.debug("Sample review payload: %r", raw[0])
-    cards = [_normalize_review(r) for r in raw if isinstance(r, dict)]
-    filter_from_date = since_msk.date()
-    filter_to_date = to_msk.date()
-
-    filtered_cards, stats = _filter_reviews_and_stats(
-        cards,
-        period_from_msk=filter_from_date,
-        period_to_msk=filter_to_date,
-        answer_filter="all",
-    )
-    await _resolve_product_names(filtered_cards, client, product_cache)
-    filtered_cards.sort(
-        key=lambda c: _to_msk(c.created_at) or datetime.min.replace(tzinfo=MSK_TZ),
-        reverse=True,
-    )
+        deadline=deadline,
+    ):
+        if not stats.get("raw"):
+            # DEBUG: один пример для сверки схемы ReviewAPI, чтобы не спамить логи
+            logger.debug("Sample review payload: %r", raw_page[0])
+        cards = [_normalize_review(r) for r in raw_page if isinstance(r, dict)]
+        stats["raw"] = stats.get("raw", 0) + len(raw_page)
+
+        for card in cards:
+            created_utc = _to_utc(card.created_at)
+            if not created_utc:
+                continue
+            stats["raw_min"] = min(stats.get("raw_min") or created_utc, created_utc)
+            stats["raw_max"] = max(stats.get("raw_max") or created_utc, created_utc)
+            year_counts = stats.setdefault("year_counts", {})
+            year_counts[created_utc.year] = year_counts.get(created_utc.year, 0) + 1
+
+        page_cards, page_stats = _filter_reviews_and_stats(
+            cards,
+            period_from_msk=since_msk.date(),
+            period_to_msk=to_msk.date(),
+            answer_filter="all",
+        )
+        for key in ("missing_dates", "dropped_by_date", "answered", "unanswered"):
+            stats[key] = stats.get(key, 0) + page_stats.get(key, 0)
 
-    unanswered_count = len(filter_reviews(filtered_cards, answer_filter="unanswered"))
-    answered_count = len(filter_reviews(filtered_cards, answer_filter="answered"))
+        if not page_cards:
+            continue
+        await _resolve_product_names(
+            page_cards, client, product_cache, deadline=deadline or current_deadline()
+        )
+        page_cards.sort(key=_index_key)
+        yield page_cards
 
-    raw_dates_utc = [dt for dt in (_to_utc(c.created_at) for c in cards) if dt]
-    raw_dates_msk = [dt.astimezone(MSK_TZ) for dt in raw_dates_utc]
-    filtered_dates_msk = [dt for dt in (_to_msk(c.created_at) for c in filtered_cards) if dt]
 
-    year_counts: dict[int, int] = {}
-    for dt in raw_dates_utc:
-        year_counts[dt.year] = year_counts.get(dt.year, 0) + 1
+async def fetch_recent_reviews(
+    client: OzonClient | None = None,
+    *,
+    days: int = DEFAULT_RECENT_DAYS,
+    limit_per_page: int = 100,
+    max_reviews: int = MAX_REVIEWS_LOAD,
+    product_cache: Dict[str, str | None] | None = None,
+    deadline: Deadline | None = None,
+) -> Tuple[List[ReviewCard], str]:
+    """Загрузить отзывы за последние *days* дней одним списком.
+
+    *deadline* ограничивает всю загрузку: он передаётся до ``OzonClient.post``.
+    """
+
+    _, _, pretty = _msk_range_last_days(days)
+    stats: Dict[str, Any] = {}
+    filtered_cards: List[ReviewCard] = []
+    async for page in iter_reviews(
+        client,
+        days=days,
+        limit_per_page=limit_per_page,
+        max_reviews=max_reviews,
+        product_cache=product_cache,
+        stats=stats,
+        deadline=deadline,
+    ):
+        filtered_cards.extend(page)
+    filtered_cards.sort(key=_index_key)
+
+    raw_count = stats.get("raw", 0)
+    raw_span_utc = (
+        f"{stats['raw_min']} — {stats['raw_max']}" if stats.get("raw_min") else "—"
+    )
+    raw_span_msk = (
+        f"{stats['raw_min'].astimezone(MSK_TZ)} — {stats['raw_max'].astimezone(MSK_TZ)}"
+        if stats.get("raw_min")
+        else "—"
+    )
+    filtered_dates_msk = [
+        dt for dt in (_to_msk(c.created_at) for c in (filtered_cards[-1:] + filtered_cards[:1])) if dt
+    ]
 
     logger.info(
         "Reviews fetched from API: %s items (UTC range: %s — %s) | filter_msk_dates=%s..%s",
-        len(raw),
-        (fetch_from_utc or fetch_since_msk).isoformat(),
-        (fetch_to_utc or to_msk).isoformat(),
-        filter_from_date,
-        filter_to_date,
+        raw_count,
+        stats["fetch_from_utc"].isoformat(),
+        stats["fetch_to_utc"].isoformat(),
+        stats["filter_from"],
+        stats["filter_to"],
     )
 
     logger.info(
         "Reviews date span (MSK): raw=%s filtered=%s | raw_span_utc=%s | year_counts=%s",
-        _range_summary_msk(raw_dates_msk),
+        raw_span_msk,
         _range_summary_msk(filtered_dates_msk),
-        _range_summary_msk(raw_dates_utc),
-        year_counts,
+        raw_span_utc,
+        stats.get("year_counts", {}),
     )
 
-    if stats.get("dropped_by_date") == len(cards) and cards:
+    if raw_count and stats.get("dropped_by_date") == raw_count:
         logger.warning(
             "All reviews dropped by date: window_msk=%s..%s, raw_span=%s",
-            since_msk,
-            to_msk,
-            _range_summary_msk(raw_dates_msk),
+            stats["filter_from"],
+            stats["filter_to"],
+            raw_span_msk,
         )
 
     debug_dates = False
     if debug_dates:
         for sample in filtered_cards[:5]:
             logger.info(
-                "Review debug: id=%s created_at_raw=%r created_at_parsed=%s created_at_msk=%s",
+                "Review debug: id=%s created_ts=%r created_at_parsed=%s created_at_msk=%s",
                 sample.id,
-                sample.raw_created_at,
+                sample.created_ts,
                 sample.created_at,
                 _to_msk(sample.created_at),
             )
@@ -740,15 +1187,24 @@ async def fetch_recent_reviews(
         "Reviews after filter: %s items for period=%s (МСК), filter=all | unanswered=%s | answered=%s | missing_dates=%s | dropped_by_date=%s",
         len(filtered_cards),
         pretty,
-        unanswered_count,
-        answered_count,
+        stats.get("unanswered", 0),
+        stats.get("answered", 0),
         stats.get("missing_dates", 0),
-        stats.get("dropped_by_date", len(cards) - len(filtered_cards)),
+        stats.get("dropped_by_date", raw_count - len(filtered_cards)),
     )
     return filtered_cards, pretty
 
 
-def _slice_cards(cards: List[ReviewCard], page: int, page_size: int) -> tuple[List[ReviewCard], int, int]:
+def _fmt_snapshot_age(age: timedelta) -> str:
+    seconds = int(age.total_seconds())
+    if seconds < 60:
+        return "только что"
+    if seconds < 3600:
+        return f"{seconds // 60} мин назад"
+    return f"{seconds // 3600} ч назад"
+
+
+def _slice_cards(cards: Sequence[ReviewCard], page: int, page_size: int) -> tuple[List[ReviewCard], int, int]:
     total = len(cards)
     total_pages = max(1, (total + page_size - 1) // page_size) if total else 1
     safe_page = max(0, min(page, total_pages - 1))
@@ -759,18 +1215,22 @@ def _slice_cards(cards: List[ReviewCard], page: int, page_size: int) -> tuple[Li
 
 def build_reviews_table(
     *,
-    cards: List[ReviewCard],
+    cards: Sequence[ReviewCard],
     pretty_period: str,
     category: str,
     user_id: int,
     page: int = 0,
     page_size: int = REVIEWS_PAGE_SIZE,
+    loading: bool = False,
+    snapshot_age: timedelta | None = None,
 ) -> tuple[str, List[tuple[str, str | None, int]], int, int]:
     """Собрать текст таблицы и кнопки для списка отзывов."""
 
     if not cards:
         return (
-            "Отзывы не найдены за выбранный период.",
+            "⏳ Отзывы ещё загружаются, обновите список через пару секунд."
+            if loading
+            else "Отзывы не найдены за выбранный период.",
             [],
             0,
             0,
@@ -798,15 +1258,25 @@ def build_reviews_table(
         )
         if snippet:
             label = f"{label} | {snippet}"
-        token = _get_review_token(user_id, card.id)
+        token = encode_review_id(user_id, card.id)
         items.append((label, token, global_index))
 
     rows.append(f"Страница {safe_page + 1}/{total_pages}")
+    if snapshot_age is not None:
+        rows.append(f"Обновлено: {_fmt_snapshot_age(snapshot_age)}")
+    if loading:
+        rows.append("⏳ Загружаем остальные отзывы…")
     text = "\n".join(rows)
     return trim_for_telegram(text), items, safe_page, total_pages
 
 
-def _build_review_view(cards: List[ReviewCard], index: int, pretty: str, user_id: int) -> ReviewView:
+def _build_review_view(
+    cards: Sequence[ReviewCard],
+    index: int,
+    pretty: str,
+    user_id: int,
+    answers: Dict[str, str] | None = None,
+) -> ReviewView:
     if not cards:
         return ReviewView(
             text="Отзывы за выбранный период не найдены.",
@@ -816,53 +1286,289 @@ def _build_review_view(cards: List[ReviewCard], index: int, pretty: str, user_id
         )
 
     safe_index = max(0, min(index, len(cards) - 1))
+    card = cards[safe_index]
     text = format_review_card_text(
-        card=cards[safe_index],
+        card=card,
         index=safe_index,
         total=len(cards),
         period_title=pretty,
         user_id=user_id,
+        current_answer=(answers or {}).get(card.id or ""),
     )
     return ReviewView(text=text, index=safe_index, total=len(cards), period=pretty)
 
 
-async def _ensure_session(user_id: int, client: OzonClient | None = None) -> ReviewSession:
-    session = _sessions.get(user_id)
-    now = datetime.utcnow()
+def _account_id(client: OzonClient) -> str:
+    return str(client.client_id)
+
+
+async def _consume_review_stream(
+    snapshot: ReviewSnapshot, stream: AsyncIterator[List[ReviewCard]]
+) -> None:
+    try:
+        async for page in stream:
+            snapshot.add_cards(page)
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        logger.exception("Background review loading failed for account %s", snapshot.account_id)
+    finally:
+        snapshot.loading = False
+        await stream.aclose()
+        logger.info(
+            "Review snapshot loaded for account %s: %s items",
+            snapshot.account_id,
+            len(snapshot.cards),
+        )
+
+
+async def _sync_snapshot_incremental(client: OzonClient, snapshot: ReviewSnapshot) -> None:
+    """Дотянуть в снимок только отзывы новее последнего известного.
+
+    Окно запроса начинается с ``newest_created_at - INCREMENTAL_OVERLAP``,
+    поэтому в обычном случае это один небольшой запрос вместо полного скана.
+    """
+
+    since = (snapshot.newest_created_at or datetime.now(timezone.utc)) - INCREMENTAL_OVERLAP
+    since_msk, _, pretty = _msk_range_last_days(DEFAULT_RECENT_DAYS)
+    added = 0
+    updated = 0
+    pages = 0
+    async for page in iter_reviews(client, product_cache=snapshot.product_cache, date_from=since):
+        page_added, page_updated = snapshot.merge_cards(page)
+        added += page_added
+        updated += page_updated
+        pages += 1
+
+    # Окно «последние N дней» сдвигается — старые карточки выпадают
+    snapshot.merge_cards([], keep_from=since_msk.date())
+    snapshot.pretty_period = pretty
+    snapshot.loaded_at = datetime.utcnow()
+    logger.info(
+        "Incremental review sync for account %s: since=%s pages=%s added=%s updated=%s total=%s",
+        snapshot.account_id,
+        since.isoformat(),
+        pages,
+        added,
+        updated,
+        len(snapshot.cards),
+    )
+
 
-    if session and (now - session.loaded_at) < SESSION_TTL:
-        return session
+async def _rescan_snapshot(client: OzonClient, current: ReviewSnapshot) -> None:
+    """Полный пересбор снимка в фоне; текущий подменяется, только когда новый готов.
 
-    product_cache: Dict[str, str | None] = {}
-    cards, pretty = await fetch_recent_reviews(client, product_cache=product_cache)
-    session = ReviewSession(
-        all_reviews=cards,
-        unanswered_reviews=[c for c in cards if not is_answered(c, user_id)],
+    До подмены пользователи листают прежний тёплый снимок, а не первую
+    страницу нового. Если скан упал, остаётся прежний снимок.
+    """
+
+    _, _, pretty = _msk_range_last_days(DEFAULT_RECENT_DAYS)
+    snapshot = ReviewSnapshot(
+        account_id=current.account_id,
         pretty_period=pretty,
-        loaded_at=now,
-        product_cache=product_cache,
+        loaded_at=datetime.utcnow(),
+        product_cache=dict(current.product_cache),
     )
-    _reset_review_tokens(user_id)
-    _sessions[user_id] = session
-    return session
+    stream = iter_reviews(client, product_cache=snapshot.product_cache)
+    try:
+        async for page in stream:
+            snapshot.add_cards(page)
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        logger.exception(
+            "Full review rescan failed for account %s, keeping the current snapshot",
+            current.account_id,
+        )
+        return
+    finally:
+        await stream.aclose()
+    _snapshots[current.account_id] = snapshot
+    logger.info(
+        "Review snapshot rescanned for account %s: %s items",
+        current.account_id,
+        len(snapshot.cards),
+    )
+
+
+async def _load_snapshot(client: OzonClient, *, max_age: timedelta) -> ReviewSnapshot:
+    """Вернуть общий снимок аккаунта, при необходимости перезагрузив его.
+
+    Одновременные вызовы для одного аккаунта сериализуются: пока один
+    пользователь загружает отзывы, остальные дожидаются того же снимка.
+    При холодном старте снимок публикуется после первой страницы, остальные
+    догружаются в фоне; полный пересбор тёплого снимка идёт в отдельный
+    снимок (:func:`_rescan_snapshot`), а до его готовности отдаётся текущий.
+    """
+
+    account_id = _account_id(client)
+    lock = _snapshot_locks.setdefault(account_id, asyncio.Lock())
+    async with lock:
+        current = _snapshots.get(account_id)
+        now = datetime.utcnow()
+        if current and (current.loading or (now - current.loaded_at) < max_age):
+            return current
+
+        if (
+            current
+            and current.newest_created_at is not None
+            and (now - current.full_synced_at) < FULL_RESYNC_INTERVAL
+        ):
+            try:
+                await _sync_snapshot_incremental(client, current)
+                return current
+            except Exception:
+                logger.exception("Incremental review sync failed, falling back to full scan")
+
+        if current is not None:
+            task = _snapshot_tasks.get(account_id)
+            if task is None or task.done():
+                _snapshot_tasks[account_id] = spawn_detached(_rescan_snapshot(client, current))
+            return current
+
+        _, _, pretty = _msk_range_last_days(DEFAULT_RECENT_DAYS)
+        snapshot = ReviewSnapshot(
+            account_id=account_id,
+            pretty_period=pretty,
+            loaded_at=now,
+            loading=True,
+        )
+        stream = iter_reviews(client, product_cache=snapshot.product_cache)
+        first_page = await anext(stream, None)
+        if first_page:
+            snapshot.add_cards(first_page)
+        _snapshots[account_id] = snapshot
+
+        if first_page is None:
+            snapshot.loading = False
+            await stream.aclose()
+        else:
+            # Остальные страницы догружаются без дедлайна открывшего их пользователя
+            _snapshot_tasks[account_id] = spawn_detached(_consume_review_stream(snapshot, stream))
+        return snapshot
+
+
+async def _refresh_snapshot_safe(client: OzonClient, max_age: timedelta) -> None:
+    try:
+        await _load_snapshot(client, max_age=max_age)
+    except Exception:
+        logger.exception("Background review refresh failed for account %s", _account_id(client))
+
+
+def _schedule_snapshot_refresh(client: OzonClient, *, max_age: timedelta) -> None:
+    """Запустить обновление снимка в фоне, если оно ещё не идёт."""
 
+    account_id = _account_id(client)
+    task = _refresh_tasks.get(account_id)
+    if task and not task.done():
+        return
+    _refresh_tasks[account_id] = spawn_detached(_refresh_snapshot_safe(client, max_age))
+
+
+async def _get_snapshot(client: OzonClient) -> ReviewSnapshot:
+    """Stale-while-revalidate: сразу отдать текущий снимок, а устаревший обновить в фоне.
 
-def _get_cards_for_category(session: ReviewSession, category: str, user_id: int) -> List[ReviewCard]:
+    Ждать загрузки приходится только при самом первом обращении к аккаунту,
+    и то не дольше дедлайна хендлера: загрузка идёт в фоне и доедет к
+    следующему нажатию, даже если пользователь получил ``DeadlineExceeded``.
+    """
+
+    account_id = _account_id(client)
+    snapshot = _snapshots.get(account_id)
+    if snapshot is None:
+        task = _refresh_tasks.get(account_id)
+        if task is None or task.done():
+            task = spawn_detached(_load_snapshot(client, max_age=SESSION_TTL))
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            _refresh_tasks[account_id] = task
+        await within(asyncio.shield(task), current_deadline())
+        snapshot = _snapshots.get(account_id)
+        if snapshot is None:
+            return await _load_snapshot(client, max_age=SESSION_TTL)
+    if not snapshot.loading and snapshot.age >= SESSION_TTL:
+        _schedule_snapshot_refresh(client, max_age=SESSION_TTL)
+    return snapshot
+
+
+async def _review_refresher_loop(client: OzonClient | None, interval: timedelta) -> None:
+    while True:
+        try:
+            await _refresh_snapshot_safe(client or get_client(), interval)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("Review refresh failed: %s", exc)
+        await asyncio.sleep(interval.total_seconds())
+
+
+def start_review_refresher(
+    client: OzonClient | None = None, interval: timedelta = REVIEWS_REFRESH_INTERVAL
+) -> asyncio.Task:
+    """Запустить фоновый планировщик, держащий снимок отзывов прогретым."""
+
+    global _refresher_task
+    if _refresher_task and not _refresher_task.done():
+        return _refresher_task
+    logger.info("Review refresher started: interval=%ss", int(interval.total_seconds()))
+    _refresher_task = asyncio.create_task(_review_refresher_loop(client, interval))
+    return _refresher_task
+
+
+async def stop_review_refresher() -> None:
+    global _refresher_task
+    tasks = [t for t in (_refresher_task, *_refresh_tasks.values(), *_snapshot_tasks.values()) if t]
+    for task in tasks:
+        if not task.done():
+            task.cancel()
+    for task in tasks:
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+    _refresher_task = None
+    _refresh_tasks.clear()
+    _snapshot_tasks.clear()
+
+
+async def _ensure_session(
+    user_id: int, client: OzonClient | None = None
+) -> tuple[ReviewSession, ReviewSnapshot]:
+    client = client or get_client()
+    snapshot = await _get_snapshot(client)
+    session = _sessions.get(user_id)
+    if session is None or session.account_id != snapshot.account_id:
+        session = ReviewSession(account_id=snapshot.account_id)
+        _sessions[user_id] = session
+    return session, snapshot
+
+
+def _get_cards_for_category(
+    session: ReviewSession, snapshot: ReviewSnapshot, category: str, user_id: int
+) -> ReviewSequence:
+    index = snapshot.index
+    if category not in {"unanswered", "answered"}:
+        return ReviewSequence(index.all)
+
+    # Отзывы, отвеченные только локально этим пользователем
+    local = [
+        card
+        for card in (index.by_id.get(rid) for rid in _answered_for_user(user_id))
+        if card is not None and not _has_answer_payload(card)
+    ]
     if category == "unanswered":
-        session.rebuild_unanswered(user_id)
-        return session.unanswered_reviews
-    if category == "answered":
-        return [c for c in session.all_reviews if is_answered(c, user_id)]
-    return session.all_reviews
+        return ReviewSequence(index.unanswered, hidden=local)
+    return ReviewSequence(index.answered, extra=local)
 
 
-def _find_card_by_id(cards: List[ReviewCard], review_id: str | None) -> tuple[int, ReviewCard] | tuple[int, None]:
-    if not review_id:
+def _find_card_by_id(
+    snapshot: ReviewSnapshot, cards: ReviewSequence, review_id: str | None
+) -> tuple[int, ReviewCard] | tuple[int, None]:
+    card = snapshot.index.by_id.get(review_id) if review_id else None
+    if card is None:
         return 0, cards[0] if cards else None
-    for idx, card in enumerate(cards):
-        if card.id == review_id:
-            return idx, card
-    return 0, cards[0] if cards else None
+    pos = cards.index_of(card)
+    # Карточка могла уйти из категории (например, после ответа) — показываем её же
+    return (pos if pos is not None else 0), card
 
 
 async def get_review_view(
@@ -871,9 +1577,9 @@ async def get_review_view(
     index: int = 0,
     client: OzonClient | None = None,
 ) -> ReviewView:
-    session = await _ensure_session(user_id, client)
-    cards = _get_cards_for_category(session, category, user_id)
-    view = _build_review_view(cards, index, session.pretty_period, user_id)
+    session, snapshot = await _ensure_session(user_id, client)
+    cards = _get_cards_for_category(session, snapshot, category, user_id)
+    view = _build_review_view(cards, index, snapshot.pretty_period, user_id, session.answers)
     session.indexes[category] = view.index
     return view
 
@@ -881,14 +1587,16 @@ async def get_review_view(
 async def get_reviews_table(
     *, user_id: int, category: str = "all", page: int = 0, client: OzonClient | None = None
 ) -> tuple[str, list[tuple[str, str | None, int]], int, int]:
-    session = await _ensure_session(user_id, client)
-    cards = _get_cards_for_category(session, category, user_id)
+    session, snapshot = await _ensure_session(user_id, client)
+    cards = _get_cards_for_category(session, snapshot, category, user_id)
     text, items, safe_page, total_pages = build_reviews_table(
         cards=cards,
-        pretty_period=session.pretty_period,
+        pretty_period=snapshot.pretty_period,
         category=category,
         user_id=user_id,
         page=page,
+        loading=snapshot.loading,
+        snapshot_age=snapshot.age,
     )
     session.page[category] = safe_page
     return text, items, safe_page, total_pages
@@ -901,13 +1609,13 @@ async def get_review_and_card(
     client: OzonClient | None = None,
     review_id: str | None = None,
 ) -> tuple[ReviewView, ReviewCard | None]:
-    session = await _ensure_session(user_id, client)
-    cards = _get_cards_for_category(session, category, user_id)
+    session, snapshot = await _ensure_session(user_id, client)
+    cards = _get_cards_for_category(session, snapshot, category, user_id)
     if review_id:
-        index, card = _find_card_by_id(cards, review_id)
+        index, card = _find_card_by_id(snapshot, cards, review_id)
     else:
         card = cards[index] if cards else None
-    view = _build_review_view(cards, index, session.pretty_period, user_id)
+    view = _build_review_view(cards, index, snapshot.pretty_period, user_id, session.answers)
     session.indexes[category] = view.index
     return view, card
 
@@ -918,7 +1626,7 @@ async def shift_review_view(
     step: int,
     client: OzonClient | None = None,
 ) -> ReviewView:
-    session = await _ensure_session(user_id, client)
+    session, _ = await _ensure_session(user_id, client)
     current = session.indexes.get(category, 0)
     new_index = current + step
     return await get_review_view(user_id, category, new_index, client)
@@ -945,18 +1653,16 @@ async def get_review_by_id(
 
 
 async def refresh_reviews(user_id: int, client: OzonClient | None = None) -> ReviewSession:
-    now = datetime.utcnow()
-    product_cache: Dict[str, str | None] = {}
-    cards, pretty = await fetch_recent_reviews(client, product_cache=product_cache)
-    session = ReviewSession(
-        all_reviews=cards,
-        unanswered_reviews=[c for c in cards if not is_answered(c, user_id)],
-        pretty_period=pretty,
-        loaded_at=now,
-        product_cache=product_cache,
-    )
-    _reset_review_tokens(user_id)
-    _sessions[user_id] = session
+    """Запросить обновление общего снимка (не чаще раза в REFRESH_DEDUP_WINDOW).
+
+    Если снимок уже есть, обновление идёт в фоне, а пользователь сразу
+    получает текущие данные; синхронно ждём только холодную загрузку.
+    """
+
+    client = client or get_client()
+    if _account_id(client) in _snapshots:
+        _schedule_snapshot_refresh(client, max_age=REFRESH_DEDUP_WINDOW)
+    session, _ = await _ensure_session(user_id, client)
     return session
 
 
@@ -980,7 +1686,11 @@ async def get_reviews_menu_text() -> str:
 __all__ = [
     "ReviewCard",
     "ReviewView",
+    "ReviewSnapshot",
+    "ReviewIndex",
+    "ReviewSession",
     "fetch_recent_reviews",
+    "iter_reviews",
     "trim_for_telegram",
     "get_review_view",
     "shift_review_view",
@@ -989,6 +1699,8 @@ __all__ = [
     "get_review_by_index",
     "get_reviews_table",
     "refresh_reviews",
+    "start_review_refresher",
+    "stop_review_refresher",
     "get_ai_reply_for_review",
     "mark_review_answered",
     "is_answered",
@@ -0,0 +1,121 @@
+# botapp/state.py
+"""Ограниченное по памяти хранилище пользовательского состояния.
+
+Все модульные словари «user_id → что-то» живут столько же, сколько процесс.
+``BoundedState`` ограничивает их размером (LRU) и временем простоя (idle
+TTL), а счётчики вытеснений доступны через :func:`state_metrics`.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from datetime import timedelta
+from typing import Any, Dict, Generic, Iterator, List, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+_MISSING = object()
+_registry: List["BoundedState[Any, Any]"] = []
+
+
+class BoundedState(MutableMapping, Generic[K, V]):
+    """Словарь с LRU-вытеснением по *max_size* и idle TTL.
+
+    Порядок элементов — по последнему обращению, поэтому и самые старые по
+    LRU, и просроченные по TTL лежат в начале и вытесняются за O(1).
+    """
+
+    def __init__(self, name: str, *, max_size: int, ttl: timedelta | None = None) -> None:
+        self.name = name
+        self.max_size = max(max_size, 1)
+        self.ttl = ttl.total_seconds() if ttl else None
+        self._data: "OrderedDict[K, tuple[V, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evicted_size = 0
+        self.evicted_ttl = 0
+        _registry.append(self)
+
+    def _expired(self, touched: float, now: float) -> bool:
+        return self.ttl is not None and now - touched > self.ttl
+
+    def purge_expired(self) -> int:
+        """Удалить просроченные элементы (они всегда в начале)."""
+
+        if self.ttl is None:
+            return 0
+        now = time.monotonic()
+        removed = 0
+        while self._data:
+            key, (_, touched) = next(iter(self._data.items()))
+            if not self._expired(touched, now):
+                break
+            del self._data[key]
+            removed += 1
+        self.evicted_ttl += removed
+        return removed
+
+    def __getitem__(self, key: K) -> V:
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING:
+            self.misses += 1
+            raise KeyError(key)
+        value, touched = item  # type: ignore[misc]
+        now = time.monotonic()
+        if self._expired(touched, now):
+            del self._data[key]
+            self.evicted_ttl += 1
+            self.misses += 1
+            raise KeyError(key)
+        self._data[key] = (value, now)
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key: K, value: V) -> None:
+        self._data[key] = (value, time.monotonic())
+        self._data.move_to_end(key)
+        self.purge_expired()
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evicted_size += 1
+
+    def __delitem__(self, key: K) -> None:
+        del self._data[key]
+
+    def __contains__(self, key: object) -> bool:
+        item = self._data.get(key, _MISSING)  # type: ignore[arg-type]
+        if item is _MISSING:
+            return False
+        return not self._expired(item[1], time.monotonic())  # type: ignore[index]
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(list(self._data))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted_size": self.evicted_size,
+            "evicted_ttl": self.evicted_ttl,
+        }
+
+
+def state_metrics() -> Dict[str, Dict[str, Any]]:
+    """Размеры и счётчики вытеснений всех зарегистрированных хранилищ."""
+
+    for state in _registry:
+        state.purge_expired()
+    return {state.name: state.metrics() for state in _registry}
+
+
+__all__ = ["BoundedState", "state_metrics"]
@@ -0,0 +1,215 @@
+# botapp/transport.py
+"""Общий HTTP-транспорт к Ozon: один прогретый пул соединений на хост.
+
+REST-вызовы ``OzonClient`` и ``ozonapi.SellerAPI`` (у которого своя
+aiohttp-сессия) ходят через один ``httpx.AsyncClient`` с явными лимитами
+пула и keep-alive. HTTP/2 включается через ``OZON_HTTP2=1``, если
+установлен пакет ``h2`` (``pip install httpx[http2]``). При старте пул
+прогревается: TLS-рукопожатия делаются до первого нажатия пользователя.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+from urllib.parse import urlsplit
+
+import httpx
+from aiohttp import ContentTypeError, RequestInfo
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from .json_codec import loads as json_loads
+
+logger = logging.getLogger(__name__)
+
+OZON_POOL_MAX_CONNECTIONS = int(os.getenv("OZON_POOL_MAX_CONNECTIONS") or 20)
+OZON_POOL_MAX_KEEPALIVE = int(os.getenv("OZON_POOL_MAX_KEEPALIVE") or 10)
+# Сколько держать простаивающее соединение открытым (секунды)
+OZON_KEEPALIVE_EXPIRY = float(os.getenv("OZON_KEEPALIVE_EXPIRY") or 90)
+OZON_HTTP2 = (os.getenv("OZON_HTTP2") or "").lower() in {"1", "true", "yes"}
+OZON_PREWARM_CONNECTIONS = int(os.getenv("OZON_PREWARM_CONNECTIONS") or 2)
+OZON_CONNECT_TIMEOUT = 5.0
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class OzonTransport:
+    """Пул соединений к одному хосту Ozon, общий для всех клиентов процесса."""
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        timeout: float = 20.0,
+        max_connections: int = OZON_POOL_MAX_CONNECTIONS,
+        max_keepalive: int = OZON_POOL_MAX_KEEPALIVE,
+        keepalive_expiry: float = OZON_KEEPALIVE_EXPIRY,
+        http2: bool = OZON_HTTP2,
+    ) -> None:
+        if http2 and not _http2_available():
+            logger.warning("OZON_HTTP2 requested but 'h2' is not installed, using HTTP/1.1")
+            http2 = False
+        self.base_url = base_url.rstrip("/")
+        self.http2 = http2
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=OZON_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=http2,
+            headers={
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+            },
+        )
+
+    async def prewarm(self, connections: int = OZON_PREWARM_CONNECTIONS) -> int:
+        """Открыть *connections* соединений заранее; вернуть, сколько удалось.
+
+        Ответ не важен (корень API отдаёт 404) — нужен установленный TLS,
+        который дальше живёт в пуле keep-alive.
+        """
+
+        if connections <= 0:
+            return 0
+        # HTTP/2 мультиплексирует запросы в одном соединении
+        count = 1 if self.http2 else connections
+        results = await asyncio.gather(
+            *(self.client.head(f"{self.base_url}/") for _ in range(count)),
+            return_exceptions=True,
+        )
+        warmed = sum(1 for r in results if isinstance(r, httpx.Response))
+        failed = [r for r in results if isinstance(r, BaseException)]
+        if failed:
+            logger.warning("Ozon pool prewarm: %s/%s failed: %s", len(failed), count, failed[0])
+        logger.info("Ozon pool prewarmed: %s connection(s) to %s, http2=%s", warmed, self.base_url, self.http2)
+        return warmed
+
+    def seller_api_session_manager(self) -> "SellerAPISessionManager":
+        return SellerAPISessionManager(self)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+class _SellerAPIResponse:
+    """То немногое от aiohttp.ClientResponse, что использует ozonapi."""
+
+    def __init__(self, response: httpx.Response) -> None:
+        self._response = response
+        self.status = response.status_code
+
+    async def json(self) -> Any:
+        try:
+            return json_loads(self._response.content)
+        except ValueError as exc:
+            # ozonapi ждёт ошибку aiohttp, а не ValueError; заголовки запроса
+            # (там Api-Key) в исключение не кладём
+            url = URL(str(self._response.request.url))
+            raise ContentTypeError(
+                RequestInfo(url, self._response.request.method, CIMultiDictProxy(CIMultiDict()), url),
+                (),
+                status=self.status,
+                message=(
+                    "Attempt to decode JSON with unexpected mimetype: "
+                    f"{self._response.headers.get('content-type', '')}"
+                ),
+                headers=CIMultiDictProxy(CIMultiDict(self._response.headers.multi_items())),
+            ) from exc
+
+
+class _SellerAPISession:
+    def __init__(self, transport: OzonTransport, headers: Dict[str, str]) -> None:
+        self._transport = transport
+        self._headers = headers
+
+    @asynccontextmanager
+    async def request(
+        self, method: str, url: str, *, json: Any = None, params: Any = None
+    ) -> AsyncIterator[_SellerAPIResponse]:
+        try:
+            response = await self._transport.client.request(
+                method.upper(), url, json=json, params=params, headers=self._headers
+            )
+        except httpx.TimeoutException as exc:
+            # ozonapi ловит именно эти типы и превращает их в свои APIError
+            raise asyncio.TimeoutError() from exc
+        except httpx.TransportError as exc:
+            raise ConnectionError(str(exc)) from exc
+        yield _SellerAPIResponse(response)
+
+
+class SellerAPISessionManager:
+    """Замена ``ozonapi`` SessionManager: вместо своей aiohttp-сессии — общий пул."""
+
+    def __init__(self, transport: OzonTransport) -> None:
+        self._transport = transport
+
+    @asynccontextmanager
+    async def get_session(
+        self, client_id: str, api_key: str, instance_id: int
+    ) -> AsyncIterator[_SellerAPISession]:
+        yield _SellerAPISession(self._transport, {"Client-Id": client_id, "Api-Key": api_key})
+
+    async def close_session(self, client_id: str) -> None:
+        return None  # пулом владеет OzonTransport
+
+    async def close_all(self) -> None:
+        return None
+
+
+def share_with_seller_api(transport: OzonTransport) -> bool:
+    """Направить запросы ``ozonapi.SellerAPI`` через *transport*.
+
+    Менеджер сессий в ozonapi общий для класса, поэтому подменять его
+    нужно до создания первого экземпляра SellerAPI.
+    """
+
+    try:
+        from ozonapi.seller.core import APIManager
+    except Exception:  # pragma: no cover - пакет не установлен
+        return False
+    if not isinstance(APIManager._session_manager, SellerAPISessionManager):
+        APIManager._session_manager = transport.seller_api_session_manager()
+    return True
+
+
+_transports: Dict[str, OzonTransport] = {}
+
+
+def get_transport(base_url: str) -> OzonTransport:
+    """Транспорт для хоста *base_url* (один на хост на весь процесс)."""
+
+    host = urlsplit(base_url).netloc or base_url
+    transport = _transports.get(host)
+    if transport is None:
+        transport = OzonTransport(base_url)
+        _transports[host] = transport
+    return transport
+
+
+async def close_transports() -> None:
+    for transport in list(_transports.values()):
+        await transport.aclose()
+    _transports.clear()
+
+
+__all__ = [
+    "OzonTransport",
+    "SellerAPISessionManager",
+    "close_transports",
+    "get_transport",
+    "share_with_seller_api",
+]
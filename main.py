@@ -2,20 +2,25 @@ import asyncio
 import logging
 import os
 from contextlib import suppress
-from typing import Dict, Tuple
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Tuple
 
-from aiogram import Bot, Dispatcher, F, Router
+from aiogram import BaseMiddleware, Bot, Dispatcher, F, Router
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
 from aiogram.enums import ParseMode
 from aiogram.filters import Command, CommandStart
 from aiogram.exceptions import TelegramBadRequest
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from aiogram.types import CallbackQuery, Message
+from aiogram.types import CallbackQuery, Message, TelegramObject
 from fastapi import FastAPI
 from dotenv import load_dotenv
 
 from botapp.account import get_account_info_text
+from botapp.catalog import get_catalog, start_catalog_sync, stop_catalog_sync
+from botapp.deadline import DeadlineExceeded, deadline_scope
+from botapp import json_codec
 from botapp.finance import get_finance_today_text
 from botapp.keyboards import (
     MenuCallbackData,
@@ -26,8 +31,12 @@ from botapp.keyboards import (
     review_card_keyboard,
     reviews_list_keyboard,
 )
-from botapp.orders import get_orders_today_text
+from botapp.orders import get_orders_month_text, get_orders_today_text
+from botapp.state import BoundedState, state_metrics
 from botapp.ozon_client import get_client
+from botapp.posting_store import get_posting_store
+from botapp.product_cache import get_product_cache
+from botapp.transport import close_transports
 from botapp.ai_client import generate_review_reply
 from botapp.reviews import (
     ReviewCard,
@@ -42,6 +51,8 @@ from botapp.reviews import (
     encode_review_id,
     resolve_review_id,
     refresh_reviews,
+    start_review_refresher,
+    stop_review_refresher,
     trim_for_telegram,
 )
 
@@ -62,13 +73,61 @@ if not TG_BOT_TOKEN:
 if not OZON_CLIENT_ID or not OZON_API_KEY:
     raise RuntimeError("OZON_CLIENT_ID / OZON_API_KEY are not set")
 
+# Бюджет времени на ответ пользователю: все вызовы Ozon внутри хендлера
+# укладываются в него (HANDLER_BUDGET_SECONDS в .env)
+HANDLER_BUDGET_SECONDS = float(os.getenv("HANDLER_BUDGET_SECONDS") or 10)
+
 router = Router()
 _polling_task: asyncio.Task | None = None
 _polling_lock = asyncio.Lock()
-_last_service_messages: Dict[int, int] = {}
-_reviews_list_messages: Dict[int, Tuple[int, int]] = {}
-_review_card_messages: Dict[int, Tuple[int, int]] = {}
-_local_answers: Dict[Tuple[int, str], str] = {}
+# Telegram не даёт редактировать/удалять сообщения старше 48 часов,
+# поэтому id служебных сообщений дольше не храним.
+MESSAGE_REFS_TTL = timedelta(hours=48)
+USER_STATE_MAX = 10_000
+_last_service_messages: BoundedState[int, int] = BoundedState(
+    "main.service_messages", max_size=USER_STATE_MAX, ttl=MESSAGE_REFS_TTL
+)
+_reviews_list_messages: BoundedState[int, Tuple[int, int]] = BoundedState(
+    "main.list_messages", max_size=USER_STATE_MAX, ttl=MESSAGE_REFS_TTL
+)
+_review_card_messages: BoundedState[int, Tuple[int, int]] = BoundedState(
+    "main.card_messages", max_size=USER_STATE_MAX, ttl=MESSAGE_REFS_TTL
+)
+_local_answers: BoundedState[Tuple[int, str], str] = BoundedState(
+    "main.local_answers", max_size=50_000, ttl=timedelta(days=7)
+)
+
+
+class DeadlineMiddleware(BaseMiddleware):
+    """Открывает дедлайн на каждый апдейт и отвечает, если Ozon в него не уложился."""
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        with deadline_scope(self.seconds):
+            try:
+                return await handler(event, data)
+            except DeadlineExceeded:
+                logger.warning("Handler exceeded %.1fs budget for %s", self.seconds, type(event).__name__)
+        target = event.message if isinstance(event, CallbackQuery) else event
+        if isinstance(target, Message):
+            with suppress(Exception):
+                await target.answer(
+                    "⏳ Ozon отвечает дольше обычного. Данные догружаются — "
+                    "повторите через несколько секунд.",
+                    reply_markup=main_menu_keyboard(),
+                )
+        return None
+
+
+router.message.middleware(DeadlineMiddleware(HANDLER_BUDGET_SECONDS))
+router.callback_query.middleware(DeadlineMiddleware(HANDLER_BUDGET_SECONDS))
 
 
 class ReviewAnswerStates(StatesGroup):
@@ -215,6 +274,18 @@ async def cmd_fbo(message: Message) -> None:
     )
 
 
+@router.message(Command("refresh"))
+async def cmd_refresh(message: Message) -> None:
+    dropped = get_client().invalidate_cache()
+    await send_service_message(
+        message.bot,
+        message.chat.id,
+        message.from_user.id,
+        f"🔄 Кэш сброшен ({dropped}). Следующий запрос возьмёт свежие данные из Ozon.",
+        reply_markup=main_menu_keyboard(),
+    )
+
+
 @router.message(Command("reviews"))
 async def cmd_reviews(message: Message) -> None:
     user_id = message.from_user.id
@@ -255,7 +326,10 @@ async def _send_review_card(
             current_answer=current_answer,
         )
         markup = review_card_keyboard(
-            category=category, page=page, review_id=encode_review_id(user_id, card.id)
+            category=category,
+            page=page,
+            review_id=encode_review_id(user_id, card.id),
+            index=view.index,
         )
 
     target = callback.message if callback else message
@@ -391,10 +465,8 @@ async def cb_fbo(callback: CallbackQuery, callback_data: MenuCallbackData) -> No
         except TelegramBadRequest:
             await callback.message.answer(text, reply_markup=fbo_menu_keyboard())
     elif action == "month":
-        await callback.message.answer(
-            "Месячная сводка пока в разработке, покажем как только будет готово.",
-            reply_markup=fbo_menu_keyboard(),
-        )
+        text = await get_orders_month_text()
+        await callback.message.answer(text, reply_markup=fbo_menu_keyboard())
     elif action == "filter":
         await callback.message.answer("Фильтр скоро", reply_markup=fbo_menu_keyboard())
     elif action == "open":
@@ -427,6 +499,10 @@ async def cb_reviews(callback: CallbackQuery, callback_data: ReviewsCallbackData
     review_token = callback_data.review_id
     review_id = resolve_review_id(user_id, review_token)
     page = callback_data.page or 0
+    if not review_token and callback_data.index is not None and action.startswith("card_"):
+        # Кнопка без токена (id не влез в callback) — отзыв по индексу в списке
+        _, card = await get_review_and_card(user_id, category, index)
+        review_id = card.id if card else None
 
     if action in {"list", "list_page"}:
         await callback.answer()
@@ -561,6 +637,7 @@ def build_dispatcher() -> Dispatcher:
 
 bot = Bot(
     token=TG_BOT_TOKEN,
+    session=AiohttpSession(json_loads=json_codec.loads, json_dumps=json_codec.dumps),
     default=DefaultBotProperties(parse_mode=ParseMode.HTML),
 )
 dp = build_dispatcher()
@@ -596,19 +673,30 @@ async def start_bot() -> None:
 @app.on_event("startup")
 async def on_startup() -> None:
     logger.info("Startup: validating Ozon credentials and creating polling task")
-    get_client()
+    client = get_client()
+    asyncio.create_task(client.prewarm())  # TLS к Ozon — до первого нажатия
+    get_product_cache()  # прогрев названий товаров с диска до первого запроса
+    get_catalog()
+    start_catalog_sync()
+    start_review_refresher()
     asyncio.create_task(start_bot())
 
 
 @app.on_event("shutdown")
 async def on_shutdown() -> None:
     logger.info("Shutdown: closing Ozon client and bot")
+    await stop_review_refresher()
+    await stop_catalog_sync()
     try:
         client = get_client()
     except Exception:
         client = None
     if client:
         await client.aclose()
+    await close_transports()
+    get_catalog().close()
+    get_product_cache().close()
+    get_posting_store().close()
     if _polling_task and not _polling_task.done():
         _polling_task.cancel()
         with suppress(asyncio.CancelledError):
@@ -621,4 +709,18 @@ async def root() -> dict:
     return {"status": "ok", "detail": "Ozon bot is running"}
 
 
+@app.get("/stats")
+async def stats() -> dict:
+    client = get_client()
+    return {
+        "state": state_metrics(),
+        "ozon": {
+            "rate_limit": client.rate_limit_stats(),
+            "coalesced": client.coalesce_stats(),
+            "cache": client.cache_stats(),
+            "breakers": client.breaker_stats(),
+        },
+    }
+
+
 __all__ = ["app", "bot", "dp", "router"]
@@ -0,0 +1,100 @@
+# tests/test_fbo_shards.py
+"""Шардирование /v2/posting/fbo/list: ни один заказ не теряется и не дублируется."""
+
+from __future__ import annotations
+
+import asyncio
+import gc
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from botapp.ozon_client import FBO_PAGE_LIMIT, OzonClient, _iso_z, _parse_iso
+
+SINCE = datetime(2025, 3, 1, tzinfo=timezone.utc)
+TO = SINCE + timedelta(days=2)
+
+
+def _posting(number: int, created: datetime) -> Dict[str, Any]:
+    # Ozon отдаёт created_at с миллисекундами
+    return {
+        "posting_number": f"{number:08d}-0001-1",
+        "created_at": created.isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+    }
+
+
+class _FakeOzon(OzonClient):
+    """Фильтр по [since, to] включительно и сортировка DESC, как у Ozon."""
+
+    def __init__(self, postings: List[Dict[str, Any]]) -> None:
+        super().__init__(client_id="1", api_key="key")
+        self.postings = sorted(postings, key=lambda p: _parse_iso(p["created_at"]), reverse=True)
+        self.calls = 0
+
+    async def _fbo_page(self, date_from_iso: str, date_to_iso: str, offset: int) -> List[Dict[str, Any]]:
+        self.calls += 1
+        since, to = _parse_iso(date_from_iso), _parse_iso(date_to_iso)
+        window = [p for p in self.postings if since <= _parse_iso(p["created_at"]) <= to]
+        return window[offset : offset + FBO_PAGE_LIMIT]
+
+
+def _fetch(postings: List[Dict[str, Any]]) -> List[str]:
+    client = _FakeOzon(postings)
+
+    async def collect() -> List[str]:
+        pages = client.iter_fbo_pages(_iso_z(SINCE), _iso_z(TO))
+        return [p["posting_number"] async for page in pages for p in page]
+
+    return asyncio.run(collect())
+
+
+def test_full_page_ending_mid_second_loses_nothing() -> None:
+    # Полная страница заканчивается на заказе с .700; в той же секунде есть
+    # заказы раньше (.000–.699), которые должны прийти из остатка окна.
+    dense = SINCE + timedelta(hours=30)
+    postings = [
+        _posting(i, dense + timedelta(milliseconds=i % 1000, microseconds=i // 1000))
+        for i in range(5300)
+    ]
+    numbers = _fetch(postings)
+    assert len(numbers) == len(set(numbers))
+    assert set(numbers) == {p["posting_number"] for p in postings}
+
+
+def test_spread_subsecond_timestamps() -> None:
+    for seed in range(5):
+        rnd = random.Random(seed)
+        span_ms = int((TO - SINCE).total_seconds() * 1000)
+        postings = [
+            _posting(i, SINCE + timedelta(milliseconds=rnd.randrange(span_ms))) for i in range(5000)
+        ]
+        numbers = _fetch(postings)
+        assert len(numbers) == len(set(numbers)), seed
+        assert set(numbers) == {p["posting_number"] for p in postings}, seed
+
+
+class _FailingOzon(_FakeOzon):
+    async def _fbo_page(self, date_from_iso: str, date_to_iso: str, offset: int) -> List[Dict[str, Any]]:
+        await asyncio.sleep(0.01)
+        raise RuntimeError(f"503 for {date_from_iso}")
+
+
+def test_failed_shards_raise_without_unretrieved_exceptions() -> None:
+    unhandled: List[Dict[str, Any]] = []
+
+    async def run() -> None:
+        asyncio.get_running_loop().set_exception_handler(lambda loop, ctx: unhandled.append(ctx))
+        client = _FailingOzon([])
+        try:
+            async for _ in client.iter_fbo_pages(_iso_z(SINCE), _iso_z(SINCE + timedelta(days=6))):
+                pass
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("shard error was swallowed")
+        await asyncio.sleep(0.05)
+        gc.collect()
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert unhandled == []
@@ -0,0 +1,54 @@
+# tests/test_posting_table.py
+"""Итоги колоночной таблицы совпадают с построчной сводкой orders."""
+
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from botapp.orders import _summarize_postings  # noqa: E402
+from botapp.posting_table import PostingTable  # noqa: E402
+
+
+def _posting(status: str, products: list, financial: list) -> dict:
+    return {
+        "status": status,
+        "created_at": "2025-03-01T10:15:30.250Z",
+        "products": products,
+        "analytics_data": {"warehouse_name": "ХОРУГВИНО_РФЦ", "region": "Москва"},
+        "financial_data": {"products": financial},
+    }
+
+
+POSTINGS = [
+    # Суммы строками с пробелами-разделителями и запятой, как их отдаёт часть ответов Ozon
+    _posting(
+        "delivered",
+        [{"offer_id": "A", "quantity": "2", "price": "1 250,50"}],
+        [{"payout": "1 063,00"}],
+    ),
+    _posting(
+        "delivering",
+        [
+            {"offer_id": "B", "quantity": 1, "price": "12 000"},
+            {"offer_id": "A", "quantity": "1", "price": "1250.5"},
+        ],
+        [{"payout": None, "client_price": "11 500,25"}, {"price": 1100.0}],
+    ),
+    _posting("cancelled", [{"offer_id": "C", "quantity": "0", "price": "3 000,00"}], []),
+    _posting("returned", [{"offer_id": "C", "quantity": 3, "offer_price": "99,9"}], []),
+    _posting("delivered", [{"offer_id": "D", "quantity": None, "price": ""}], [{"payout": ""}]),
+]
+
+
+def test_totals_match_row_wise_summary() -> None:
+    expected = _summarize_postings(POSTINGS)
+    totals = PostingTable.from_postings(POSTINGS).totals()
+    for name, value in totals.items():
+        assert value == pytest.approx(expected[name]), name
+
+
+def test_sku_quantities_match_row_wise_summary() -> None:
+    rows = PostingTable.from_postings(POSTINGS).by_sku()
+    assert {row["sku"]: row["qty"] for row in rows if row["qty"]} == {"A": 3, "B": 1, "C": 3}
@@ -0,0 +1,79 @@
+# tests/test_review_shards.py
+"""Шарды /v1/review/list: max_count отдаёт именно последние N отзывов, без дыр."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
+
+from botapp.deadline import Deadline
+from botapp.ozon_client import OzonClient, _iso_z, _parse_iso
+
+SINCE = datetime(2025, 3, 1, tzinfo=timezone.utc)
+TO = SINCE + timedelta(days=30)
+LATENCY = 0.02
+
+
+def _review(number: int, published: datetime) -> Dict[str, Any]:
+    return {
+        "id": f"review-{number:06d}",
+        "published_at": published.isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+    }
+
+
+class _FakeOzon(OzonClient):
+    """Фильтр по [date_from, date_to] включительно, DESC и курсор last_id, как у Ozon."""
+
+    def __init__(self, reviews: List[Dict[str, Any]]) -> None:
+        super().__init__(client_id="1", api_key="key")
+        self.reviews = sorted(reviews, key=lambda r: _parse_iso(r["published_at"]), reverse=True)
+        self.calls = 0
+        # Задержка ответа заметна на фоне лимита метода — шардирование включается
+        self._rate_limiter.bucket("/v1/review/list").rate = 1000.0
+
+    async def _review_page(
+        self,
+        since: datetime,
+        to: datetime,
+        limit: int,
+        last_id: str | None,
+        deadline: Deadline | None,
+    ) -> Tuple[List[Dict[str, Any]], bool, Any]:
+        self.calls += 1
+        await asyncio.sleep(LATENCY)
+        since, to = _parse_iso(_iso_z(since)), _parse_iso(_iso_z(to))
+        window = [r for r in self.reviews if since <= _parse_iso(r["published_at"]) <= to]
+        start = 0
+        if last_id:
+            start = next(i for i, r in enumerate(window) if r["id"] == last_id) + 1
+        page = window[start : start + limit]
+        has_next = start + limit < len(window)
+        return page, has_next, page[-1]["id"] if page else None
+
+
+def _evenly(count: int) -> List[Dict[str, Any]]:
+    step = (TO - SINCE) / count
+    return [_review(i, SINCE + step * i + timedelta(milliseconds=i % 1000)) for i in range(count)]
+
+
+def _fetch(reviews: List[Dict[str, Any]], max_count: int | None) -> List[str]:
+    client = _FakeOzon(reviews)
+    result = asyncio.run(client.get_reviews(SINCE, TO, limit_per_page=100, max_count=max_count))
+    return [r["id"] for r in result]
+
+
+def test_max_count_returns_newest_reviews_without_holes() -> None:
+    for count in (5000, 10000):
+        reviews = _evenly(count)
+        newest = [r["id"] for r in sorted(reviews, key=lambda r: r["published_at"], reverse=True)]
+        ids = _fetch(reviews, 2000)
+        assert len(ids) == len(set(ids)) == 2000, count
+        assert set(ids) == set(newest[:2000]), count
+
+
+def test_without_max_count_every_review_arrives_once() -> None:
+    reviews = _evenly(3000)
+    ids = _fetch(reviews, None)
+    assert len(ids) == len(set(ids))
+    assert set(ids) == {r["id"] for r in reviews}